@@ -0,0 +1,132 @@
+# bench_callback_dispatch.py
+# Cost of finding the handler for one button press:
+#   before – the old chain of CallbackQueryHandler regex patterns,
+#            tried in registration order until one matches (as PTB does)
+#   after  – router.CallbackRouter: split "ACTION|arg", one dict lookup
+#
+# Run from the repo root:  python benchmarks/bench_callback_dispatch.py
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from router import CallbackRouter  # noqa: E402
+
+PRESSES = 200_000
+ROUNDS = 5
+
+# Registration order of the handler chain before the router
+LEGACY_PATTERNS = [
+    "^CONFIRM_DELETE$", "^CANCEL_DELETE$", "^COPY_TO\\|", "^COPY_Q$", "^FOLDER_PREV\\|",
+    "^FOLDER_NEXT\\|", "^POST_QUIZ$", "^START_THIS$", "^LB_PREV\\|", "^LB_NEXT\\|",
+    "^POST_TO_GROUP$", "^LOCKED$", "^PLAY_START$", "^PLAY_ANSWER_", "^EDIT_Q_EXPLANATION$",
+    "^EDIT_Q_EXPL_REMOVE$", "^EDIT_Q_CORRECT$", "^EDIT_CORRECT_", "^EDIT_Q_OPTIONS$",
+    "^EDIT_Q_IMAGE_SEND$", "^EDIT_Q_IMAGE$", "^EDIT_Q_IMAGE_REMOVE$", "^EDIT_Q_BACK$",
+    "^EDIT_Q_TEXT$", "^EDIT_Q$", "^BACK_TO_Q_OPTIONS$", "^PREVIEW_Q$", "^SKIP_Q_EXPLANATION$",
+    "^CORRECT_", "^OPTIONS_DONE$", "^EDIT_OPTIONS_DONE$", "^SKIP_Q_IMAGE$", "^BACK_TO_EDIT_MENU$",
+    "^BACK_TO_QUIZZES$", "^DELETE_FOLDER\\|", "^DELETE_QUIZ$", "^GO_HOME$", "^HOME_CREATE$",
+    "^HOME_MY_QUIZZES$", "^MOVE_CREATE_FOLDER$", "^MOVE_QUIZ$", "^MOVE_QUIZ_TO\\|", "^ADD_FOLDER$",
+    "^RENAME_FOLDER\\|", "^OPEN_FOLDER\\|", "^BACK_TO_FOLDERS$", "^QPAGE_PREV$", "^QPAGE_NEXT$",
+    "^Q_", "^QUIZ_", "^EDIT_THIS$", "^EDIT_TITLE$", "^EDIT_DESC$", "^EDIT_TIMER$", "^SET_TIMER_",
+    "^EDIT_SHUFFLE$", "^TOGGLE_", "^EDIT_QUESTIONS$", "^ADD_QUESTION$", "^BACK_TO_ACTION$",
+    "^EDIT_CORRECT$", "^DELETE_QUESTION$",
+]
+
+QUIZ_ID = "3f2b8c1e-5d4a-4e7b-9c2d-1a6f0e8b7c55"
+
+# (old callback_data, new callback_data, share of presses)
+# Players answering dominate; admin navigation is the tail.
+TRAFFIC = [
+    ("PLAY_ANSWER_2", "PLAY_ANSWER|2", 70),
+    ("LB_NEXT|" + QUIZ_ID, "LB_NEXT|" + QUIZ_ID, 8),
+    ("PLAY_START", "PLAY_START", 5),
+    ("Q_1234", "Q|1234", 4),
+    ("QUIZ_" + QUIZ_ID, "QUIZ|" + QUIZ_ID, 3),
+    ("QPAGE_NEXT", "QPAGE_NEXT", 3),
+    ("OPEN_FOLDER|Default", "OPEN_FOLDER|Default", 2),
+    ("EDIT_Q_TEXT", "EDIT_Q_TEXT", 2),
+    ("SET_TIMER_30", "SET_TIMER|30", 1),
+    ("DELETE_QUESTION", "DELETE_QUESTION", 1),
+    ("EDIT_CORRECT", "EDIT_CORRECT", 1),
+]
+
+
+def handler(update, context):
+    pass
+
+
+# Old "PREFIX<arg>" patterns and the action they became
+PREFIX_ACTIONS = {
+    "^PLAY_ANSWER_": "PLAY_ANSWER",
+    "^EDIT_CORRECT_": "SET_CORRECT",
+    "^CORRECT_": "CORRECT",
+    "^Q_": "Q",
+    "^QUIZ_": "QUIZ",
+    "^SET_TIMER_": "SET_TIMER",
+    "^TOGGLE_": "TOGGLE",
+}
+
+
+def make_router():
+    router = CallbackRouter()
+    for pattern in LEGACY_PATTERNS:
+        if pattern == "^PREVIEW_Q$":    # never sent; dropped with the router
+            continue
+        action = PREFIX_ACTIONS.get(pattern) or pattern.strip("^$").replace("\\|", "")
+        router.add(action, handler)
+    for pattern, action in PREFIX_ACTIONS.items():
+        router.add_legacy(pattern[1:], action)
+    router.check()
+    return router
+
+
+def sample(index):
+    rng = random.Random(7)
+    population = [t[index] for t in TRAFFIC]
+    weights = [t[2] for t in TRAFFIC]
+    return rng.choices(population, weights, k=PRESSES)
+
+
+def bench_regex_chain(presses):
+    chain = [(re.compile(p), handler) for p in LEGACY_PATTERNS]
+    start = time.perf_counter()
+    for data in presses:
+        for pattern, callback in chain:
+            if pattern.match(data):
+                break
+    return time.perf_counter() - start
+
+
+def bench_router(presses):
+    router = make_router()
+    start = time.perf_counter()
+    for data in presses:
+        router.resolve(data)
+    return time.perf_counter() - start
+
+
+def best(bench, presses):
+    return min(bench(presses) for _ in range(ROUNDS))
+
+
+def main():
+    print(f"{len(LEGACY_PATTERNS)} patterns, {PRESSES} presses, best of {ROUNDS}")
+    for name, bench, presses in (
+        ("before", bench_regex_chain, sample(0)),
+        ("after", bench_router, sample(1)),
+    ):
+        elapsed = best(bench, presses)
+        print(f"{name:>6}: {elapsed / PRESSES * 1e9:8.0f} ns per callback")
+
+    # Worst case for the chain: a button registered last
+    tail = ["DELETE_QUESTION"] * PRESSES
+    print(f"  last-registered button: before {best(bench_regex_chain, tail) / PRESSES * 1e9:.0f} ns, "
+          f"after {best(bench_router, tail) / PRESSES * 1e9:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
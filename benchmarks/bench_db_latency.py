@@ -0,0 +1,179 @@
+# bench_db_latency.py
+# p99 callback latency with a concurrent write load:
+#   before – shared cursor + conn.commit() on the event loop
+#   after  – quizdb.Database (WAL readers + group-committing writer)
+# plus the cost of a burst of single-row "click" writes.
+#
+# Run from the repo root:  python benchmarks/bench_db_latency.py
+
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quizdb import Database, migrate  # noqa: E402
+
+PLAYERS = 200
+DURATION = 5.0
+DB_TAP_RATIO = 0.2     # share of taps that query the DB (the rest are answers served from memory)
+WRITE_INTERVAL = 0.02  # an admin / import write every 20 ms
+QUESTIONS = 50
+WRITE_ROWS = 40
+WRITE_PAYLOAD = "x" * 65536
+
+# The write load is a bulk save (an import-sized batch of questions
+# that is committed and then removed again), large enough that the
+# commit costs real disk time.
+INSERT_SCRATCH = (
+    "INSERT INTO questions (quiz_id, question, image_file_id, options, correct, explanation) "
+    "VALUES ('scratch', ?, NULL, 'a||b', 0, NULL)"
+)
+DELETE_SCRATCH = "DELETE FROM questions WHERE quiz_id='scratch'"
+WRITE_BATCH = [(WRITE_PAYLOAD,)] * WRITE_ROWS
+
+
+def seed(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    migrate(conn)
+    conn.execute("BEGIN")
+    conn.execute(
+        "INSERT INTO quizzes (quiz_id, owner_id, title, description, folder, shuffle_q, shuffle_a, timer) "
+        "VALUES ('q1', 1, 'Bench', NULL, 'Default', 1, 1, 15)"
+    )
+    conn.executemany(
+        "INSERT INTO questions (quiz_id, question, image_file_id, options, correct, explanation) "
+        "VALUES ('q1', ?, NULL, 'a||b||c||d', 0, NULL)",
+        [(f"Question {i}",) for i in range(QUESTIONS)]
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def p99(samples):
+    return statistics.quantiles(samples, n=100)[98]
+
+
+async def run(read, write):
+    latencies = {"memory": [], "db": []}
+    stop = time.perf_counter() + DURATION
+
+    async def player():
+        while time.perf_counter() < stop:
+            # Each tap is due at a fixed time; lateness caused by a
+            # blocked loop counts against the callback.
+            due = time.perf_counter() + random.uniform(0.005, 0.05)
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            kind = "db" if random.random() < DB_TAP_RATIO else "memory"
+            if kind == "db":
+                await read()
+            latencies[kind].append(time.perf_counter() - due)
+
+    async def writer():
+        while time.perf_counter() < stop:
+            await write()
+            await asyncio.sleep(WRITE_INTERVAL)
+
+    await asyncio.gather(writer(), *(player() for _ in range(PLAYERS)))
+    return latencies
+
+
+async def bench_before(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA synchronous=FULL")
+    cur = conn.cursor()
+
+    async def read():
+        cur.execute("SELECT shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?", ("q1",))
+        cur.fetchone()
+        cur.execute("SELECT question, options FROM questions WHERE quiz_id=?", ("q1",))
+        cur.fetchall()
+
+    async def write():
+        cur.executemany(INSERT_SCRATCH, WRITE_BATCH)
+        cur.execute(DELETE_SCRATCH)
+        conn.commit()
+
+    try:
+        return await run(read, write)
+    finally:
+        conn.close()
+
+
+async def bench_after(path):
+    db = Database(path)
+
+    async def read():
+        await db.fetchone("SELECT shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?", ("q1",))
+        await db.fetchall("SELECT question, options FROM questions WHERE quiz_id=?", ("q1",))
+
+    async def write():
+        await db.run(lambda conn: (
+            conn.executemany(INSERT_SCRATCH, WRITE_BATCH),
+            conn.execute(DELETE_SCRATCH),
+        ))
+
+    try:
+        return await run(read, write)
+    finally:
+        db.close()
+
+
+CLICKS = 2000
+
+
+async def clicks_before(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA synchronous=FULL")
+    cur = conn.cursor()
+    started = time.perf_counter()
+    for i in range(CLICKS):
+        cur.execute("UPDATE quizzes SET timer=? WHERE quiz_id=?", (i, "q1"))
+        conn.commit()
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return elapsed, CLICKS
+
+
+async def clicks_after(path):
+    db = Database(path)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        db.execute("UPDATE quizzes SET timer=? WHERE quiz_id=?", (i, "q1"))
+        for i in range(CLICKS)
+    ))
+    elapsed = time.perf_counter() - started
+    commits = db.batches
+    db.close()
+    return elapsed, commits
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, bench in (("before", bench_before), ("after", bench_after)):
+            path = os.path.join(tmp, f"{name}.db")
+            seed(path)
+            results = asyncio.run(bench(path))
+            results["all"] = results["memory"] + results["db"]
+            for kind in ("all", "memory", "db"):
+                samples = results[kind]
+                print(
+                    f"{name:>6} {kind:>6}: {len(samples):>6} callbacks  "
+                    f"p50={statistics.median(samples) * 1000:7.2f} ms  "
+                    f"p99={p99(samples) * 1000:7.2f} ms"
+                )
+
+        for name, bench in (("before", clicks_before), ("after", clicks_after)):
+            path = os.path.join(tmp, f"clicks_{name}.db")
+            seed(path)
+            elapsed, commits = asyncio.run(bench(path))
+            print(f"{name:>6} clicks: {CLICKS} writes in {elapsed * 1000:8.1f} ms, {commits} commits")
+
+
+if __name__ == "__main__":
+    main()
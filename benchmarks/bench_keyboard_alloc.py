@@ -0,0 +1,115 @@
+# bench_keyboard_alloc.py
+# Keyboard objects allocated per answered question (ask keyboard for the
+# next question + the ✅ / ❌ feedback keyboard):
+#   before – both built with fresh InlineKeyboardButton / Markup objects
+#            on every send and every tap
+#   after  – looked up in the snapshot's shared keyboards (each
+#            question/layout rendered once, on first use; warmed here)
+#
+# Needs python-telegram-bot installed. Run from the repo root:
+#   python benchmarks/bench_keyboard_alloc.py
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup  # noqa: E402
+
+from keyboards import render_keyboards  # noqa: E402
+from playsession import PlaySession  # noqa: E402
+from quizcache import compile_snapshot  # noqa: E402
+from quizdb import pack_options  # noqa: E402
+
+QUESTIONS = 50
+OPTIONS = 4
+ANSWERS = 20_000
+
+
+def make_snapshot():
+    quiz_row = ("q1", "Bench quiz", None, 15, 1, 1, "classic")
+    question_rows = [
+        (
+            i,
+            f"Question number {i}: which of the following is correct?",
+            None,
+            pack_options([f"Option {j} for question {i}" for j in range(OPTIONS)]),
+            i % OPTIONS,
+            None,
+        )
+        for i in range(QUESTIONS)
+    ]
+    snapshot = compile_snapshot(quiz_row, question_rows)
+    snapshot = snapshot._replace(keyboards=render_keyboards(snapshot))
+    for qi, q in enumerate(snapshot.questions):
+        for li in range(len(q.layouts)):
+            snapshot.keyboards[qi, li]
+    return snapshot
+
+
+def legacy_keyboards(options, correct_index, chosen_index):
+    ask = InlineKeyboardMarkup([
+        [InlineKeyboardButton(option, callback_data=f"PLAY_ANSWER|{i}")]
+        for i, option in enumerate(options)
+    ])
+    buttons = []
+    for i, option in enumerate(options):
+        if i == correct_index:
+            label = f"✅ {option}"
+        elif i == chosen_index:
+            label = f"❌ {option}"
+        else:
+            label = option
+        buttons.append([InlineKeyboardButton(label, callback_data="LOCKED")])
+    return ask, InlineKeyboardMarkup(buttons)
+
+
+def before(play, chosen):
+    _, options, correct = play.current()
+    return legacy_keyboards(options, correct, chosen)
+
+
+def after(play, chosen):
+    keyboards = play.keyboards()
+    return keyboards.ask, keyboards.answered[chosen]
+
+
+def measure(build, snapshot):
+    rng = random.Random(1)
+    plays = [PlaySession.start(snapshot, rng) for _ in range(ANSWERS // QUESTIONS)]
+    steps = [(play, rng.randrange(OPTIONS)) for play in plays for _ in range(QUESTIONS)]
+
+    # Keep every result alive (as pending sends would), so the traced
+    # blocks are what each answer allocated
+    results = [None] * len(steps)
+    tracemalloc.start()
+    blocks_before = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    start = time.perf_counter()
+    for n, (play, chosen) in enumerate(steps):
+        results[n] = build(play, chosen)
+        play.index = (play.index + 1) % QUESTIONS
+    elapsed = time.perf_counter() - start
+    blocks_after = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (blocks_after - blocks_before) / len(steps), size / len(steps), elapsed / len(steps)
+
+
+def main():
+    start = time.perf_counter()
+    snapshot = make_snapshot()
+    render_ms = (time.perf_counter() - start) * 1000
+    print(f"{QUESTIONS} questions x {OPTIONS} options, shuffle on, {ANSWERS} answers")
+    print(f"one-time compile + render: {render_ms:.1f} ms")
+
+    for name, build in (("before", before), ("after", after)):
+        blocks, size, seconds = measure(build, snapshot)
+        print(f"{name:>6}: {blocks:6.1f} objects  {size:8.0f} B  {seconds * 1e6:6.2f} µs per answer")
+
+
+if __name__ == "__main__":
+    main()
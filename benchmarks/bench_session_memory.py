@@ -0,0 +1,80 @@
+# bench_session_memory.py
+# Memory per play session for a 200-question quiz:
+#   before – user_data["play"] holding a dict per question with its own
+#            shuffled option list (the pre-PlaySession layout)
+#   after  – PlaySession referencing the shared QuizSnapshot
+#
+# Run from the repo root:  python benchmarks/bench_session_memory.py
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quizcache import compile_snapshot  # noqa: E402
+from quizdb import pack_options  # noqa: E402
+from playsession import PlaySession  # noqa: E402
+
+QUESTIONS = 200
+OPTIONS = 4
+SESSIONS = 2000
+
+
+def make_snapshot():
+    quiz_row = ("q1", "Bench quiz", None, 15, 1, 1, "classic")
+    question_rows = [
+        (
+            i,
+            f"Question number {i}: which of the following is correct?",
+            None,
+            pack_options([f"Option {j} for question {i}" for j in range(OPTIONS)]),
+            i % OPTIONS,
+            None,
+        )
+        for i in range(QUESTIONS)
+    ]
+    return compile_snapshot(quiz_row, question_rows)
+
+
+def legacy_session(snapshot):
+    questions = []
+    for q in snapshot.questions:
+        opts = list(q.options)
+        indexed = list(enumerate(opts))
+        random.shuffle(indexed)
+        opts = [o for _, o in indexed]
+        correct = [i for i, (old_i, _) in enumerate(indexed) if old_i == q.correct][0]
+        questions.append({
+            "id": q.id,
+            "text": q.text,
+            "image": q.image,
+            "options": opts,
+            "correct": correct,
+            "explanation": q.explanation
+        })
+    random.shuffle(questions)
+    return {"questions": questions, "index": 0, "score": 0, "quiz_id": snapshot.quiz_id}
+
+
+def measure(factory, snapshot):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    sessions = [factory(snapshot) for _ in range(SESSIONS)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(sessions) == SESSIONS
+    return (after - before) / SESSIONS
+
+
+def main():
+    snapshot = make_snapshot()
+    print(f"{QUESTIONS} questions x {OPTIONS} options, shuffle on, {SESSIONS} sessions")
+    for name, factory in (("before", legacy_session), ("after", PlaySession.start)):
+        per_session = measure(factory, snapshot)
+        print(f"{name:>6}: {per_session / 1024:8.2f} KB per session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# replay_updates.py
+# Plays "Telegram" against a locally running webhook-mode bot: POSTs
+# recorded updates (one Update JSON per line) to the webhook with the
+# secret-token header and reports status codes and latency.
+#
+#   WEBHOOK_URL=http://localhost:8443 WEBHOOK_SECRET=s3cret BOT_TOKEN=... python quizbot_clone.py
+#   python benchmarks/replay_updates.py updates.jsonl --url http://localhost:8443/telegram \
+#       --secret s3cret --concurrency 40
+#
+# Without a recording, --synthetic N generates callback-button taps
+# from N distinct users (answers to the current question).
+
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def load_updates(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_updates(users):
+    update_ids = count(1)
+    updates = []
+    for user_id in range(1, users + 1):
+        user = {"id": 10_000 + user_id, "is_bot": False, "first_name": f"Player {user_id}"}
+        updates.append({
+            "update_id": next(update_ids),
+            "callback_query": {
+                "id": str(next(update_ids)),
+                "from": user,
+                "chat_instance": str(user_id),
+                "data": f"PLAY_ANSWER|{user_id % 4}",
+                "message": {
+                    "message_id": 1,
+                    "date": int(time.time()),
+                    "chat": {"id": user["id"], "type": "private"},
+                    "text": "Question",
+                },
+            },
+        })
+    return updates
+
+
+def post(url, secret, update):
+    body = json.dumps(update).encode()
+    request = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        SECRET_HEADER: secret,
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", nargs="?", help="JSONL file with one Update per line")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate taps from N users instead")
+    parser.add_argument("--url", default="http://localhost:8443/telegram")
+    parser.add_argument("--secret", required=True)
+    parser.add_argument("--concurrency", type=int, default=40, help="like setWebhook max_connections")
+    args = parser.parse_args()
+
+    if args.recording:
+        updates = load_updates(args.recording)
+    elif args.synthetic:
+        updates = synthetic_updates(args.synthetic)
+    else:
+        parser.error("give a recording file or --synthetic N")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda u: post(args.url, args.secret, u), updates))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    latencies = sorted(latency for _, latency in results)
+
+    print(f"{len(updates)} updates in {elapsed:.2f} s ({len(updates) / elapsed:.0f}/s)")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    if len(latencies) >= 2:
+        print(
+            f"latency p50={statistics.median(latencies) * 1000:.1f} ms  "
+            f"p99={statistics.quantiles(latencies, n=100)[98] * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
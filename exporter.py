@@ -0,0 +1,89 @@
+# exporter.py
+# Quiz export to a gzipped JSONL or CSV document, in the format
+# importer.py reads back. Questions are streamed from a read cursor into
+# the compressed file a batch at a time, so memory stays flat whatever
+# the quiz size.
+#
+#   JSONL – one question object per line
+#   CSV   – header row, then one question per row
+#
+# Only questions: an import adds them to an existing quiz and leaves its
+# settings (timer, shuffle, play mode) alone, so they aren't exported.
+
+import csv
+import gzip
+import io
+import json
+import re
+
+from importer import CSV_COLUMNS
+from quizdb import MAX_OPTIONS, unpack_options
+
+EXPORT_FORMATS = ("jsonl", "csv")
+_FETCH = 500
+
+
+def export_filename(title, fmt):
+    slug = re.sub(r"[^\w-]+", "_", title or "quiz").strip("_")[:60] or "quiz"
+    return f"{slug}.{fmt}.gz"
+
+
+def _questions(conn, quiz_id):
+    cursor = conn.execute(
+        "SELECT question, image_file_id, options, correct, explanation "
+        "FROM questions WHERE quiz_id=? ORDER BY id",
+        (quiz_id,)
+    )
+    try:
+        while True:
+            rows = cursor.fetchmany(_FETCH)
+            if not rows:
+                return
+            for question, image, options, correct, explanation in rows:
+                yield {
+                    "question": question,
+                    "options": list(unpack_options(options)),
+                    "correct": correct + 1,
+                    "explanation": explanation,
+                    "image": image,
+                }
+    finally:
+        cursor.close()
+
+
+def _write_jsonl(f, questions):
+    count = 0
+    for q in questions:
+        f.write(json.dumps(q, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _write_csv(f, questions):
+    writer = csv.writer(f)
+    writer.writerow(CSV_COLUMNS)
+    count = 0
+    for q in questions:
+        options = q["options"] + [""] * (MAX_OPTIONS - len(q["options"]))
+        writer.writerow([q["question"], *options, q["correct"], q["explanation"] or "", q["image"] or ""])
+        count += 1
+    return count
+
+
+def export_quiz(conn, quiz_id, path, fmt):
+    # Runs on a read connection (Database.read). -> (title, questions written),
+    # or None if the quiz doesn't exist. Quiz row and questions come from
+    # one read transaction, so the file is a consistent snapshot.
+    conn.execute("BEGIN")
+    try:
+        row = conn.execute("SELECT title FROM quizzes WHERE quiz_id=?", (quiz_id,)).fetchone()
+        if not row:
+            return None
+        title = row[0]
+
+        with gzip.open(path, "wb") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+            write = _write_csv if fmt == "csv" else _write_jsonl
+            count = write(f, _questions(conn, quiz_id))
+    finally:
+        conn.execute("COMMIT")
+    return title, count
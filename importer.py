@@ -0,0 +1,252 @@
+# importer.py
+# Bulk question import from CSV / JSON / JSONL documents (optionally .gz).
+# The file is streamed twice from disk: once to validate every row, then
+# again straight into executemany on the DB writer, so a 50k-row bank
+# never sits in memory as a whole.
+#
+#   CSV   – header row: question, option1 … option10, correct, explanation, image
+#   JSON  – an array of objects, or one object per line (JSONL):
+#           {"question": "...", "options": ["...", "..."], "correct": 1,
+#            "explanation": "...", "image": "<telegram file_id>"}
+#           A {"quiz": {...}} settings object (written by early versions
+#           of exporter.py) is skipped.
+#
+# "correct" is the 1-based number of the right option (as in the bot).
+
+import csv
+import gzip
+import io
+import json
+
+from quizdb import MAX_OPTIONS, MIN_OPTIONS, pack_options
+
+IMPORT_MAX_ROWS = 100_000
+IMPORT_MAX_ERRORS = 1000        # reported in full; beyond that only counted
+
+QUESTION_MAX = 4096             # Telegram message text
+CAPTION_MAX = 1024              # ... and photo caption
+
+_CHUNK = 64 * 1024
+_MAX_ELEMENT = 1024 * 1024      # one JSON array element, at most
+_OPTION_COLUMNS = [f"option{i}" for i in range(1, MAX_OPTIONS + 1)]
+CSV_COLUMNS = ["question", *_OPTION_COLUMNS, "correct", "explanation", "image"]
+
+INSERT_SQL = """
+    INSERT INTO questions (quiz_id, question, image_file_id, options, correct, explanation)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def detect_format(filename):
+    # -> ("csv" | "json" | "jsonl", gzipped) or None
+    name = (filename or "").lower()
+    gzipped = name.endswith(".gz")
+    if gzipped:
+        name = name[:-3]
+    for ext, fmt in ((".csv", "csv"), (".jsonl", "jsonl"), (".ndjson", "jsonl"), (".json", "json")):
+        if name.endswith(ext):
+            return fmt, gzipped
+    return None
+
+
+def _open_text(path, gzipped):
+    raw = gzip.open(path, "rb") if gzipped else open(path, "rb")
+    # utf-8-sig: spreadsheets like to start CSVs with a BOM
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+
+# ---------- record streams: (where, dict | error text) ----------
+def _csv_records(f):
+    reader = csv.DictReader(f)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    if "question" not in reader.fieldnames or "correct" not in reader.fieldnames:
+        yield "header", "CSV needs at least the columns question, option1, option2, correct"
+        return
+
+    for row in reader:
+        where = f"line {reader.line_num}"
+        options = [row.get(col) for col in _OPTION_COLUMNS]
+        filled = [bool(o and o.strip()) for o in options]
+        count = sum(filled)
+        # Only trailing columns may be blank: dropping one in the middle
+        # would shift "correct" onto another option
+        if not all(filled[:count]):
+            yield where, f"option{filled.index(False) + 1} is empty but a later option is not"
+            continue
+        yield where, {
+            "question": row.get("question"),
+            "options": options[:count],
+            "correct": row.get("correct"),
+            "explanation": row.get("explanation"),
+            "image": row.get("image"),
+        }
+
+
+def _jsonl_records(f):
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        where = f"line {line_no}"
+        try:
+            yield where, json.loads(line)
+        except ValueError as e:
+            yield where, f"invalid JSON ({e.msg})"
+
+
+def _json_array_records(f):
+    # Incremental "[{...}, {...}]" reader: decodes one element at a time
+    # from a sliding buffer instead of json.load()ing the whole file
+    decoder = json.JSONDecoder()
+    buffer = f.read(_CHUNK)
+    pos = len(buffer) - len(buffer.lstrip())
+    if buffer[pos:pos + 1] != "[":
+        # Not an array → one object per line
+        yield from _jsonl_records(_rest_as_lines(buffer, f))
+        return
+
+    pos += 1
+    eof = False
+    item = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except ValueError as e:
+            # Element cut by the chunk boundary → read more and retry
+            if not eof and len(buffer) - pos < _MAX_ELEMENT:
+                chunk = f.read(_CHUNK)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if pos >= len(buffer):
+                yield f"item {item + 1}", "unexpected end of file (missing ']')"
+            else:
+                yield f"item {item + 1}", f"invalid JSON ({e.msg})"
+            return
+
+        item += 1
+        yield f"item {item}", value
+        pos = end
+
+
+def _rest_as_lines(head, f):
+    # head was read ahead: finish its last line, then continue with f
+    yield from io.StringIO(head + f.readline())
+    yield from f
+
+
+def _is_header(record):
+    return isinstance(record, dict) and "quiz" in record and "question" not in record
+
+
+def iter_records(f, fmt):
+    if fmt == "csv":
+        return _csv_records(f)
+    records = _jsonl_records(f) if fmt == "jsonl" else _json_array_records(f)
+    return ((where, record) for where, record in records if not _is_header(record))
+
+
+# ---------- validation ----------
+def _text(value, field):
+    if value is None:
+        return None
+    if not isinstance(value, (str, int, float)):
+        raise ValueError(f"{field} must be text")
+    value = str(value).strip()
+    return value or None
+
+
+def to_row(record):
+    # dict -> (question, image, packed options, 0-based correct, explanation)
+    if not isinstance(record, dict):
+        raise ValueError("expected an object")
+
+    question = _text(record.get("question"), "question")
+    if not question:
+        raise ValueError("question is empty")
+    image = _text(record.get("image"), "image")
+    limit = CAPTION_MAX if image else QUESTION_MAX
+    if len(question) > limit:
+        raise ValueError(f"question is longer than {limit} characters")
+
+    options = record.get("options")
+    if not isinstance(options, list):
+        raise ValueError("options must be a list")
+    options = [_text(o, "option") for o in options]
+    if any(o is None for o in options):
+        raise ValueError("an option is empty")
+    if not MIN_OPTIONS <= len(options) <= MAX_OPTIONS:
+        raise ValueError(f"needs {MIN_OPTIONS}–{MAX_OPTIONS} options, got {len(options)}")
+
+    correct = record.get("correct")
+    try:
+        correct = int(str(correct).strip())
+    except ValueError:
+        raise ValueError(f"correct must be an option number, got {correct!r}") from None
+    if not 1 <= correct <= len(options):
+        raise ValueError(f"correct must be between 1 and {len(options)}")
+
+    explanation = _text(record.get("explanation"), "explanation")
+    return question, image, pack_options(options), correct - 1, explanation
+
+
+def check_file(path, fmt, gzipped, progress=None):
+    # Pass 1 – validate every row. -> (valid rows, [error lines], error count)
+    # progress(rows_seen) is called every 1000 rows.
+    valid = 0
+    errors = []
+    error_count = 0
+    seen = 0
+
+    def fail(where, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append(f"{where}: {message}")
+
+    try:
+        with _open_text(path, gzipped) as f:
+            for where, record in iter_records(f, fmt):
+                seen += 1
+                if seen > IMPORT_MAX_ROWS:
+                    fail(where, f"more than {IMPORT_MAX_ROWS} rows – split the file")
+                    break
+                if progress is not None and seen % 1000 == 0:
+                    progress(seen)
+
+                if isinstance(record, str):
+                    fail(where, record)
+                    continue
+                try:
+                    to_row(record)
+                except ValueError as e:
+                    fail(where, str(e))
+                    continue
+                valid += 1
+    except (OSError, UnicodeDecodeError, csv.Error, EOFError) as e:
+        fail("file", f"can't read it ({e})")
+
+    return valid, errors, error_count
+
+
+def insert_questions(conn, quiz_id, path, fmt, gzipped):
+    # Pass 2 – runs on the DB writer (Database.run): one executemany fed
+    # by the parser, inside the writer's transaction. Only call after
+    # check_file() found no errors.
+    def rows():
+        with _open_text(path, gzipped) as f:
+            for _, record in iter_records(f, fmt):
+                yield (quiz_id, *to_row(record))
+
+    cursor = conn.executemany(INSERT_SQL, rows())
+    try:
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
@@ -0,0 +1,83 @@
+# keyboards.py
+# Play-mode inline keyboards. Each (question, layout) is rendered the
+# first time a player reaches it and then shared by every player of that
+# snapshot. PTB objects are immutable, so reuse is safe. Rendering on
+# demand keeps a cache miss (every admin edit is one) off the event loop.
+
+from typing import NamedTuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+# Rough heap cost of what a render allocates (measured on PTB 21),
+# charged to the quiz cache's byte budget as keyboards get rendered
+_BUTTON_BYTES = 550         # button, its label and its memo entry
+_MARKUP_BYTES = 500
+_ROW_BYTES = 40
+
+
+class QuestionKeyboards(NamedTuple):
+    ask: InlineKeyboardMarkup   # PLAY_ANSWER|{i} buttons
+    answered: tuple             # chosen display index -> locked ✅ / ❌ keyboard
+                                # (answered[correct] marks only the answer: used on timeout)
+
+
+class SnapshotKeyboards:
+    # [question index, layout index] -> QuestionKeyboards, rendered lazily
+
+    def __init__(self, snapshot):
+        self.questions = snapshot.questions
+        self.size = 0           # bytes rendered so far
+        self.on_grow = None     # on_grow(bytes): set by QuizCache while it holds the snapshot
+
+        self._rendered = {}     # (qi, li) -> QuestionKeyboards
+        self._buttons = {}      # qi -> {(label, callback_data): button}, shared by its layouts
+
+    def __getitem__(self, key):
+        keyboards = self._rendered.get(key)
+        if keyboards is None:
+            keyboards = self._rendered[key] = self._render(*key)
+        return keyboards
+
+    def _render(self, qi, li):
+        # Buttons depend on the option (and its position for "ask"), not on
+        # the layout, so layouts share them
+        buttons = self._buttons.setdefault(qi, {})
+        new_buttons = len(buttons)
+
+        def button(label, callback_data):
+            b = buttons.get((label, callback_data))
+            if b is None:
+                b = buttons[(label, callback_data)] = InlineKeyboardButton(label, callback_data=callback_data)
+            return b
+
+        layout = self.questions[qi].layouts[li]
+        options, correct = layout.options, layout.correct
+        answered = []
+        for chosen in range(len(options)):
+            rows = []
+            for i, option in enumerate(options):
+                if i == correct:
+                    label = f"✅ {option}"
+                elif i == chosen:
+                    label = f"❌ {option}"
+                else:
+                    label = option
+                rows.append([button(label, "LOCKED")])
+            answered.append(InlineKeyboardMarkup(rows))
+
+        keyboards = QuestionKeyboards(
+            ask=InlineKeyboardMarkup([[button(option, f"PLAY_ANSWER|{i}")] for i, option in enumerate(options)]),
+            answered=tuple(answered),
+        )
+
+        markups = len(options) + 1
+        grown = ((len(buttons) - new_buttons) * _BUTTON_BYTES
+                 + markups * (_MARKUP_BYTES + len(options) * _ROW_BYTES))
+        self.size += grown
+        if self.on_grow is not None:
+            self.on_grow(grown)
+        return keyboards
+
+
+def render_keyboards(snapshot):
+    return SnapshotKeyboards(snapshot)
@@ -0,0 +1,205 @@
+# leaderboard.py
+# Group leaderboards: a ranked in-memory board per quiz, write-behind
+# persistence into the `leaderboard` table plus the message bindings,
+# and a fast reload on startup.
+
+import asyncio
+import os
+import time
+
+from sortedcontainers import SortedList
+
+LB_FLUSH_INTERVAL = float(os.environ.get("LB_FLUSH_INTERVAL", "2"))
+
+
+# =========================
+# RANKED BOARD
+# =========================
+class RankedLeaderboard:
+    # user_id -> entry dict, plus a SortedList of (-score, reached_at, user_id):
+    # O(log n) updates and rank lookups, O(log n + k) page slices.
+    # Ties go to whoever reached the score first, then the lower user_id.
+
+    def __init__(self):
+        self._entries = {}
+        self._ranking = SortedList()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, user_id):
+        return user_id in self._entries
+
+    def get(self, user_id):
+        return self._entries.get(user_id)
+
+    def _key(self, user_id, entry):
+        return (-entry["score"], entry["reached_at"], user_id)
+
+    def record(self, user_id, name, score, attempts, reached_at=None):
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if entry["score"] == score:
+                # Same score → keep the original tie-break position
+                entry["name"] = name
+                entry["attempts"] = attempts
+                return entry
+            self._ranking.remove(self._key(user_id, entry))
+
+        entry = {
+            "name": name,
+            "score": score,
+            "attempts": attempts,
+            "reached_at": reached_at if reached_at is not None else time.time_ns() // 1_000_000,
+        }
+        self._entries[user_id] = entry
+        self._ranking.add(self._key(user_id, entry))
+        return entry
+
+    def rank(self, user_id):
+        # 1-based position, None when the user isn't on the board
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        return self._ranking.index(self._key(user_id, entry)) + 1
+
+    def page(self, start, end):
+        return [self._entries[user_id] for _, _, user_id in self._ranking.islice(start, end)]
+
+
+# =========================
+# WRITE-BEHIND STORE
+# =========================
+class LeaderboardStore:
+    # Handlers only mark rows dirty (no await, no I/O). A background
+    # task flushes everything dirty in one transaction per interval.
+
+    def __init__(self, db, interval=LB_FLUSH_INTERVAL):
+        self.db = db
+        self.interval = interval
+
+        self._scores = {}       # (quiz_id, chat_id, user_id) -> (name, score, attempts, reached_at)
+        self._resets = set()    # (quiz_id, chat_id) whose old rows must go first
+        self._bindings = {}     # (quiz_id, chat_id) -> (message_id, page)
+        self._task = None
+
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    # ---------- marking ----------
+    def save_entry(self, quiz_id, chat_id, user_id, entry):
+        self._scores[(quiz_id, chat_id, user_id)] = (
+            entry["name"], entry["score"], entry["attempts"], entry["reached_at"]
+        )
+
+    def reset(self, quiz_id, chat_id):
+        # Drop anything queued for this board; the flush deletes stored rows
+        for key in [k for k in self._scores if k[0] == quiz_id and k[1] == chat_id]:
+            del self._scores[key]
+        self._resets.add((quiz_id, chat_id))
+
+    def bind_message(self, quiz_id, chat_id, message_id, page=0):
+        self._bindings[(quiz_id, chat_id)] = (message_id, page)
+
+    @property
+    def pending(self):
+        return len(self._scores) + len(self._resets) + len(self._bindings)
+
+    # ---------- flushing ----------
+    async def flush(self):
+        if not self.pending:
+            return
+
+        scores, self._scores = self._scores, {}
+        resets, self._resets = self._resets, set()
+        bindings, self._bindings = self._bindings, {}
+
+        def apply(conn):
+            conn.executemany(
+                "DELETE FROM leaderboard WHERE quiz_id=? AND chat_id=?",
+                list(resets)
+            )
+            conn.executemany(
+                "INSERT INTO leaderboard (quiz_id, chat_id, user_id, username, score, attempts, reached_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(quiz_id, chat_id, user_id) DO UPDATE SET "
+                "username=excluded.username, score=excluded.score, "
+                "attempts=excluded.attempts, reached_at=excluded.reached_at",
+                [(q, c, u, *row) for (q, c, u), row in scores.items()]
+            )
+            # One leaderboard message per quiz per chat
+            conn.executemany(
+                "INSERT INTO group_lb_messages (quiz_id, chat_id, message_id, page) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(quiz_id, chat_id) DO UPDATE SET "
+                "message_id=excluded.message_id, page=excluded.page",
+                [(q, c, m, p) for (q, c), (m, p) in bindings.items()]
+            )
+
+        try:
+            await self.db.run(apply)
+        except Exception:
+            # Put the batch back (newer marks win) and retry next round
+            for key, value in scores.items():
+                self._scores.setdefault(key, value)
+            self._resets |= resets
+            for key, value in bindings.items():
+                self._bindings.setdefault(key, value)
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += len(scores) + len(bindings)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Leaderboard flush failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    # ---------- startup reload ----------
+    async def load(self):
+        # -> (boards, bindings) keyed by (quiz_id, chat_id), shaped like
+        #    GROUP_LEADERBOARDS / GROUP_LB_MESSAGES
+        def fn(conn):
+            bindings = conn.execute(
+                "SELECT quiz_id, chat_id, message_id, page FROM group_lb_messages"
+            ).fetchall()
+            # Every chat with results, bound to a message or not: a live
+            # game in a chat the quiz was never posted to still counts
+            # toward its players' attempts
+            rows = conn.execute("""
+                SELECT quiz_id, chat_id, user_id, username, score, attempts, reached_at
+                FROM leaderboard
+            """).fetchall()
+            return bindings, rows
+
+        binding_rows, score_rows = await self.db.read(fn)
+
+        bindings = {
+            (quiz_id, chat_id): {"chat_id": chat_id, "message_id": message_id, "page": page}
+            for quiz_id, chat_id, message_id, page in binding_rows
+        }
+
+        boards = {}
+        for quiz_id, chat_id, user_id, name, score, attempts, reached_at in score_rows:
+            board = boards.get((quiz_id, chat_id))
+            if board is None:
+                board = boards[(quiz_id, chat_id)] = RankedLeaderboard()
+            board.record(user_id, name, score, attempts, reached_at)
+
+        return boards, bindings
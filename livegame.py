@@ -0,0 +1,82 @@
+# livegame.py
+# State of a group live quiz: each question is posted once for the whole
+# chat, the first tap of every player counts, scores stay in memory
+# until the game ends.
+
+import random
+from array import array
+
+from playsession import question_order
+
+LIVE_DEFAULT_TIMER = 30     # s per question when the quiz has no timer
+
+
+class LiveGame:
+    __slots__ = ("quiz_id", "chat_id", "snapshot", "order", "layouts", "step", "timer",
+                 "started_by", "message_id", "answers", "correct", "scores", "names")
+
+    def __init__(self, snapshot, chat_id, started_by, rng=random):
+        self.quiz_id = snapshot.quiz_id
+        self.chat_id = chat_id
+        self.snapshot = snapshot
+        self.started_by = started_by
+        self.timer = snapshot.timer or LIVE_DEFAULT_TIMER
+
+        self.order = question_order(len(snapshot.questions))
+        if snapshot.shuffle_q:
+            rng.shuffle(self.order)
+        # One option order per question, shared by the whole chat
+        self.layouts = array("B", (
+            rng.randrange(len(q.layouts)) if snapshot.shuffle_a else 0
+            for q in snapshot.questions
+        ))
+
+        self.step = 0
+        self.message_id = None
+        self.answers = {}       # user_id -> chosen display index (current question)
+        self.correct = 0        # right answers to the current question
+        self.scores = {}        # user_id -> right answers so far
+        self.names = {}         # user_id -> first name
+
+    # ---------- state ----------
+    @property
+    def total(self):
+        return len(self.order)
+
+    @property
+    def finished(self):
+        return self.step >= len(self.order)
+
+    def current(self):
+        # -> (Question, Layout shown in the chat)
+        qi = self.order[self.step]
+        q = self.snapshot.questions[qi]
+        return q, q.layouts[self.layouts[qi]]
+
+    # ---------- answers ----------
+    def answer(self, user_id, name, chosen):
+        # False if this player already answered the current question
+        if user_id in self.answers:
+            return False
+        self.answers[user_id] = chosen
+        self.names[user_id] = name
+        self.scores.setdefault(user_id, 0)
+
+        _, layout = self.current()
+        if chosen == layout.correct:
+            self.scores[user_id] += 1
+            self.correct += 1
+        return True
+
+    def advance(self):
+        # -> (right, answered) for the question just closed
+        result = (self.correct, len(self.answers))
+        self.answers = {}
+        self.correct = 0
+        self.step += 1
+        return result
+
+    def standings(self):
+        # [(user_id, name, score)], best first; ties keep join order
+        ranked = sorted(self.scores.items(), key=lambda item: -item[1])
+        return [(user_id, self.names[user_id], score) for user_id, score in ranked]
@@ -0,0 +1,162 @@
+# outbound.py
+# Coalesced message edits for messages many players update at once
+# (group leaderboards). Each message gets at most one edit per window,
+# rendered from the latest state at send time.
+
+import asyncio
+import os
+from collections import OrderedDict
+
+from telegram.error import BadRequest, RetryAfter
+
+from ratelimit import mark_background, retry_seconds
+
+EDIT_WINDOW = float(os.environ.get("LB_EDIT_WINDOW", "3"))
+EDIT_MAX_RETRIES = 5
+# Messages whose on-screen (text, markup) is remembered after their slot
+# is dropped, so re-rendering an unchanged board still sends nothing
+EDIT_MEMORY = 4096
+
+
+class _Slot:
+    __slots__ = ("render", "urgent", "wake", "task", "last")
+
+    def __init__(self):
+        self.render = None      # latest pending render, None when idle
+        self.urgent = False
+        self.wake = asyncio.Event()
+        self.task = None
+        self.last = None        # (text, markup) Telegram currently shows
+
+
+class EditCoalescer:
+
+    def __init__(self, bot=None, window=EDIT_WINDOW, max_retries=EDIT_MAX_RETRIES):
+        self.bot = bot          # set once the Application exists
+        self.window = window
+        self.max_retries = max_retries
+        self._slots = {}        # (chat_id, message_id) -> _Slot, only while an edit is in flight
+        self._last = OrderedDict()  # (chat_id, message_id) -> what Telegram shows (LRU)
+
+        self.requested = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.skipped = 0
+        self.retried = 0
+        self.failed = 0
+
+    def schedule(self, chat_id, message_id, render, urgent=False):
+        # render: async () -> (text, reply_markup) or None to drop the edit.
+        # urgent edits (a user pressing a button) skip the remaining window.
+        self.requested += 1
+
+        key = (chat_id, message_id)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _Slot()
+            slot.last = self._last.pop(key, None)
+
+        if slot.render is not None:
+            self.coalesced += 1
+        slot.render = render
+
+        if urgent:
+            slot.urgent = True
+            slot.wake.set()
+
+        if slot.task is None or slot.task.done():
+            slot.task = asyncio.create_task(self._run(key, slot))
+
+    def forget(self, chat_id, message_id):
+        self._last.pop((chat_id, message_id), None)
+        slot = self._slots.pop((chat_id, message_id), None)
+        if slot is not None and slot.task is not None:
+            slot.task.cancel()
+
+    async def stop(self):
+        # Shutdown: cancel edits still waiting out their window or a 429
+        slots, self._slots = list(self._slots.values()), {}
+        tasks = [slot.task for slot in slots if slot.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _release(self, key, slot):
+        # Nothing newer queued → drop the slot, keep only what's on screen
+        if self._slots.get(key) is not slot or slot.render is not None:
+            return
+        del self._slots[key]
+        if slot.last is not None:
+            self._last[key] = slot.last
+            if len(self._last) > EDIT_MEMORY:
+                self._last.popitem(last=False)
+
+    @property
+    def pending(self):
+        return sum(1 for slot in self._slots.values() if slot.render is not None)
+
+    async def _run(self, key, slot):
+        # Scheduled from player handlers, but never worth delaying a player for
+        mark_background()
+        try:
+            while slot.render is not None:
+                if not slot.urgent:
+                    try:
+                        await asyncio.wait_for(slot.wake.wait(), self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                slot.wake.clear()
+                slot.urgent = False
+
+                try:
+                    await self._send(key, slot)
+                except Exception as e:
+                    self.failed += 1
+                    print(f"⚠️ Edit of {key} failed: {e}")
+        finally:
+            self._release(key, slot)
+
+    async def _send(self, key, slot):
+        chat_id, message_id = key
+        delay = 1.0
+
+        for _ in range(self.max_retries):
+            render, slot.render = slot.render, None
+            rendered = await render()
+            if rendered is None:
+                return
+
+            # 🔁 Same text + buttons as on screen → nothing to send
+            if rendered == slot.last:
+                self.skipped += 1
+                return
+
+            text, markup = rendered
+            try:
+                await self.bot.edit_message_text(
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    text=text,
+                    reply_markup=markup,
+                    parse_mode="Markdown"
+                )
+            except RetryAfter as e:
+                # ⏳ Flood control: wait it out, then send whatever is newest
+                self.retried += 1
+                await asyncio.sleep(max(retry_seconds(e), delay))
+                delay = min(delay * 2, 60.0)
+                if slot.render is None:
+                    slot.render = render
+                continue
+            except BadRequest as e:
+                if "message is not modified" in str(e).lower():
+                    slot.last = rendered
+                    self.skipped += 1
+                    return
+                raise
+
+            slot.last = rendered
+            self.sent += 1
+            return
+
+        self.failed += 1
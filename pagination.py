@@ -0,0 +1,52 @@
+# pagination.py
+# Keyset pagination for the bot's lists. A page is read from the index
+# on its sort key: the next page starts after the last row on screen,
+# the previous one ends before the first. No OFFSET, and no fetching
+# every row to slice it.
+
+
+async def list_page(db, state, name, select, params, sort, tie, key, total, per_page, move=0):
+    # -> (rows, page, pages). move: +1 next, -1 previous, 0 same page.
+    # select: "SELECT … FROM … WHERE …" (rows on one page); sort / tie:
+    # the ORDER BY columns; key(row) -> (sort value, tie value).
+    # state[name] = (page, first key, last key), kept between calls
+    # (the user's user_data).
+    page, first, last = state.get(name) or (0, None, None)
+
+    async def seek(cond="", bound=None, desc=False):
+        order = " DESC" if desc else ""
+        bound_params = (bound[0], bound[0], bound[1]) if bound else ()
+        rows = await db.fetchall(
+            f"{select}{cond} ORDER BY {sort}{order}, {tie}{order} LIMIT ?",
+            (*params, *bound_params, per_page)
+        )
+        return rows[::-1] if desc else rows
+
+    after = f" AND {sort} >= ? AND ({sort} > ? OR {tie} > ?)"
+    before = f" AND {sort} <= ? AND ({sort} < ? OR {tie} < ?)"
+    starting_at = f" AND {sort} >= ? AND ({sort} > ? OR {tie} >= ?)"
+
+    rows = []
+    if first is not None and page + move > 0:
+        if move > 0:
+            rows = await seek(after, last)
+            page += 1 if rows else 0
+        if not rows and move >= 0:
+            # Same page (or Next past the end): from its first row on
+            rows = await seek(starting_at, first)
+        if not rows:
+            # Prev, or everything on this page was deleted
+            rows = await seek(before, first, desc=True)
+            page -= 1
+            if len(rows) < per_page or page == 0:
+                rows = []
+
+    # Page 1 always reads from the top
+    if not rows:
+        page = 0
+        rows = await seek()
+
+    pages = max(1, (total - 1) // per_page + 1)
+    page = min(page, pages - 1)
+    state[name] = (page, key(rows[0]), key(rows[-1])) if rows else None
+    return rows, page, pages
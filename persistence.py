@@ -0,0 +1,130 @@
+# persistence.py
+# SQLite-backed PTB persistence for user_data (play sessions, admin state).
+# PTB already tracks which users were touched since the last run; we
+# additionally skip users whose pickled state did not change, and write
+# the rest in one batched transaction through the shared Database writer.
+
+import asyncio
+import hashlib
+import os
+import pickle
+import time
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+PERSIST_INTERVAL = float(os.environ.get("PERSIST_INTERVAL", "5"))
+
+
+def _digest(blob):
+    return hashlib.blake2b(blob, digest_size=8).digest()
+
+
+class SQLitePersistence(BasePersistence):
+
+    def __init__(self, db, update_interval=PERSIST_INTERVAL):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.db = db
+        self._digests = {}      # user_id -> digest of the last stored blob
+        self._pending = {}      # user_id -> blob waiting for the next batch
+        self._write_task = None
+
+        self.rows_written = 0
+        self.rows_skipped = 0
+
+    # ---------- loading ----------
+    async def get_user_data(self):
+        rows = await self.db.fetchall("SELECT user_id, data FROM user_state")
+        user_data = {}
+        for user_id, blob in rows:
+            try:
+                user_data[user_id] = pickle.loads(blob)
+            except Exception:
+                # Unreadable state (e.g. from an older build) – start fresh
+                continue
+            self._digests[user_id] = _digest(blob)
+        return user_data
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        return {}
+
+    # ---------- dirty tracking + batched writes ----------
+    async def update_user_data(self, user_id, data):
+        blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = _digest(blob)
+        if self._digests.get(user_id) == digest:
+            self.rows_skipped += 1
+            return
+
+        self._digests[user_id] = digest
+        self._pending[user_id] = blob
+
+        # PTB calls us once per dirty user in a tight loop; the write
+        # runs after that loop, so the whole round lands in one batch.
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.create_task(self._write_pending())
+
+    async def _write_pending(self):
+        await asyncio.sleep(0)
+        while self._pending:
+            batch, self._pending = self._pending, {}
+            now = int(time.time())
+            try:
+                await self.db.executemany(
+                    "INSERT INTO user_state (user_id, data, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET data=excluded.data, updated_at=excluded.updated_at",
+                    [(user_id, blob, now) for user_id, blob in batch.items()]
+                )
+            except Exception:
+                # Forget the digests so the next round retries these users
+                for user_id in batch:
+                    self._digests.pop(user_id, None)
+                raise
+            self.rows_written += len(batch)
+
+    async def drop_user_data(self, user_id):
+        self._pending.pop(user_id, None)
+        self._digests.pop(user_id, None)
+        await self.db.execute("DELETE FROM user_state WHERE user_id=?", (user_id,))
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def flush(self):
+        if self._write_task is not None:
+            await self._write_task
+        if self._pending:
+            await self._write_pending()
+
+    # ---------- not stored ----------
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def update_conversation(self, name, key, new_state):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
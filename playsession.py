@@ -0,0 +1,108 @@
+# playsession.py
+# Compact per-player play state.
+# The questions live once in the shared QuizSnapshot; a session only
+# keeps the player's question order, option layouts, index and score.
+
+import random
+from array import array
+
+
+def question_order(count):
+    # 0..count-1 as an array: 2 bytes per question while the indexes fit,
+    # 4 beyond that (nothing caps how many questions a quiz has)
+    return array("H" if count <= 0x10000 else "I", range(count))
+
+
+class PlaySession:
+    __slots__ = ("quiz_id", "snapshot", "order", "layouts", "index", "score", "timed_out",
+                 "locked", "message_id")
+
+    def __init__(self, quiz_id, snapshot, order, layouts, index=0, score=0, timed_out=0):
+        self.quiz_id = quiz_id
+        self.snapshot = snapshot
+        self.order = order          # array('H' / 'I', see question_order): snapshot question index per step
+        self.layouts = layouts      # array('B') or None: layout drawn per snapshot question
+        self.index = index
+        self.score = score
+        self.timed_out = timed_out
+        self.locked = False
+        self.message_id = None      # message of the current question (not persisted)
+
+    @classmethod
+    def start(cls, snapshot, rng=random):
+        order = question_order(len(snapshot.questions))
+        if snapshot.shuffle_q:
+            rng.shuffle(order)
+
+        layouts = None
+        if snapshot.shuffle_a:
+            layouts = array("B", (rng.randrange(len(q.layouts)) for q in snapshot.questions))
+
+        return cls(snapshot.quiz_id, snapshot, order, layouts)
+
+    # ---------- persistence ----------
+    def __reduce__(self):
+        # Pickle only the per-player part; the snapshot is re-attached
+        # from the quiz cache after a restart (see attach()).
+        layouts = self.layouts.tobytes() if self.layouts is not None else None
+        return _restore_session, (
+            self.quiz_id, self.order.tobytes(), None, self.index, self.score, self.timed_out, layouts,
+            self.order.typecode,
+        )
+
+    def attach(self, snapshot):
+        # False when the quiz changed shape since the session was saved
+        if snapshot is None or len(snapshot.questions) != len(self.order):
+            return False
+        if self.layouts is not None:
+            if len(self.layouts) != len(snapshot.questions):
+                return False
+            if any(li >= len(q.layouts) for li, q in zip(self.layouts, snapshot.questions)):
+                return False
+        self.snapshot = snapshot
+        return True
+
+    # ---------- state ----------
+    @property
+    def total(self):
+        return len(self.order)
+
+    @property
+    def finished(self):
+        return self.index >= len(self.order)
+
+    def advance(self):
+        self.index += 1
+
+    # ---------- current question ----------
+    def _position(self):
+        qi = self.order[self.index]
+        return qi, (self.layouts[qi] if self.layouts is not None else 0)
+
+    def current(self):
+        # -> (Question, options in display order, correct display index)
+        qi, li = self._position()
+        q = self.snapshot.questions[qi]
+        layout = q.layouts[li]
+        return q, layout.options, layout.correct
+
+    def keyboards(self):
+        # Shared keyboards of the current question's layout
+        return self.snapshot.keyboards[self._position()]
+
+
+def _restore_session(quiz_id, order, perms, index, score, timed_out=0, layouts=None, order_type="H"):
+    # perms: per-option permutations pickled before layouts existed. They
+    # can't be mapped onto layouts, so leave an empty order for attach()
+    # to reject (the player just starts again).
+    if perms is not None:
+        order = b""
+    return PlaySession(
+        quiz_id,
+        None,
+        array(order_type, order),
+        array("B", layouts) if layouts is not None else None,
+        index,
+        score,
+        timed_out,
+    )
@@ -0,0 +1,110 @@
+# processor.py
+# Concurrent update processing with per-key ordering.
+# Different players run in parallel; one player's updates (and one
+# group's commands / leaderboard buttons) still run strictly in order.
+
+import asyncio
+import contextlib
+import os
+
+from telegram.ext import BaseUpdateProcessor
+
+MAX_CONCURRENT_UPDATES = int(os.environ.get("MAX_CONCURRENT_UPDATES", "64"))
+
+_GROUP_CHATS = ("group", "supergroup")
+
+# Group buttons that only touch their own player's state: ordered per
+# user, so hundreds of players tapping at once don't queue on the chat
+_PER_USER_GROUP_CALLBACKS = ("LIVE_ANSWER|",)
+
+
+def user_key(user_id):
+    return ("user", user_id)
+
+
+def chat_key(chat_id):
+    return ("chat", chat_id)
+
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+
+    def __init__(self, max_concurrent_updates=MAX_CONCURRENT_UPDATES):
+        super().__init__(max_concurrent_updates)
+        self._locks = {}        # key -> [asyncio.Lock, holders + waiters]
+
+        self.pending = 0        # updates handed to us and not finished (running or waiting)
+        self.processed = 0
+        self.contended = 0
+
+    @staticmethod
+    def key_for(update):
+        chat = update.effective_chat
+        user = update.effective_user
+
+        # 👥 Group commands and buttons on group messages touch chat-wide
+        # state (the group's leaderboard message), so order them per chat
+        if chat is not None and chat.type in _GROUP_CHATS:
+            message = update.effective_message
+            query = update.callback_query
+            if query is not None:
+                if not (query.data or "").startswith(_PER_USER_GROUP_CALLBACKS):
+                    return chat_key(chat.id)
+            elif message is not None and message.text and message.text.startswith("/"):
+                return chat_key(chat.id)
+
+        if user is not None:
+            return user_key(user.id)
+        if chat is not None:
+            return chat_key(chat.id)
+        return None
+
+    @contextlib.asynccontextmanager
+    async def lock(self, key):
+        # Also taken by code running outside an update (e.g. timers), so
+        # it can't interleave with that user's taps
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        elif entry[0].locked():
+            self.contended += 1
+
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    @property
+    def active_keys(self):
+        return len(self._locks)
+
+    async def process_update(self, update, coroutine):
+        # Queue on the key first, then take a concurrency slot: a user
+        # hammering one button waits in their own line without holding
+        # slots other players need.
+        # PTB takes updates off update_queue as soon as they arrive, so
+        # the backlog is here: counted for the webhook's backpressure
+        self.pending += 1
+        try:
+            key = self.key_for(update)
+            if key is None:
+                await super().process_update(update, coroutine)
+                return
+
+            async with self.lock(key):
+                await super().process_update(update, coroutine)
+        finally:
+            self.pending -= 1
+
+    async def do_process_update(self, update, coroutine):
+        self.processed += 1
+        await coroutine
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
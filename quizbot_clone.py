@@ -2,13 +2,18 @@
 # FULL STABLE VERSION – TIMER & SHUFFLE FIXED
 # All Edit buttons now open real menus
 
-import uuid
-import sqlite3
+import asyncio
+import io
+import json
 import os
+import tempfile
+import uuid
 from telegram import (
     Update,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
+    InputMediaPhoto,
+    Poll,
     ReplyKeyboardRemove,
 )
 
@@ -18,12 +23,30 @@ from telegram.ext import (
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
+    PollAnswerHandler,
     filters,
 )
 
+from telegram.error import BadRequest
 from telegram.ext import InlineQueryHandler
 from telegram import InlineQueryResultArticle, InputTextMessageContent
 
+from quizdb import Database, MAX_OPTIONS, MIN_OPTIONS, pack_options, unpack_options
+from quizcache import PLAY_MODES, QuizCache
+from playsession import PlaySession
+from keyboards import render_keyboards
+from livegame import LiveGame
+from importer import check_file, detect_format, insert_questions
+from exporter import EXPORT_FORMATS, export_filename, export_quiz
+from persistence import SQLitePersistence
+from leaderboard import LeaderboardStore, RankedLeaderboard
+from outbound import EditCoalescer
+from router import CallbackRouter
+from pagination import list_page
+from processor import KeyedUpdateProcessor, chat_key, user_key
+from timerwheel import TimerWheel
+from ratelimit import PriorityRateLimiter, mark_interactive
+
 # =========================
 # CONFIG
 # =========================
@@ -36,97 +59,127 @@ OWNER_USER_ID = 6254422846
 BOT_USERNAME = "EucresiaBot"
 DB_FILE = os.path.join(os.getcwd(), "quizbot.db")
 QUESTIONS_PER_PAGE = 10
+OPTION_KEYCAPS = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"]
+PLAY_MODE_LABELS = {
+    "classic": "Classic (new message per question)",
+    "inplace": "In-place (one message)",
+    "poll": "Quiz polls (Telegram-native)",
+}
+
+# Telegram's limits for quiz polls
+POLL_QUESTION_MAX = 300
+POLL_OPTION_MAX = 100
+POLL_EXPLANATION_MAX = 200
+POLL_OPEN_PERIOD = (5, 600)
+POLL_GRACE = 1          # s after a poll closes before moving on (late answers)
 
 # =========================
-# GROUP QUIZ STATE (IN-MEMORY)
+# GROUP QUIZ STATE (IN-MEMORY, MIRRORED TO DB BY lb_store)
 # =========================
-GROUP_QUIZZES = {}      # inline_message_id -> quiz_id
+# Keyed by (quiz_id, chat_id): the same quiz can run in many groups,
+# each with its own board. chat_id 0 = played outside any group.
+GROUP_QUIZZES = {}      # (quiz_id, chat_id) -> {"chat_id": int, "message_id": int}
 
-GROUP_LEADERBOARDS = {}  # quiz_id -> {
+GROUP_LEADERBOARDS = {}  # (quiz_id, chat_id) -> RankedLeaderboard of
                          #   user_id: {
                          #       "name": str,
                          #       "score": int,
-                         #       "answered": int
+                         #       "attempts": int,
+                         #       "reached_at": int
                          #   }
-                         # }
 
-GROUP_LB_MESSAGES = {}   # quiz_id -> {
+GROUP_LB_MESSAGES = {}   # (quiz_id, chat_id) -> {
                          #   "chat_id": int,
                          #   "message_id": int,
                          #   "page": int
                          # }
 
+GROUP_LB_CHATS = {}      # quiz_id -> {chat_id, ...} with a leaderboard message
+
 # =========================
-# DATABASE
+# POLL MODE STATE (IN-MEMORY)
 # =========================
-conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-cur = conn.cursor()
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS leaderboard (
-    quiz_id TEXT,
-    chat_id INTEGER,
-    user_id INTEGER,
-    username TEXT,
-    score INTEGER,
-    PRIMARY KEY (quiz_id, chat_id, user_id)
-)
-""")
-conn.commit()
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS quizzes (
-    quiz_id TEXT PRIMARY KEY,
-    owner_id INTEGER,
-    title TEXT,
-    description TEXT,
-    folder TEXT DEFAULT 'Default',
-    shuffle_q INTEGER,
-    shuffle_a INTEGER,
-    timer INTEGER
-)
-""")
+PLAY_POLLS = {}          # poll_id -> (user_id, question step) of the open quiz poll
+USER_POLLS = {}          # user_id -> poll_id, at most one open poll per player
 
-cur.execute("""
-CREATE TABLE IF NOT EXISTS folders (
-    owner_id INTEGER,
-    name TEXT,
-    UNIQUE(owner_id, name)
-)
-""")
-conn.commit()
-
-cur.execute("""
-CREATE TABLE IF NOT EXISTS questions (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    quiz_id TEXT,
-    question TEXT,
-    image_file_id TEXT,
-    options TEXT,
-    correct INTEGER,
-    explanation TEXT
-)
-""")
+# =========================
+# GROUP LIVE MODE STATE (IN-MEMORY)
+# =========================
+LIVE_GAMES = {}          # chat_id -> LiveGame, at most one per group
 
-conn.commit()
-# ===== RUN ONCE: ADD FOLDER COLUMN IF MISSING =====
+# =========================
+# DATABASE
+# =========================
+db = Database(DB_FILE)
+quiz_cache = QuizCache(db, render=render_keyboards)
+persistence = SQLitePersistence(db)
+lb_store = LeaderboardStore(db)
+lb_edits = EditCoalescer()
+
+# Updates run concurrently; each user's (and each group's) stay in order
+update_processor = KeyedUpdateProcessor()
+
+def user_lock(user_id):
+    # For work outside a handler that touches a player's state (timers).
+    # Not re-entrant: never take it inside that user's own update.
+    return update_processor.lock(user_key(user_id))
+
+def chat_lock(chat_id):
+    # Same for a group's chat-wide state (live quiz); group buttons run under it
+    return update_processor.lock(chat_key(chat_id))
+
+# ⏱ Per-question timers for every running quiz, keyed by user_id
+play_timers = TimerWheel()
+
+# 🚦 Outbound flow control; players' traffic goes first (mark_interactive)
+rate_limiter = PriorityRateLimiter()
+
+# 📊 quiz_id -> number of questions (list footers, quiz menu)
+question_counts = {}
+
+def invalidate_quiz(quiz_id):
+    # Every edit to a quiz or its questions must come through here
+    quiz_cache.invalidate(quiz_id)
+    question_counts.pop(quiz_id, None)
+    # 🔄 Title, settings and question count show on every group message
+    refresh_group_leaderboards(quiz_id)
+
+async def question_count(quiz_id):
+    count = question_counts.get(quiz_id)
+    if count is None:
+        count = question_counts[quiz_id] = await db.fetchval(
+            "SELECT COUNT(*) FROM questions WHERE quiz_id=?",
+            (quiz_id,)
+        )
+    return count
 
 # =========================
 # OWNER RESTORE
 # =========================
-def load_owner_from_db():
+async def load_owner_from_db():
     global OWNER_USER_ID
-    cur.execute("SELECT owner_id FROM quizzes LIMIT 1")
-    row = cur.fetchone()
+    row = await db.fetchone("SELECT owner_id FROM quizzes LIMIT 1")
     if row:
         OWNER_USER_ID = row[0]
 
-def ensure_default_folder():
-    cur.execute(
+async def ensure_default_folder():
+    await db.execute(
         "INSERT OR IGNORE INTO folders (owner_id, name) VALUES (?, 'Default')",
         (OWNER_USER_ID,)
     )
-    conn.commit()
+
+async def load_group_leaderboards():
+    # 🏆 Rebuild boards + message bindings so group messages keep updating
+    boards, bindings = await lb_store.load()
+
+    GROUP_LEADERBOARDS.update(boards)
+    GROUP_LB_MESSAGES.update(bindings)
+    for (quiz_id, chat_id), info in bindings.items():
+        GROUP_QUIZZES[(quiz_id, chat_id)] = {
+            "chat_id": chat_id,
+            "message_id": info["message_id"]
+        }
+        GROUP_LB_CHATS.setdefault(quiz_id, set()).add(chat_id)
 
 # =========================
 # UI
@@ -143,11 +196,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 # 🎮 PLAY MODE (deep link)
     if context.args and context.args[0].startswith("PLAY_"):
-        quiz_id = context.args[0].replace("PLAY_", "")
+        mark_interactive()
+        quiz_id, group_chat_id = parse_play_link(context.args[0])
 
         context.user_data.clear()
         context.user_data["play_quiz_id"] = quiz_id
-        context.user_data["group_chat_id"] = update.effective_chat.id
+        if group_chat_id is not None:
+            context.user_data["group_chat_id"] = group_chat_id
 
         await update.message.reply_text(
             "🎮 Quiz ready!\n\nPress the button below to start.",
@@ -167,6 +222,16 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # 🔒 Private chat but NOT owner
     if user_id != OWNER_USER_ID:
+        # 🔁 Unfinished quiz (e.g. after a restart) → resume at the same question
+        play = await get_play_session(context)
+        if play and not play.finished:
+            mark_interactive()
+            await update.message.reply_text(
+                f"🔁 Resuming your quiz at question {play.index + 1}/{play.total}."
+            )
+            await send_next_question(user_id, context)
+            return
+
         await update.message.reply_text(
             "👋 Hi!\n\nPlease open a quiz from a group to start answering.\nYou don’t have access to the admin panel."
         )
@@ -231,11 +296,11 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         qid = context.user_data["active_question_id"]
 
-        cur.execute(
+        await db.execute(
             "UPDATE questions SET image_file_id=? WHERE id=?",
             (file_id, qid)
         )
-        conn.commit()
+        invalidate_quiz(context.user_data["active_quiz_id"])
 
         context.user_data.pop("edit_q_field", None)
 
@@ -256,7 +321,7 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["new_question"]["image"] = file_id
 
     # Move to option 1
-    context.user_data["add_q_state"] = "NEW_Q_OPTION_1"
+    context.user_data["add_q_state"] = "NEW_Q_OPTIONS"
 
     await update.message.reply_text("➡️ Send option 1:")
 
@@ -271,11 +336,11 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if context.user_data.get("edit_q_field") == "EXPLANATION":
         qid = context.user_data["active_question_id"]
 
-        cur.execute(
+        await db.execute(
             "UPDATE questions SET explanation=? WHERE id=?",
             (text, qid)
         )
-        conn.commit()
+        invalidate_quiz(context.user_data["active_quiz_id"])
 
         context.user_data.pop("edit_q_field", None)
 
@@ -289,11 +354,11 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if edit_field == "TEXT":
         qid = context.user_data["active_question_id"]
 
-        cur.execute(
+        await db.execute(
             "UPDATE questions SET question=? WHERE id=?",
             (text, qid)
         )
-        conn.commit()
+        invalidate_quiz(context.user_data["active_quiz_id"])
 
         context.user_data.pop("edit_q_field", None)
 
@@ -318,44 +383,18 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
        # ================= OPTIONS FLOW =================
 
-    # ➡️ Option 1
-    if q_state == "NEW_Q_OPTION_1":
-        context.user_data["new_question"]["options"].append(text)
-        context.user_data["add_q_state"] = "NEW_Q_OPTION_2"
-        await update.message.reply_text("➡️ Send option 2:")
-        return
-
-    # ➡️ Option 2
-    if q_state == "NEW_Q_OPTION_2":
-        context.user_data["new_question"]["options"].append(text)
-        context.user_data["add_q_state"] = "NEW_Q_OPTION_3"
-        await update.message.reply_text("➡️ Send option 3:")
-        return
-
-    # ➡️ Option 3
-    if q_state == "NEW_Q_OPTION_3":
-        context.user_data["new_question"]["options"].append(text)
-        context.user_data["add_q_state"] = "NEW_Q_OPTION_4"
-        await update.message.reply_text("➡️ Send option 4:")
-        return
-
-    # ➡️ Option 4
-    if q_state == "NEW_Q_OPTION_4":
-        context.user_data["new_question"]["options"].append(text)
-        context.user_data["add_q_state"] = "NEW_Q_CORRECT"
-
+    # ➡️ Options 1..MAX_OPTIONS
+    if q_state == "NEW_Q_OPTIONS":
         opts = context.user_data["new_question"]["options"]
+        opts.append(text)
 
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(f"1️⃣ {opts[0]}", callback_data="CORRECT_0")],
-            [InlineKeyboardButton(f"2️⃣ {opts[1]}", callback_data="CORRECT_1")],
-            [InlineKeyboardButton(f"3️⃣ {opts[2]}", callback_data="CORRECT_2")],
-            [InlineKeyboardButton(f"4️⃣ {opts[3]}", callback_data="CORRECT_3")],
-        ])
+        if len(opts) >= MAX_OPTIONS:
+            await ask_correct_answer(update.message, context)
+            return
 
         await update.message.reply_text(
-            "✅ Choose the correct answer:",
-            reply_markup=keyboard
+            f"➡️ Send option {len(opts) + 1}:",
+            reply_markup=options_done_keyboard(opts, "OPTIONS_DONE")
         )
         return
 
@@ -364,25 +403,14 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         opts = context.user_data["edit_options"]
         opts.append(text)
 
-        if len(opts) < 4:
-            await update.message.reply_text(f"➡️ Send NEW option {len(opts) + 1}:")
+        if len(opts) >= MAX_OPTIONS:
+            await save_edited_options(update.message, context)
             return
 
-        # We now have 4 options
-        qid = context.user_data["active_question_id"]
-        options_text = "||".join(opts)
-
-        cur.execute(
-            "UPDATE questions SET options=? WHERE id=?",
-            (options_text, qid)
+        await update.message.reply_text(
+            f"➡️ Send NEW option {len(opts) + 1}:",
+            reply_markup=options_done_keyboard(opts, "EDIT_OPTIONS_DONE")
         )
-        conn.commit()
-
-        context.user_data.pop("edit_q_field", None)
-        context.user_data.pop("edit_options", None)
-
-        await update.message.reply_text("✅ Options updated.")
-        await show_questions_from_message(update.message, context)
         return
 
     # ================= EXPLANATION =================
@@ -399,25 +427,24 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ 'Default' folder already exists.")
             return
 
-        cur.execute(
+        if await db.fetchone(
             "SELECT 1 FROM folders WHERE owner_id=? AND name=?",
             (OWNER_USER_ID, folder)
-        )
-        if cur.fetchone():
+        ):
             await update.message.reply_text("❌ Folder already exists.")
             return
 
-        cur.execute(
-            "INSERT INTO folders (owner_id, name) VALUES (?, ?)",
-            (OWNER_USER_ID, folder)
-        )
-
         quiz_id = context.user_data["active_quiz_id"]
-        cur.execute(
-            "UPDATE quizzes SET folder=? WHERE quiz_id=? AND owner_id=?",
-            (folder, quiz_id, OWNER_USER_ID)
-        )
-        conn.commit()
+        await db.transaction([
+            (
+                "INSERT INTO folders (owner_id, name) VALUES (?, ?)",
+                (OWNER_USER_ID, folder)
+            ),
+            (
+                "UPDATE quizzes SET folder=? WHERE quiz_id=? AND owner_id=?",
+                (folder, quiz_id, OWNER_USER_ID)
+            ),
+        ])
 
         context.user_data["state"] = None
         await update.message.reply_text(f"✅ Folder '{folder}' created and quiz moved.")
@@ -432,19 +459,17 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ 'Default' folder already exists.")
             return
 
-        cur.execute(
+        if await db.fetchone(
             "SELECT 1 FROM folders WHERE owner_id=? AND name=?",
             (OWNER_USER_ID, folder)
-        )
-        if cur.fetchone():
+        ):
             await update.message.reply_text("❌ Folder already exists.")
             return
 
-        cur.execute(
+        await db.execute(
             "INSERT INTO folders (owner_id, name) VALUES (?, ?)",
             (OWNER_USER_ID, folder)
         )
-        conn.commit()
 
         context.user_data["state"] = None
         await update.message.reply_text(f"✅ Folder '{folder}' created.")
@@ -461,27 +486,25 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # Check if new name already exists
-        cur.execute(
+        if await db.fetchone(
             "SELECT 1 FROM folders WHERE owner_id=? AND name=?",
             (OWNER_USER_ID, new)
-        )
-        if cur.fetchone():
+        ):
             await update.message.reply_text("❌ A folder with this name already exists.")
             return
 
-        # Rename folder in folders table
-        cur.execute(
-            "UPDATE folders SET name=? WHERE owner_id=? AND name=?",
-            (new, OWNER_USER_ID, old)
-        )
-
-        # Rename folder in quizzes table
-        cur.execute(
-            "UPDATE quizzes SET folder=? WHERE owner_id=? AND folder=?",
-            (new, OWNER_USER_ID, old)
-        )
-
-        conn.commit()
+        await db.transaction([
+            # Rename folder in folders table
+            (
+                "UPDATE folders SET name=? WHERE owner_id=? AND name=?",
+                (new, OWNER_USER_ID, old)
+            ),
+            # Rename folder in quizzes table
+            (
+                "UPDATE quizzes SET folder=? WHERE owner_id=? AND folder=?",
+                (new, OWNER_USER_ID, old)
+            ),
+        ])
 
         context.user_data["state"] = None
         context.user_data.pop("rename_folder", None)
@@ -496,8 +519,9 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # ================= CREATE QUIZ =================
     if state == "WAIT_TITLE":
-        cur.execute(
-            "INSERT INTO quizzes VALUES (?, ?, ?, NULL, ?, 1, 1, 15)",
+        await db.execute(
+            "INSERT INTO quizzes (quiz_id, owner_id, title, description, folder, shuffle_q, shuffle_a, timer) "
+            "VALUES (?, ?, ?, NULL, ?, 1, 1, 15)",
             (
                 context.user_data["quiz_id"],
                 OWNER_USER_ID,
@@ -505,7 +529,6 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 context.user_data.get("current_folder", "Default")
             )
         )
-        conn.commit()
     
         # 🔑 SET ACTIVE QUIZ (IMPORTANT)
         context.user_data["active_quiz_id"] = context.user_data["quiz_id"]
@@ -520,8 +543,8 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # ================= EDIT TITLE =================
     if state == "EDIT_TITLE":
         quiz_id = context.user_data["active_quiz_id"]
-        cur.execute("UPDATE quizzes SET title=? WHERE quiz_id=?", (text, quiz_id))
-        conn.commit()
+        await db.execute("UPDATE quizzes SET title=? WHERE quiz_id=?", (text, quiz_id))
+        invalidate_quiz(quiz_id)
         context.user_data["state"] = None
         await update.message.reply_text("✅ Title updated.")
         await show_quiz_action_menu(update.message, context)
@@ -531,10 +554,10 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if state == "EDIT_DESC":
         quiz_id = context.user_data["active_quiz_id"]
         if text.upper() == "CLEAR":
-            cur.execute("UPDATE quizzes SET description=NULL WHERE quiz_id=?", (quiz_id,))
+            await db.execute("UPDATE quizzes SET description=NULL WHERE quiz_id=?", (quiz_id,))
         else:
-            cur.execute("UPDATE quizzes SET description=? WHERE quiz_id=?", (text, quiz_id))
-        conn.commit()
+            await db.execute("UPDATE quizzes SET description=? WHERE quiz_id=?", (text, quiz_id))
+        invalidate_quiz(quiz_id)
         context.user_data["state"] = None
         await update.message.reply_text("✅ Description updated.")
         await show_quiz_action_menu(update.message, context)
@@ -591,13 +614,19 @@ async def delete_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 async def show_quiz_folders(message, context):
-    cur.execute("""
+    rows = await db.fetchall("""
         SELECT name
         FROM folders
         WHERE owner_id=?
     """, (OWNER_USER_ID,))
 
-    rows = [row[0] for row in cur.fetchall()]
+    rows = [row[0] for row in rows]
+
+    # 🔢 Quizzes per folder, all folders in one pass over the index
+    counts = dict(await db.fetchall(
+        "SELECT folder, COUNT(*) FROM quizzes WHERE owner_id=? GROUP BY folder",
+        (OWNER_USER_ID,)
+    ))
 
     # 🔑 Separate Default folder
     default_folder = "Default"
@@ -606,11 +635,7 @@ async def show_quiz_folders(message, context):
     keyboard = []
 
     # 📁 DEFAULT FOLDER (ALWAYS ON TOP)
-    cur.execute(
-        "SELECT COUNT(*) FROM quizzes WHERE owner_id=? AND folder=?",
-        (OWNER_USER_ID, default_folder)
-    )
-    count = cur.fetchone()[0]
+    count = counts.get(default_folder, 0)
 
     keyboard.append([
         InlineKeyboardButton(
@@ -621,11 +646,7 @@ async def show_quiz_folders(message, context):
 
     # 📁 OTHER FOLDERS (ALPHABETICAL)
     for folder in other_folders:
-        cur.execute(
-            "SELECT COUNT(*) FROM quizzes WHERE owner_id=? AND folder=?",
-            (OWNER_USER_ID, folder)
-        )
-        count = cur.fetchone()[0]
+        count = counts.get(folder, 0)
 
         keyboard.append([
             InlineKeyboardButton(
@@ -648,32 +669,28 @@ async def show_quiz_folders(message, context):
 # MY QUIZZES
 # =========================
 
-async def show_quizzes_in_folder(message, context, folder):
-    cur.execute(
-        "SELECT quiz_id, title FROM quizzes WHERE owner_id=? AND folder=?",
+async def show_quizzes_in_folder(message, context, folder, move=0):
+    PER_PAGE = 5
+    total = await db.fetchval(
+        "SELECT COUNT(*) FROM quizzes WHERE owner_id=? AND folder=?",
         (OWNER_USER_ID, folder)
     )
-    rows = cur.fetchall()
 
-    # 🔢 Pagination state
-    page_key = f"folder_page_{folder}"
-    page = context.user_data.get(page_key, 0)
-
-    PER_PAGE = 5
-    total = len(rows)
-    pages = (total - 1) // PER_PAGE + 1 if total else 1
-    page = max(0, min(page, pages - 1))
-
-    start = page * PER_PAGE
-    end = start + PER_PAGE
-    page_rows = rows[start:end]
+    # 🔢 One page, in title order
+    page_rows, page, pages = await list_page(
+        db, context.user_data, f"folder_cursor_{folder}",
+        "SELECT quiz_id, title, rowid FROM quizzes WHERE owner_id=? AND folder=?",
+        (OWNER_USER_ID, folder),
+        "title", "rowid", lambda row: (row[1], row[2]),
+        total, PER_PAGE, move
+    )
 
     keyboard = []
 
     # 📘 Quiz buttons (5 per page)
-    for qid, title in page_rows:
+    for qid, title, _ in page_rows:
         keyboard.append([
-            InlineKeyboardButton(f"📘 {title}", callback_data=f"QUIZ_{qid}")
+            InlineKeyboardButton(f"📘 {title}", callback_data=f"QUIZ|{qid}")
         ])
 
     # ◀ ▶ Pagination buttons
@@ -709,7 +726,7 @@ async def open_folder(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    folder = query.data.split("|", 1)[1] or "Default"
+    folder = router.arg(query.data) or "Default"
 
     context.user_data["current_folder"] = folder
     await show_quizzes_in_folder(query.message, context, folder)
@@ -718,7 +735,7 @@ async def rename_folder_start(update: Update, context: ContextTypes.DEFAULT_TYPE
     query = update.callback_query
     await query.answer()
 
-    folder = query.data.split("|", 1)[1]
+    folder = router.arg(query.data)
     context.user_data["rename_folder"] = folder
     context.user_data["state"] = "RENAME_FOLDER"
 
@@ -749,7 +766,7 @@ async def delete_folder(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    folder = query.data.split("|", 1)[1]
+    folder = router.arg(query.data)
 
     if folder == "Default":
         await query.message.reply_text("❌ Default folder cannot be deleted.")
@@ -785,18 +802,17 @@ async def quiz_action_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    quiz_id = query.data.replace("QUIZ_", "")
+    quiz_id = router.arg(query.data)
     context.user_data["active_quiz_id"] = quiz_id
 
     # 🔁 Reset question pagination when entering a quiz
     context.user_data["reset_q_page"] = True
 
     # 🔑 SAVE THE FOLDER THIS QUIZ BELONGS TO
-    cur.execute(
+    row = await db.fetchone(
         "SELECT folder FROM quizzes WHERE quiz_id=? AND owner_id=?",
         (quiz_id, OWNER_USER_ID)
     )
-    row = cur.fetchone()
     if row:
         context.user_data["last_quiz_folder"] = row[0]
 
@@ -808,14 +824,14 @@ async def move_quiz_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     quiz_id = context.user_data["active_quiz_id"]
 
-    cur.execute("""
+    rows = await db.fetchall("""
         SELECT name
         FROM folders
         WHERE owner_id=?
         ORDER BY name
     """, (OWNER_USER_ID,))
 
-    folders = [row[0] for row in cur.fetchall()]
+    folders = [row[0] for row in rows]
 
     keyboard = []
     for folder in folders:
@@ -853,14 +869,13 @@ async def move_quiz_to_folder(update: Update, context: ContextTypes.DEFAULT_TYPE
     query = update.callback_query
     await query.answer()
 
-    folder = query.data.split("|", 1)[1]
+    folder = router.arg(query.data)
     quiz_id = context.user_data["active_quiz_id"]
 
-    cur.execute(
+    await db.execute(
         "UPDATE quizzes SET folder=? WHERE quiz_id=? AND owner_id=?",
         (folder, quiz_id, OWNER_USER_ID)
     )
-    conn.commit()
 
     await query.message.reply_text(
         f"✅ Quiz moved to 📁 {folder}"
@@ -870,17 +885,12 @@ async def move_quiz_to_folder(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 async def show_quiz_action_menu(message, context):
     quiz_id = context.user_data["active_quiz_id"]
-    cur.execute(
-        "SELECT title, description, timer, shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?",
+    title, desc, timer, sq, sa, mode = await db.fetchone(
+        "SELECT title, description, timer, shuffle_q, shuffle_a, play_mode FROM quizzes WHERE quiz_id=?",
         (quiz_id,)
     )
-    title, desc, timer, sq, sa = cur.fetchone()
 
-    cur.execute(
-        "SELECT COUNT(*) FROM questions WHERE quiz_id=?",
-        (quiz_id,)
-    )
-    total_questions = cur.fetchone()[0]
+    total_questions = await question_count(quiz_id)
 
     text = f"📘 **{title}**"
     if desc:
@@ -889,6 +899,7 @@ async def show_quiz_action_menu(message, context):
     text += f"\n⏱ Timer: {timer}s"
     text += f"\n🔀 Shuffle Questions: {'ON' if sq else 'OFF'}"
     text += f"\n🔀 Shuffle Options: {'ON' if sa else 'OFF'}"
+    text += f"\n🎬 Play Mode: {PLAY_MODE_LABELS.get(mode, mode)}"
     
     keyboard = [
         [
@@ -902,6 +913,10 @@ async def show_quiz_action_menu(message, context):
             InlineKeyboardButton("✏️ Edit this Quiz", callback_data="EDIT_THIS"),
             InlineKeyboardButton("📁 Move this Quiz", callback_data="MOVE_QUIZ"),
         ],
+        [
+            InlineKeyboardButton("🧬 Clone this Quiz", callback_data="CLONE_QUIZ"),
+            InlineKeyboardButton("📦 Export this Quiz", callback_data="EXPORT_QUIZ"),
+        ],
         [
             InlineKeyboardButton("🗑 Delete this Quiz", callback_data="DELETE_QUIZ"),
             InlineKeyboardButton("⬅️ Back", callback_data="BACK_TO_QUIZZES"),
@@ -914,6 +929,55 @@ async def show_quiz_action_menu(message, context):
         parse_mode="Markdown"
     )
 
+# =========================
+# 📦 EXPORT (gzipped JSONL / CSV, re-importable with 📥 Import)
+# =========================
+async def export_quiz_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    keyboard = [
+        [
+            InlineKeyboardButton("🧾 JSON Lines", callback_data="EXPORT_AS|jsonl"),
+            InlineKeyboardButton("📊 CSV", callback_data="EXPORT_AS|csv"),
+        ],
+        [InlineKeyboardButton("⬅️ Back", callback_data="BACK_TO_ACTION")],
+    ]
+
+    await query.message.reply_text(
+        "📦 Export format:",
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+async def export_quiz_send(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    if query.from_user.id != OWNER_USER_ID:
+        return
+
+    fmt = router.arg(query.data)
+    quiz_id = context.user_data.get("active_quiz_id")
+    if fmt not in EXPORT_FORMATS or not quiz_id:
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export")
+
+        # Streamed from a read cursor straight into the .gz file
+        result = await db.read(lambda conn: export_quiz(conn, quiz_id, path, fmt))
+        if result is None:
+            await query.message.reply_text("❌ Quiz not found.")
+            return
+        title, count = result
+
+        with open(path, "rb") as f:
+            await query.message.reply_document(
+                document=f,
+                filename=export_filename(title, fmt),
+                caption=f"📦 {title} – {count} questions"
+            )
+
 # =========================
 # EDIT CORRECT ANSWER FLOW
 # =========================
@@ -937,11 +1001,10 @@ async def edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["reset_q_page"] = True
 
     quiz_id = context.user_data["active_quiz_id"]
-    cur.execute(
-        "SELECT title, description, timer, shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?",
+    title, desc, timer, sq, sa, mode = await db.fetchone(
+        "SELECT title, description, timer, shuffle_q, shuffle_a, play_mode FROM quizzes WHERE quiz_id=?",
         (quiz_id,)
     )
-    title, desc, timer, sq, sa = cur.fetchone()
 
     text = f"📘 **{title}**"
     if desc:
@@ -949,6 +1012,7 @@ async def edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text += f"\n\n⏱ Timer: {timer}s"
     text += f"\n🔀 Shuffle Questions: {'ON' if sq else 'OFF'}"
     text += f"\n🔀 Shuffle Options: {'ON' if sa else 'OFF'}"
+    text += f"\n🎬 Play Mode: {PLAY_MODE_LABELS.get(mode, mode)}"
 
     keyboard = [
         # Row 1
@@ -962,6 +1026,10 @@ async def edit_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
             InlineKeyboardButton("🔀 Shuffle Settings", callback_data="EDIT_SHUFFLE"),
         ],
         # Row 3
+        [
+            InlineKeyboardButton("🎬 Play Mode", callback_data="PLAY_MODE"),
+        ],
+        # Row 4
         [
             InlineKeyboardButton("❓ Show Questions", callback_data="EDIT_QUESTIONS"),
             InlineKeyboardButton("⬅️ Back", callback_data="BACK_TO_ACTION"),
@@ -1007,12 +1075,12 @@ async def edit_timer_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
 
     keyboard = [
-        [InlineKeyboardButton("15 seconds", callback_data="SET_TIMER_15")],
-        [InlineKeyboardButton("30 seconds", callback_data="SET_TIMER_30")],
-        [InlineKeyboardButton("45 seconds", callback_data="SET_TIMER_45")],
-        [InlineKeyboardButton("1 minute", callback_data="SET_TIMER_60")],
-        [InlineKeyboardButton("3 minutes", callback_data="SET_TIMER_180")],
-        [InlineKeyboardButton("5 minutes", callback_data="SET_TIMER_300")],
+        [InlineKeyboardButton("15 seconds", callback_data="SET_TIMER|15")],
+        [InlineKeyboardButton("30 seconds", callback_data="SET_TIMER|30")],
+        [InlineKeyboardButton("45 seconds", callback_data="SET_TIMER|45")],
+        [InlineKeyboardButton("1 minute", callback_data="SET_TIMER|60")],
+        [InlineKeyboardButton("3 minutes", callback_data="SET_TIMER|180")],
+        [InlineKeyboardButton("5 minutes", callback_data="SET_TIMER|300")],
     ]
 
     keyboard.append([
@@ -1027,11 +1095,11 @@ async def edit_timer_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def set_timer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    seconds = int(query.data.replace("SET_TIMER_", ""))
+    seconds = int(router.arg(query.data))
     quiz_id = context.user_data["active_quiz_id"]
 
-    cur.execute("UPDATE quizzes SET timer=? WHERE quiz_id=?", (seconds, quiz_id))
-    conn.commit()
+    await db.execute("UPDATE quizzes SET timer=? WHERE quiz_id=?", (seconds, quiz_id))
+    invalidate_quiz(quiz_id)
     await query.message.reply_text(f"✅ Timer set to {seconds}s.")
     await show_quiz_action_menu(query.message, context)
 
@@ -1043,17 +1111,16 @@ async def edit_shuffle_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
 
     quiz_id = context.user_data["active_quiz_id"]
-    cur.execute("SELECT shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?", (quiz_id,))
-    sq, sa = cur.fetchone()
+    sq, sa = await db.fetchone("SELECT shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?", (quiz_id,))
 
     keyboard = [
         [InlineKeyboardButton(
             f"Shuffle Questions: {'ON' if sq else 'OFF'}",
-            callback_data="TOGGLE_Q"
+            callback_data="TOGGLE|Q"
         )],
         [InlineKeyboardButton(
             f"Shuffle Options: {'ON' if sa else 'OFF'}",
-            callback_data="TOGGLE_A"
+            callback_data="TOGGLE|A"
         )],
     ]
 
@@ -1071,12 +1138,30 @@ async def toggle_shuffle(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await query.answer()
 
     quiz_id = context.user_data["active_quiz_id"]
-    if query.data == "TOGGLE_Q":
-        cur.execute("UPDATE quizzes SET shuffle_q = 1 - shuffle_q WHERE quiz_id=?", (quiz_id,))
+    if router.arg(query.data) == "Q":
+        await db.execute("UPDATE quizzes SET shuffle_q = 1 - shuffle_q WHERE quiz_id=?", (quiz_id,))
     else:
-        cur.execute("UPDATE quizzes SET shuffle_a = 1 - shuffle_a WHERE quiz_id=?", (quiz_id,))
-    conn.commit()
+        await db.execute("UPDATE quizzes SET shuffle_a = 1 - shuffle_a WHERE quiz_id=?", (quiz_id,))
+    invalidate_quiz(quiz_id)
+
+    await show_quiz_action_menu(query.message, context)
+
+# =========================
+# 🎬 PLAY MODE
+# =========================
+async def toggle_play_mode(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    quiz_id = context.user_data["active_quiz_id"]
+    mode = await db.fetchval("SELECT play_mode FROM quizzes WHERE quiz_id=?", (quiz_id,))
+    # Cycle to the next mode
+    mode = PLAY_MODES[(PLAY_MODES.index(mode) + 1) % len(PLAY_MODES)] if mode in PLAY_MODES else PLAY_MODES[0]
 
+    await db.execute("UPDATE quizzes SET play_mode=? WHERE quiz_id=?", (mode, quiz_id))
+    invalidate_quiz(quiz_id)
+
+    await query.message.reply_text(f"🎬 Play mode: {PLAY_MODE_LABELS[mode]}")
     await show_quiz_action_menu(query.message, context)
 
 # =========================
@@ -1098,6 +1183,20 @@ async def go_home(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=keyboard
     )
 
+def correct_answer_keyboard(opts, action):
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(f"{OPTION_KEYCAPS[i]} {opt}", callback_data=f"{action}|{i}")]
+        for i, opt in enumerate(opts)
+    ])
+
+def options_done_keyboard(opts, callback_data):
+    # "Done" only once the minimum number of options is in
+    if len(opts) < MIN_OPTIONS:
+        return None
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(f"✅ Done ({len(opts)} options)", callback_data=callback_data)]
+    ])
+
 def home_button():
     return [InlineKeyboardButton("🏠 Home", callback_data="GO_HOME")]
 
@@ -1164,52 +1263,39 @@ async def placeholder(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # =========================
 # SHOW QUESTIONS (STEP 7.1)
 # =========================
-async def show_questions(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    query = update.callback_query
-    await query.answer()
-
-    context.user_data.setdefault("selected_questions", set())
-
+async def question_page_rows(context, move=0):
+    # -> (rows on the current page, number of the first row, page, pages)
     quiz_id = context.user_data["active_quiz_id"]
-    if "q_page" not in context.user_data:
-        context.user_data["q_page"] = 0
-    page = context.user_data["q_page"]
-
-    # 🔁 Always start from page 1 when entering
-    if context.user_data.get("reset_q_page", True):
-        context.user_data["q_page"] = 0
-        context.user_data["reset_q_page"] = False
 
-    cur.execute(
-        "SELECT id, question FROM questions WHERE quiz_id=? ORDER BY question COLLATE NOCASE",
-        (quiz_id,)
+    # Served by idx_questions_quiz_question (quiz_id, question NOCASE, id)
+    page_rows, page, pages = await list_page(
+        db, context.user_data, "q_cursor",
+        "SELECT id, question FROM questions WHERE quiz_id=?", (quiz_id,),
+        "question COLLATE NOCASE", "id", lambda row: (row[1], row[0]),
+        await question_count(quiz_id), QUESTIONS_PER_PAGE, move
     )
+    return page_rows, page * QUESTIONS_PER_PAGE, page, pages
 
-    rows = cur.fetchall()
-
-    total = len(rows)
-    start = page * QUESTIONS_PER_PAGE
-    end = start + QUESTIONS_PER_PAGE
-    page_rows = rows[start:end]
+async def build_question_list(context, notice=None, move=0):
+    page_rows, start, page, pages = await question_page_rows(context, move)
+    selected = context.user_data.setdefault("selected_questions", set())
 
     keyboard = []
 
-    # ➕ Add new question
-    keyboard.append([InlineKeyboardButton("➕ Add new question", callback_data="ADD_QUESTION")])
-
-    # Question buttons (10 max)
-    selected = context.user_data.get("selected_questions", set())
+    # ➕ Add new question / 📥 many at once
+    keyboard.append([
+        InlineKeyboardButton("➕ Add new question", callback_data="ADD_QUESTION"),
+        InlineKeyboardButton("📥 Import", callback_data="IMPORT_QUESTIONS"),
+    ])
 
+    # Question buttons (10 max), each with its checkbox
     for i, (qid, q) in enumerate(page_rows, start=start + 1):
         keyboard.append([
-            InlineKeyboardButton(
-                f"{i}. {q[:40]}",
-                callback_data=f"Q_{qid}"
-            )
+            InlineKeyboardButton("☑️" if qid in selected else "⬜", callback_data=f"QSEL|{qid}"),
+            InlineKeyboardButton(f"{i}. {q[:40]}", callback_data=f"Q|{qid}"),
         ])
 
     # Pagination
-    pages = (total - 1) // QUESTIONS_PER_PAGE + 1
     if pages > 1:
         nav = []
         if page > 0:
@@ -1219,13 +1305,51 @@ async def show_questions(update: Update, context: ContextTypes.DEFAULT_TYPE):
             nav.append(InlineKeyboardButton("Next ▶️", callback_data="QPAGE_NEXT"))
         keyboard.append(nav)
 
+    # ☑️ Selection + bulk actions
+    if page_rows:
+        row = [InlineKeyboardButton("☑️ Select page", callback_data="QSEL_PAGE")]
+        if selected:
+            row.append(InlineKeyboardButton("✖️ Clear", callback_data="QSEL_CLEAR"))
+        keyboard.append(row)
+    if selected:
+        keyboard.append([
+            InlineKeyboardButton(f"🗑 Delete ({len(selected)})", callback_data="QSEL_DELETE"),
+            InlineKeyboardButton("📁 Move", callback_data="QSEL_MOVE"),
+            InlineKeyboardButton("📋 Copy", callback_data="QSEL_COPY"),
+        ])
+
     # Back button
     keyboard.append([InlineKeyboardButton("⬅️ Back", callback_data="EDIT_THIS")])
 
-    await query.message.reply_text(
-        "❓ Questions in this quiz:",
-        reply_markup=InlineKeyboardMarkup(keyboard)
-    )
+    text = "❓ Questions in this quiz:"
+    if selected:
+        text += f"\n☑️ {len(selected)} selected"
+    if notice:
+        text = f"{notice}\n\n{text}"
+
+    return text, InlineKeyboardMarkup(keyboard)
+
+async def show_questions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    # 🔁 Always start from page 1 (and a clean selection) when entering
+    if context.user_data.get("reset_q_page", True):
+        context.user_data.pop("q_cursor", None)
+        context.user_data["selected_questions"] = set()
+        context.user_data["reset_q_page"] = False
+
+    text, keyboard = await build_question_list(context)
+    await query.message.reply_text(text, reply_markup=keyboard)
+
+async def refresh_question_list(query, context, notice=None, move=0):
+    # ✏️ Re-render the list in the message the button sits on (one edit)
+    text, keyboard = await build_question_list(context, notice, move)
+    try:
+        await query.message.edit_text(text, reply_markup=keyboard)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            await query.message.reply_text(text, reply_markup=keyboard)
 
 # =========================
 # ADD NEW QUESTION (STEP 7.3)
@@ -1244,69 +1368,124 @@ async def add_new_question(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # MESSAGE-SAFE RETURN TO QUESTIONS
 # =========================
 async def show_questions_from_message(message, context):
-    quiz_id = context.user_data["active_quiz_id"]
-    page = context.user_data.get("q_page", 0)
+    text, keyboard = await build_question_list(context)
+    await message.reply_text(text, reply_markup=keyboard)
 
-    cur.execute(
-        "SELECT id, question FROM questions WHERE quiz_id=? ORDER BY question COLLATE NOCASE",
-        (quiz_id,)
+# =========================
+# 📥 BULK IMPORT (CSV / JSON / JSONL, optionally .gz)
+# =========================
+IMPORT_MAX_BYTES = 20 * 1024 * 1024     # Bot API download limit
+IMPORT_PROGRESS_EVERY = 3               # s between progress edits
+IMPORT_ERRORS_SHOWN = 20
+
+IMPORT_HELP = (
+    "📥 Send a .csv, .json or .jsonl file (.gz is fine too).\n\n"
+    "CSV columns: question, option1 … option10, correct, explanation, image\n"
+    "JSON: [{\"question\": \"…\", \"options\": [\"…\", \"…\"], \"correct\": 1, \"explanation\": \"…\"}]\n\n"
+    "correct = number of the right option (1 = first). "
+    "The whole file is checked first; nothing is saved if any row has a problem."
+)
+
+async def import_questions_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    if query.from_user.id != OWNER_USER_ID:
+        return
+
+    context.user_data["state"] = "IMPORT_QUESTIONS"
+    await query.message.reply_text(
+        IMPORT_HELP,
+        reply_markup=InlineKeyboardMarkup([cancel_edit_button()])
     )
 
-    rows = cur.fetchall()
+async def import_progress(message, counter):
+    # Edits the status message while the checker thread runs
+    while True:
+        await asyncio.sleep(IMPORT_PROGRESS_EVERY)
+        try:
+            await message.edit_text(f"🔎 Checking… {counter['rows']} rows so far")
+        except BadRequest:
+            pass
+
+async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if context.user_data.get("state") != "IMPORT_QUESTIONS":
+        return
+    if update.effective_user.id != OWNER_USER_ID:
+        return
 
-    total = len(rows)
-    start = page * QUESTIONS_PER_PAGE
-    end = start + QUESTIONS_PER_PAGE
-    page_rows = rows[start:end]
+    document = update.message.document
+    detected = detect_format(document.file_name)
+    if not detected:
+        await update.message.reply_text("❌ Send a .csv, .json or .jsonl file (optionally .gz).")
+        return
+    if document.file_size and document.file_size > IMPORT_MAX_BYTES:
+        await update.message.reply_text("❌ File is larger than 20 MB – split it into smaller files.")
+        return
 
-    keyboard = []
+    fmt, gzipped = detected
+    quiz_id = context.user_data["active_quiz_id"]
+    context.user_data["state"] = None
 
-    keyboard.append([
-        InlineKeyboardButton("➕ Add new question", callback_data="ADD_QUESTION")
-    ])
+    status = await update.message.reply_text("📥 Downloading…")
 
-    for i, (qid, q) in enumerate(page_rows, start=start + 1):
-        keyboard.append([
-            InlineKeyboardButton(f"{i}. {q[:40]}", callback_data=f"Q_{qid}")
-        ])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "upload")
+        file = await document.get_file()
+        await file.download_to_drive(path)
 
-    pages = (total - 1) // QUESTIONS_PER_PAGE + 1
-    if pages > 1:
-        nav = []
-        if page > 0:
-            nav.append(InlineKeyboardButton("◀️ Prev", callback_data="QPAGE_PREV"))
-        nav.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data="QPAGE_NOP"))
-        if page < pages - 1:
-            nav.append(InlineKeyboardButton("Next ▶️", callback_data="QPAGE_NEXT"))
-        keyboard.append(nav)
+        # 🔎 PASS 1: validate every row (streamed, in a worker thread)
+        counter = {"rows": 0}
+        ticker = asyncio.create_task(import_progress(status, counter))
+        try:
+            valid, errors, error_count = await asyncio.to_thread(
+                check_file, path, fmt, gzipped, lambda rows: counter.update(rows=rows)
+            )
+        finally:
+            ticker.cancel()
+
+        if error_count:
+            text = f"❌ {error_count} problem(s) found – nothing was imported.\n\n"
+            text += "\n".join(errors[:IMPORT_ERRORS_SHOWN])
+            if error_count > IMPORT_ERRORS_SHOWN:
+                text += "\n…full list attached."
+            await status.edit_text(text)
+
+            # 🧾 PER-ROW REPORT
+            if error_count > IMPORT_ERRORS_SHOWN:
+                report = "\n".join(errors)
+                if error_count > len(errors):
+                    report += f"\n…and {error_count - len(errors)} more"
+                await update.message.reply_document(
+                    document=io.BytesIO(report.encode("utf-8")),
+                    filename="import_errors.txt"
+                )
+            return
 
-    keyboard.append([
-        InlineKeyboardButton("⬅️ Back", callback_data="EDIT_THIS")
-    ])
+        if not valid:
+            await status.edit_text("❌ The file has no questions.")
+            return
 
-    await message.reply_text(
-        "❓ Questions in this quiz:",
-        reply_markup=InlineKeyboardMarkup(keyboard)
-    )
+        # 💾 PASS 2: one executemany in one transaction on the writer
+        await status.edit_text(f"💾 Saving {valid} questions…")
+        inserted = await db.run(lambda conn: insert_questions(conn, quiz_id, path, fmt, gzipped))
+
+    invalidate_quiz(quiz_id)
+
+    await status.edit_text(f"✅ Imported {inserted} questions.")
+    await show_questions_from_message(update.message, context)
 
 async def questions_prev(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    context.user_data["q_page"] = max(
-        0,
-        context.user_data.get("q_page", 0) - 1
-    )
-
-    await show_questions(update, context)
+    await refresh_question_list(query, context, move=-1)
 
 async def questions_next(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    context.user_data["q_page"] = context.user_data.get("q_page", 0) + 1
-
-    await show_questions(update, context)
+    await refresh_question_list(query, context, move=1)
 
 async def skip_question_image(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -1317,7 +1496,7 @@ async def skip_question_image(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     context.user_data["new_question"]["image"] = None
-    context.user_data["add_q_state"] = "NEW_Q_OPTION_1"
+    context.user_data["add_q_state"] = "NEW_Q_OPTIONS"
 
     await query.message.reply_text("➡️ Send option 1:")
 
@@ -1332,12 +1511,35 @@ async def skip_question_explanation(update: Update, context: ContextTypes.DEFAUL
     context.user_data["new_question"]["explanation"] = None
     await save_new_question(query.message, context)
 
+async def ask_correct_answer(message, context):
+    context.user_data["add_q_state"] = "NEW_Q_CORRECT"
+
+    opts = context.user_data["new_question"]["options"]
+
+    await message.reply_text(
+        "✅ Choose the correct answer:",
+        reply_markup=correct_answer_keyboard(opts, "CORRECT")
+    )
+
+async def options_done(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    # Only valid while options are being collected
+    if context.user_data.get("add_q_state") != "NEW_Q_OPTIONS":
+        return
+
+    if len(context.user_data["new_question"]["options"]) < MIN_OPTIONS:
+        return
+
+    await ask_correct_answer(query.message, context)
+
 async def choose_correct_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    # Extract index (0–3)
-    correct_index = int(query.data.replace("CORRECT_", ""))
+    # Extract index (0 – MAX_OPTIONS-1)
+    correct_index = int(router.arg(query.data))
 
     context.user_data["new_question"]["correct"] = correct_index
 
@@ -1357,9 +1559,9 @@ async def save_new_question(message, context):
     quiz_id = context.user_data["active_quiz_id"]
     q = context.user_data["new_question"]
 
-    options_text = "||".join(q["options"])
+    options_text = pack_options(q["options"])
 
-    cur.execute("""
+    await db.execute("""
         INSERT INTO questions (
             quiz_id,
             question,
@@ -1377,8 +1579,7 @@ async def save_new_question(message, context):
         q["correct"],
         q.get("explanation")
     ))
-
-    conn.commit()
+    invalidate_quiz(quiz_id)
 
     # Reset question state
     context.user_data.pop("add_q_state", None)
@@ -1391,22 +1592,21 @@ async def preview_question(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    qid = int(query.data.replace("Q_", ""))
+    qid = int(router.arg(query.data))
     context.user_data["active_question_id"] = qid
 
-    cur.execute("""
+    row = await db.fetchone("""
         SELECT question, image_file_id, options, correct, explanation
         FROM questions
         WHERE id=?
     """, (qid,))
 
-    row = cur.fetchone()
     if not row:
         await query.message.reply_text("❌ Question not found.")
         return
 
     question, image, options, correct, explanation = row
-    options = options.split("||")
+    options = unpack_options(options)
 
     text = f"📝 **{question}**\n\n"
 
@@ -1506,11 +1706,11 @@ async def remove_question_image(update: Update, context: ContextTypes.DEFAULT_TY
 
     qid = context.user_data["active_question_id"]
 
-    cur.execute(
+    await db.execute(
         "UPDATE questions SET image_file_id=NULL WHERE id=?",
         (qid,)
     )
-    conn.commit()
+    invalidate_quiz(context.user_data["active_quiz_id"])
 
     context.user_data.pop("edit_q_field", None)
 
@@ -1543,23 +1743,64 @@ async def edit_question_options_start(update: Update, context: ContextTypes.DEFA
     qid = context.user_data["active_question_id"]
 
     # Load existing options for reference
-    cur.execute("SELECT options FROM questions WHERE id=?", (qid,))
-    row = cur.fetchone()
-    old_options = row[0].split("||")
+    row = await db.fetchone("SELECT options FROM questions WHERE id=?", (qid,))
+    old_options = unpack_options(row[0])
 
     context.user_data["edit_q_field"] = "OPTIONS"
     context.user_data["edit_options"] = []
 
+    current = "\n".join(
+        f"{OPTION_KEYCAPS[i]} {opt}" for i, opt in enumerate(old_options)
+    )
+
     await query.message.reply_text(
         "✏️ Editing options\n\n"
-        f"Current options:\n"
-        f"1️⃣ {old_options[0]}\n"
-        f"2️⃣ {old_options[1]}\n"
-        f"3️⃣ {old_options[2]}\n"
-        f"4️⃣ {old_options[3]}\n\n"
+        f"Current options:\n{current}\n\n"
+        f"Send {MIN_OPTIONS}–{MAX_OPTIONS} new options, one message each.\n"
         "➡️ Send NEW option 1:"
     )
 
+async def save_edited_options(message, context):
+    opts = context.user_data["edit_options"]
+    qid = context.user_data["active_question_id"]
+
+    current_correct = await db.fetchval("SELECT correct FROM questions WHERE id=?", (qid,), 0)
+
+    # Keep the correct answer if it still exists, else fall back to option 1
+    correct_reset = current_correct >= len(opts)
+    correct = 0 if correct_reset else current_correct
+
+    await db.execute(
+        "UPDATE questions SET options=?, correct=? WHERE id=?",
+        (pack_options(opts), correct, qid)
+    )
+    invalidate_quiz(context.user_data["active_quiz_id"])
+
+    context.user_data.pop("edit_q_field", None)
+    context.user_data.pop("edit_options", None)
+
+    if correct_reset:
+        await message.reply_text(
+            "✅ Options updated.\n⚠️ Correct answer reset — choose it again:",
+            reply_markup=correct_answer_keyboard(opts, "SET_CORRECT")
+        )
+        return
+
+    await message.reply_text("✅ Options updated.")
+    await show_questions_from_message(message, context)
+
+async def edit_options_done(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    if context.user_data.get("edit_q_field") != "OPTIONS":
+        return
+
+    if len(context.user_data.get("edit_options", [])) < MIN_OPTIONS:
+        return
+
+    await save_edited_options(query.message, context)
+
 async def edit_question_correct_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
@@ -1567,16 +1808,10 @@ async def edit_question_correct_start(update: Update, context: ContextTypes.DEFA
     qid = context.user_data["active_question_id"]
 
     # Load options
-    cur.execute("SELECT options, correct FROM questions WHERE id=?", (qid,))
-    options_text, current_correct = cur.fetchone()
-    opts = options_text.split("||")
+    options_text, current_correct = await db.fetchone("SELECT options, correct FROM questions WHERE id=?", (qid,))
+    opts = unpack_options(options_text)
 
-    keyboard = InlineKeyboardMarkup([
-        [InlineKeyboardButton(f"1️⃣ {opts[0]}", callback_data="EDIT_CORRECT_0")],
-        [InlineKeyboardButton(f"2️⃣ {opts[1]}", callback_data="EDIT_CORRECT_1")],
-        [InlineKeyboardButton(f"3️⃣ {opts[2]}", callback_data="EDIT_CORRECT_2")],
-        [InlineKeyboardButton(f"4️⃣ {opts[3]}", callback_data="EDIT_CORRECT_3")],
-    ])
+    keyboard = correct_answer_keyboard(opts, "SET_CORRECT")
 
     await query.message.reply_text(
         "✅ Choose the NEW correct answer:",
@@ -1587,14 +1822,14 @@ async def edit_question_correct_apply(update: Update, context: ContextTypes.DEFA
     query = update.callback_query
     await query.answer()
 
-    correct_index = int(query.data.replace("EDIT_CORRECT_", ""))
+    correct_index = int(router.arg(query.data))
     qid = context.user_data["active_question_id"]
 
-    cur.execute(
+    await db.execute(
         "UPDATE questions SET correct=? WHERE id=?",
         (correct_index, qid)
     )
-    conn.commit()
+    invalidate_quiz(context.user_data["active_quiz_id"])
 
     await query.message.reply_text("✅ Correct answer updated.")
     await show_questions_from_message(query.message, context)
@@ -1606,8 +1841,7 @@ async def edit_question_explanation_start(update: Update, context: ContextTypes.
     qid = context.user_data["active_question_id"]
 
     # Load current explanation
-    cur.execute("SELECT explanation FROM questions WHERE id=?", (qid,))
-    row = cur.fetchone()
+    row = await db.fetchone("SELECT explanation FROM questions WHERE id=?", (qid,))
     current = row[0] if row and row[0] else "— none —"
 
     context.user_data["edit_q_field"] = "EXPLANATION"
@@ -1628,11 +1862,11 @@ async def edit_question_explanation_remove(update: Update, context: ContextTypes
 
     qid = context.user_data["active_question_id"]
 
-    cur.execute(
+    await db.execute(
         "UPDATE questions SET explanation=NULL WHERE id=?",
         (qid,)
     )
-    conn.commit()
+    invalidate_quiz(context.user_data["active_quiz_id"])
 
     context.user_data.pop("edit_q_field", None)
 
@@ -1640,6 +1874,7 @@ async def edit_question_explanation_remove(update: Update, context: ContextTypes
     await show_questions_from_message(query.message, context)
 
 async def play_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    mark_interactive()
     query = update.callback_query
     await query.answer()
 
@@ -1651,173 +1886,183 @@ async def play_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
         context.user_data["play_quiz_id"] = quiz_id
 
-    quiz_id = context.user_data.get("play_quiz_id")
-    group_chat_id = context.user_data.get("group_chat_id")
-
-    # 🏆 CREATE LEADERBOARD MESSAGE (GROUP ONLY, ONCE)
-    if group_chat_id and quiz_id not in GROUP_LB_MESSAGES:
-        leaderboard_text = (
-            "🏆 *Quiz Leaderboard*\n\n"
-            "_Waiting for players to answer..._"
-        )
-
-        lb_msg = await context.bot.send_message(
-            chat_id=group_chat_id,
-            text=leaderboard_text,
-            parse_mode="Markdown"
-        )
-
-        GROUP_LB_MESSAGES[quiz_id] = {
-            "chat_id": group_chat_id,
-            "message_id": lb_msg.message_id
-        }
-
-        GROUP_LEADERBOARDS.setdefault(quiz_id, {})
+    # 🏆 The group's leaderboard message already exists: the deep link
+    # only carries chats the quiz was posted to (see parse_play_link)
 
     # ▶️ START QUIZ (shared logic)
     await start_play_quiz(update, context)
 
 async def play_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    mark_interactive()
     query = update.callback_query
     await query.answer()
 
-    data = query.data  # PLAY_ANSWER_{index}
-    chosen_index = int(data.replace("PLAY_ANSWER_", ""))
-
-    play = context.user_data["play"]
-    question = play["questions"][play["index"]]
-    correct_index = question["correct"]
+    chosen_index = int(router.arg(query.data))  # PLAY_ANSWER|{index}
 
-    # 🔒 LOCK ANSWERS AFTER FIRST TAP
-    if play.get("locked"):
+    play = await get_play_session(context)
+    if not play:
+        await query.message.reply_text("❌ Quiz session expired.")
+        return
+    if play.finished:
         return
-    play["locked"] = True
 
-    # ✅ INCREASE SCORE WHEN ANSWER IS CORRECT
-    if chosen_index == correct_index:
-        play["score"] += 1
+    question, options, correct_index = play.current()
+    keyboards = play.keyboards()
 
-    # 🎨 BUILD GREEN / RED BUTTONS
-    buttons = []
-    for i, option in enumerate(question["options"]):
-        if i == correct_index:
-            label = f"✅ {option}"
-        elif i == chosen_index:
-            label = f"❌ {option}"
-        else:
-            label = option
+    # Stale button from an older layout of this quiz
+    if not 0 <= chosen_index < len(options):
+        return
 
-        buttons.append([InlineKeyboardButton(label, callback_data="LOCKED")])
-
-    # 🎨 UPDATE MESSAGE WITH VISUAL FEEDBACK
-    await query.message.edit_reply_markup(
-        reply_markup=InlineKeyboardMarkup(buttons)
-    )
-
-    # ➡️ MOVE TO NEXT QUESTION
-    play["index"] += 1
-    play["locked"] = False
-
-    # 🏁 QUIZ FINISHED
-    if play["index"] >= len(play["questions"]):
-        quiz_id = play["quiz_id"]
-        user = query.from_user
-        score = play["score"]
-
-        GROUP_LEADERBOARDS.setdefault(quiz_id, {})
-        entry = GROUP_LEADERBOARDS[quiz_id].get(user.id)
-
-        update_lb = False
-
-        # 🥇 FIRST ATTEMPT → update leaderboard
-        if not entry:
-            GROUP_LEADERBOARDS[quiz_id][user.id] = {
-                "name": user.first_name,
-                "score": score,
-                "attempts": 1
-            }
-            update_lb = True
-
-        # 🥈 SECOND ATTEMPT → update leaderboard
-        elif entry["attempts"] == 1:
-            entry["score"] = score
-            entry["attempts"] = 2
-            update_lb = True
-
-        # 🚫 THIRD ATTEMPT AND BEYOND → DO NOT update leaderboard
+    # 🔒 LOCK ANSWERS AFTER FIRST TAP
+    if play.locked:
+        return
+    play.locked = True
+    try:
+        play_timers.cancel(query.from_user.id)
+
+        # ✅ INCREASE SCORE WHEN ANSWER IS CORRECT
+        if chosen_index == correct_index:
+            play.score += 1
+            feedback = "✅ Correct!"
         else:
-            entry["attempts"] += 1
+            feedback = f"❌ Wrong – the answer was: {options[correct_index]}"
 
-        # 🔄 UPDATE GROUP LEADERBOARD (NO AUTO-SCROLL)
-        if update_lb:
-            await update_group_leaderboard(quiz_id, context)
+        # ✏️ IN-PLACE MODE: one edit shows the feedback and the next question
+        play.advance()
+        if edits_in_place(play, question):
+            await send_next_question(query.from_user.id, context, feedback=feedback, in_place=True)
+            return
 
-        # 🧾 PERSONAL RESULT (PRIVATE CHAT)
-        await query.message.reply_text(
-            f"🏁 Quiz finished!\n\nYour score: {score}"
+        # 🎨 UPDATE MESSAGE WITH VISUAL FEEDBACK (GREEN / RED BUTTONS, PRE-RENDERED)
+        await query.message.edit_reply_markup(
+            reply_markup=keyboards.answered[chosen_index]
         )
+    finally:
+        # ➡️ MOVE TO NEXT QUESTION – released even if a send failed,
+        # or every later tap would be ignored
+        play.locked = False
 
+    # 🏁 QUIZ FINISHED
+    if play.finished:
+        await finish_play(query.from_user.id, query.from_user.first_name, play, context)
         return
 
     # ➡️ NEXT QUESTION
     await send_next_question(query.from_user.id, context)
 
+async def question_timed_out(user_id, play, index):
+    # Fired by play_timers; runs outside any update, so take the same
+    # per-user lock play_answer runs under
+    mark_interactive()
+    async with user_lock(user_id):
+        context = app.context_types.context(app, chat_id=user_id, user_id=user_id)
+
+        # Answered, restarted or finished in the meantime → nothing to do
+        if context.user_data.get("play") is not play or play.index != index or play.locked:
+            return
+        if play.finished:
+            return
+
+        play.locked = True
+        try:
+            question, options, correct_index = play.current()
+            keyboards = play.keyboards()
+
+            play.timed_out += 1
+            feedback = f"⏰ Time's up! The answer was: {options[correct_index]}"
+
+            # ✏️ IN-PLACE MODE: the same message becomes the next question
+            play.advance()
+            if edits_in_place(play, question):
+                await send_next_question(user_id, context, feedback=feedback, in_place=True)
+                return
+
+            if play.snapshot.play_mode == "poll":
+                # 📊 Telegram closed the poll (open_period) and showed the answer
+                forget_poll(user_id)
+            else:
+                # ⏰ MARK AS TIMED OUT – reveal the answer, lock the buttons
+                if play.message_id:
+                    try:
+                        await context.bot.edit_message_reply_markup(
+                            chat_id=user_id,
+                            message_id=play.message_id,
+                            reply_markup=keyboards.answered[correct_index]
+                        )
+                    except BadRequest:
+                        pass
+                await context.bot.send_message(chat_id=user_id, text="⏰ Time's up!")
+        finally:
+            # Released even if a send failed (see play_answer)
+            play.locked = False
+            app.mark_data_for_update_persistence(user_ids=user_id)
+
+        if play.finished:
+            await finish_play(user_id, context.user_data.get("player_name", "Player"), play, context)
+            return
+
+        await send_next_question(user_id, context)
+
+def record_result(quiz_id, group_chat_id, user_id, first_name, score):
+    # -> (board, True if the board changed)
+    board = GROUP_LEADERBOARDS.setdefault((quiz_id, group_chat_id), RankedLeaderboard())
+    entry = board.get(user_id)
+
+    update_lb = False
+
+    # 🥇 FIRST ATTEMPT → update leaderboard
+    if not entry:
+        entry = board.record(user_id, first_name, score, 1)
+        update_lb = True
+
+    # 🥈 SECOND ATTEMPT → update leaderboard
+    elif entry["attempts"] == 1:
+        entry = board.record(user_id, entry["name"], score, 2)
+        update_lb = True
+
+    # 🚫 THIRD ATTEMPT AND BEYOND → DO NOT update leaderboard
+    else:
+        entry["attempts"] += 1
+
+    # 💾 WRITE-BEHIND (flushed in batches by lb_store)
+    lb_store.save_entry(quiz_id, group_chat_id, user_id, entry)
+    return board, update_lb
+
+async def finish_play(user_id, first_name, play, context):
+    quiz_id = play.quiz_id
+    score = play.score
+
+    group_chat_id = context.user_data.get("group_chat_id", 0)
+    board, update_lb = record_result(quiz_id, group_chat_id, user_id, first_name, score)
+
+    # 🔄 UPDATE GROUP LEADERBOARD (NO AUTO-SCROLL)
+    if update_lb:
+        update_group_leaderboard(quiz_id, group_chat_id)
+
+    # 🧾 PERSONAL RESULT (PRIVATE CHAT)
+    text = f"🏁 Quiz finished!\n\nYour score: {score}\n"
+    if play.timed_out:
+        text += f"⏰ Timed out: {play.timed_out}\n"
+    text += f"🏅 Leaderboard rank: {board.rank(user_id)} of {len(board)}"
+
+    await context.bot.send_message(chat_id=user_id, text=text)
+
 async def start_quiz_for_user(user_id, context):
     quiz_id = context.user_data.get("play_quiz_id")
     if not quiz_id:
         return
 
-    # Load quiz settings
-    cur.execute(
-        "SELECT shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?",
-        (quiz_id,)
-    )
-    shuffle_q, shuffle_a = cur.fetchone() or (0, 0)
+    snapshot = await quiz_cache.get(quiz_id)
 
-    # Load questions
-    cur.execute(
-        "SELECT question, image_file_id, options, correct, explanation "
-        "FROM questions WHERE quiz_id=?",
-        (quiz_id,)
-    )
-    rows = cur.fetchall()
-
-    if not rows:
+    if not snapshot or not snapshot.questions:
         await context.bot.send_message(
             chat_id=user_id,
             text="❌ This quiz has no questions."
         )
         return
 
-    questions = []
-    for text, image, options, correct, explanation in rows:
-        opts = options.split("||")
-
-        if shuffle_a:
-            import random
-            indexed = list(enumerate(opts))
-            random.shuffle(indexed)
-            opts = [o for _, o in indexed]
-            correct = [i for i, (old_i, _) in enumerate(indexed) if old_i == correct][0]
-
-        questions.append({
-            "text": text,
-            "image": image,
-            "options": opts,
-            "correct": correct,
-            "explanation": explanation
-        })
-
-    if shuffle_q:
-        import random
-        random.shuffle(questions)
-
     # 🔑 CREATE PLAY SESSION
-    context.user_data["play"] = {
-        "questions": questions,
-        "index": 0,
-        "score": 0
-    }
+    context.user_data["play"] = PlaySession.start(snapshot)
 
     await send_next_question(user_id, context)
 
@@ -1830,62 +2075,67 @@ async def start_play_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.message.reply_text("❌ Quiz not found.")
         return
 
-    # Load quiz settings
-    cur.execute(
-        "SELECT shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?",
-        (quiz_id,)
-    )
-    row = cur.fetchone()
-    shuffle_q, shuffle_a = row if row else (0, 0)
-
-    # Load questions
-    cur.execute(
-        "SELECT id, question, image_file_id, options, correct, explanation "
-        "FROM questions WHERE quiz_id=?",
-        (quiz_id,)
-    )
-    rows = cur.fetchall()
+    # Compiled settings + questions, shared by every player of this quiz
+    snapshot = await quiz_cache.get(quiz_id)
 
-    if not rows:
+    if not snapshot or not snapshot.questions:
         await query.message.reply_text("❌ This quiz has no questions.")
         return
 
-    questions = []
-    for qid, text, image, options, correct, explanation in rows:
-        opts = options.split("||")
-        if shuffle_a:
-            import random
-            indexed = list(enumerate(opts))
-            random.shuffle(indexed)
-            opts = [o for _, o in indexed]
-            correct = [i for i, (old_i, _) in enumerate(indexed) if old_i == correct][0]
-
-        questions.append({
-            "id": qid,
-            "text": text,
-            "image": image,
-            "options": opts,
-            "correct": correct,
-            "explanation": explanation
-        })
-
-    if shuffle_q:
-        import random
-        random.shuffle(questions)
-
-    # 🔑 CREATE PLAY SESSION (THIS FIXES KeyError)
-    context.user_data["play"] = {
-        "questions": questions,
-        "index": 0,
-        "score": 0,
-        "quiz_id": quiz_id,
-    }
+    # 🔑 CREATE PLAY SESSION (order + permutations only, questions stay shared)
+    context.user_data["play"] = PlaySession.start(snapshot)
+    context.user_data["player_name"] = query.from_user.first_name
     
     user_id = query.from_user.id
     await send_next_question(user_id, context)
 
-async def send_next_question(user_id, context):
+async def get_play_session(context):
     play = context.user_data.get("play")
+    if play is None:
+        return None
+
+    # 🔁 Restored from persistence → re-attach the shared snapshot
+    if play.snapshot is None:
+        snapshot = await quiz_cache.get(play.quiz_id)
+        if not play.attach(snapshot):
+            # Quiz was edited or deleted while the bot was down
+            context.user_data.pop("play", None)
+            return None
+
+    return play
+
+def edits_in_place(play, previous):
+    # In-place mode turns the previous question's message into the next
+    # one. Telegram can't add media to a text message (or remove it from
+    # a photo), so a text <-> photo switch falls back to a new message.
+    if play.snapshot.play_mode != "inplace" or play.message_id is None or play.finished:
+        return False
+    q, _, _ = play.current()
+    return bool(q.image) == bool(previous.image)
+
+async def edit_question_message(user_id, context, play, q, text, reply_markup):
+    # False if the message is gone / too old → caller sends a new one
+    try:
+        if q.image:
+            await context.bot.edit_message_media(
+                chat_id=user_id,
+                message_id=play.message_id,
+                media=InputMediaPhoto(q.image, caption=text),
+                reply_markup=reply_markup
+            )
+        else:
+            await context.bot.edit_message_text(
+                text,
+                chat_id=user_id,
+                message_id=play.message_id,
+                reply_markup=reply_markup
+            )
+    except BadRequest as e:
+        return "not modified" in str(e).lower()
+    return True
+
+async def send_next_question(user_id, context, feedback=None, in_place=False):
+    play = await get_play_session(context)
     if not play:
         await context.bot.send_message(
             chat_id=user_id,
@@ -1893,46 +2143,117 @@ async def send_next_question(user_id, context):
         )
         return
 
-    q = play["questions"][play["index"]]
+    q, options, correct_index = play.current()
 
-    text = f"❓ {q['text']}"
+    if play.snapshot.play_mode == "poll":
+        await send_question_poll(user_id, context, play, q, options, correct_index)
+        return
 
-    keyboard = []
-    for i, option in enumerate(q["options"]):
-        keyboard.append([
-            InlineKeyboardButton(
-                option,
-                callback_data=f"PLAY_ANSWER_{i}"
+    text = f"❓ {q.text}"
+    if feedback:
+        text = f"{feedback}\n\n{text}"
+
+    # Built once per quiz snapshot, shared by every player
+    reply_markup = play.keyboards().ask
+
+    # ✏️ IN-PLACE: reuse the current message (a new one if the edit fails)
+    if not (in_place and await edit_question_message(user_id, context, play, q, text, reply_markup)):
+        if q.image:
+            msg = await context.bot.send_photo(
+                chat_id=user_id,
+                photo=q.image,
+                caption=text,
+                reply_markup=reply_markup
             )
-        ])
+        else:
+            msg = await context.bot.send_message(
+                chat_id=user_id,
+                text=text,
+                reply_markup=reply_markup
+            )
+        play.message_id = msg.message_id
 
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    # ⏱ START THE QUESTION TIMER (cancelled in play_answer)
+    if play.snapshot.timer:
+        play_timers.schedule(user_id, play.snapshot.timer, question_timed_out, user_id, play, play.index)
 
-    if q["image"]:
-        await context.bot.send_photo(
-            chat_id=user_id,
-            photo=q["image"],
-            caption=text,
-            reply_markup=reply_markup
-        )
-    else:
-        await context.bot.send_message(
-            chat_id=user_id,
-            text=text,
-            reply_markup=reply_markup
-        )
+# =========================
+# 📊 POLL MODE
+# =========================
+def clip(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def forget_poll(user_id):
+    poll_id = USER_POLLS.pop(user_id, None)
+    if poll_id is not None:
+        PLAY_POLLS.pop(poll_id, None)
+
+async def send_question_poll(user_id, context, play, q, options, correct_index):
+    # Polls can't carry a photo: send it just above the poll
+    if q.image:
+        await context.bot.send_photo(chat_id=user_id, photo=q.image)
+
+    timer = play.snapshot.timer
+    msg = await context.bot.send_poll(
+        chat_id=user_id,
+        question=clip(f"❓ {q.text}", POLL_QUESTION_MAX),
+        options=[clip(option, POLL_OPTION_MAX) for option in options],
+        type=Poll.QUIZ,
+        correct_option_id=correct_index,
+        is_anonymous=False,     # anonymous polls send no PollAnswer
+        explanation=clip(q.explanation, POLL_EXPLANATION_MAX) if q.explanation else None,
+        open_period=min(max(timer, POLL_OPEN_PERIOD[0]), POLL_OPEN_PERIOD[1]) if timer else None,
+    )
+    play.message_id = msg.message_id
+
+    # 🗂 poll_id → (player, question step), scored in play_poll_answer
+    forget_poll(user_id)
+    PLAY_POLLS[msg.poll.id] = (user_id, play.index)
+    USER_POLLS[user_id] = msg.poll.id
+
+    # ⏱ Telegram closes the poll; the wheel moves the player on
+    if timer:
+        play_timers.schedule(user_id, timer + POLL_GRACE, question_timed_out, user_id, play, play.index)
+
+async def play_poll_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    mark_interactive()
+    answer = update.poll_answer
+
+    # Not one of our open quiz polls (another mode, restarted, expired…)
+    entry = PLAY_POLLS.get(answer.poll_id)
+    if entry is None or answer.user is None or not answer.option_ids:
+        return
+    user_id, index = entry
+    if answer.user.id != user_id:
+        return
+    forget_poll(user_id)
+
+    play = await get_play_session(context)
+    if not play or play.finished or play.index != index or play.locked:
+        return
+    play_timers.cancel(user_id)
+
+    # ✅ Telegram already showed right / wrong; just score and move on
+    _, _, correct_index = play.current()
+    if answer.option_ids[0] == correct_index:
+        play.score += 1
+    play.advance()
+
+    if play.finished:
+        await finish_play(user_id, answer.user.first_name, play, context)
+        return
+
+    await send_next_question(user_id, context)
 
 async def show_leaderboard(chat_id, quiz_id, bot):
-    cur.execute("""
+    rows = await db.fetchall("""
         SELECT username, score
         FROM leaderboard
         WHERE quiz_id=? AND chat_id=?
-        ORDER BY score DESC
+        ORDER BY score DESC, reached_at, user_id
         LIMIT 10
     """, (quiz_id, chat_id))
 
-    rows = cur.fetchall()
-
     if not rows:
         text = "📊 **Quiz Leaderboard**\n\n_No participants yet._"
     else:
@@ -1947,14 +2268,14 @@ async def show_leaderboard(chat_id, quiz_id, bot):
     )
 
 async def send_quiz_to_group(chat_id, quiz_id, context):
-    cur.execute("""
-        SELECT title, description, timer, shuffle_q, shuffle_a
-        FROM quizzes WHERE quiz_id=?
-    """, (quiz_id,))
-    title, desc, timer, sq, sa = cur.fetchone()
+    snapshot = await quiz_cache.get(quiz_id)
+    if not snapshot:
+        await context.bot.send_message(chat_id=chat_id, text="❌ Quiz not found.")
+        return
 
-    cur.execute("SELECT COUNT(*) FROM questions WHERE quiz_id=?", (quiz_id,))
-    total_questions = cur.fetchone()[0]
+    title, desc, timer = snapshot.title, snapshot.description, snapshot.timer
+    sq, sa = snapshot.shuffle_q, snapshot.shuffle_a
+    total_questions = len(snapshot.questions)
 
     text = f"📘 *{title}*\n"
 
@@ -1971,7 +2292,7 @@ async def send_quiz_to_group(chat_id, quiz_id, context):
         [
             InlineKeyboardButton(
                 "▶️ Start Quiz",
-                url=f"https://t.me/{BOT_USERNAME}?start=PLAY_{quiz_id}"
+                url=play_link(quiz_id, chat_id)
             )
         ]
     ])
@@ -1983,33 +2304,62 @@ async def send_quiz_to_group(chat_id, quiz_id, context):
         parse_mode="Markdown"
     )
 
-    # 🔑 THIS MESSAGE IS BOTH QUIZ + LEADERBOARD
-    GROUP_LB_MESSAGES[quiz_id] = {
+    # 🔑 THIS MESSAGE IS BOTH QUIZ + LEADERBOARD (for this chat only)
+    bind_group_message(quiz_id, chat_id, msg.message_id)
+
+    # 💾 Re-posting starts a fresh board for this chat
+    GROUP_LEADERBOARDS[(quiz_id, chat_id)] = RankedLeaderboard()
+    lb_store.reset(quiz_id, chat_id)
+
+def play_link(quiz_id, chat_id):
+    return f"https://t.me/{BOT_USERNAME}?start=PLAY_{quiz_id}_{chat_id}"
+
+def parse_play_link(arg):
+    # PLAY_<quiz_id>_<chat_id>; links posted before per-chat boards
+    # are PLAY_<quiz_id> only. Returns (quiz_id, chat_id or None).
+    quiz_id, _, chat = arg[len("PLAY_"):].partition("_")
+    chats = GROUP_LB_CHATS.get(quiz_id, set())
+
+    try:
+        chat_id = int(chat)
+    except ValueError:
+        # Old link → the quiz's group, if it's only posted in one
+        return quiz_id, next(iter(chats)) if len(chats) == 1 else None
+
+    # Only chats the quiz was actually posted to get a board
+    return quiz_id, chat_id if chat_id in chats else None
+
+def bind_group_message(quiz_id, chat_id, message_id):
+    key = (quiz_id, chat_id)
+
+    old = GROUP_LB_MESSAGES.get(key)
+    if old and old["message_id"] != message_id:
+        lb_edits.forget(chat_id, old["message_id"])
+
+    GROUP_LB_MESSAGES[key] = {
         "chat_id": chat_id,
-        "message_id": msg.message_id,
+        "message_id": message_id,
         "page": 0
     }
 
-    GROUP_LEADERBOARDS[quiz_id] = {}
-
     # 🔑 SAVE GROUP QUIZ STATE
-    GROUP_QUIZZES[quiz_id] = {
+    GROUP_QUIZZES[key] = {
         "chat_id": chat_id,
-        "message_id": msg.message_id
+        "message_id": message_id
     }
+    GROUP_LB_CHATS.setdefault(quiz_id, set()).add(chat_id)
 
-    GROUP_LEADERBOARDS[quiz_id] = {}
+    lb_store.bind_message(quiz_id, chat_id, message_id)
 
-def build_group_quiz_text(quiz_id, page=0):
-    # Load quiz info
-    cur.execute(
-        "SELECT title, description, timer, shuffle_q, shuffle_a FROM quizzes WHERE quiz_id=?",
-        (quiz_id,)
-    )
-    title, desc, timer, sq, sa = cur.fetchone()
+async def build_group_quiz_text(quiz_id, chat_id, page=0):
+    # Load quiz info (cached snapshot – no DB hit on every finish)
+    snapshot = await quiz_cache.get(quiz_id)
+    if not snapshot:
+        return None, 0
 
-    cur.execute("SELECT COUNT(*) FROM questions WHERE quiz_id=?", (quiz_id,))
-    total_questions = cur.fetchone()[0]
+    title, desc, timer = snapshot.title, snapshot.description, snapshot.timer
+    sq, sa = snapshot.shuffle_q, snapshot.shuffle_a
+    total_questions = len(snapshot.questions)
 
     text = f"📘 *{title}*\n"
     if desc:
@@ -2024,17 +2374,15 @@ def build_group_quiz_text(quiz_id, page=0):
 
     text += "🏆 *Quiz Leaderboard*\n"
 
-    leaderboard = list(GROUP_LEADERBOARDS.get(quiz_id, {}).values())
+    board = GROUP_LEADERBOARDS.get((quiz_id, chat_id))
 
-    if not leaderboard:
+    if not board:
         text += "_No attempts yet_\n"
         return text, 0
 
-    # Sort by score (highest first)
-    leaderboard.sort(key=lambda x: x["score"], reverse=True)
-
+    # Already ranked (highest score first) – just slice the page
     per_page = 5
-    pages = (len(leaderboard) - 1) // per_page + 1
+    pages = (len(board) - 1) // per_page + 1
     page = max(0, min(page, pages - 1))
 
     start = page * per_page
@@ -2046,7 +2394,7 @@ def build_group_quiz_text(quiz_id, page=0):
         3: "🥉"
     }
 
-    for i, user in enumerate(leaderboard[start:end], start=start + 1):
+    for i, user in enumerate(board.page(start, end), start=start + 1):
         prefix = medals.get(i, f"{i}.")
         label = f"{prefix} {user['name']} — {user['score']}"
 
@@ -2054,16 +2402,16 @@ def build_group_quiz_text(quiz_id, page=0):
 
     return text, pages
 
-async def update_group_leaderboard(quiz_id, context):
-    info = GROUP_LB_MESSAGES.get(quiz_id)
-    if not info:
-        return
+async def render_group_leaderboard(quiz_id, chat_id, message_id):
+    info = GROUP_LB_MESSAGES.get((quiz_id, chat_id))
+    if not info or info["message_id"] != message_id:
+        return None
 
-    chat_id = info["chat_id"]
-    message_id = info["message_id"]
     page = info.get("page", 0)
 
-    text, pages = build_group_quiz_text(quiz_id, page)
+    text, pages = await build_group_quiz_text(quiz_id, chat_id, page)
+    if text is None:
+        return None
 
     buttons = []
 
@@ -2077,18 +2425,32 @@ async def update_group_leaderboard(quiz_id, context):
         buttons.append(nav)
 
     buttons.append([
-        InlineKeyboardButton("▶️ Start this Quiz", url=f"https://t.me/{BOT_USERNAME}?start=PLAY_{quiz_id}"
-)
+        InlineKeyboardButton("▶️ Start this Quiz", url=play_link(quiz_id, chat_id))
     ])
 
-    await context.bot.edit_message_text(
-        chat_id=chat_id,
-        message_id=message_id,
-        text=text,
-        reply_markup=InlineKeyboardMarkup(buttons),
-        parse_mode="Markdown"
+    return text, InlineKeyboardMarkup(buttons)
+
+def update_group_leaderboard(quiz_id, chat_id, urgent=False):
+    info = GROUP_LB_MESSAGES.get((quiz_id, chat_id))
+    if not info:
+        return
+
+    message_id = info["message_id"]
+
+    # ⏱ Coalesced: one edit per window, rendered from the latest board
+    lb_edits.schedule(
+        chat_id,
+        message_id,
+        lambda: render_group_leaderboard(quiz_id, chat_id, message_id),
+        urgent=urgent
     )
 
+def refresh_group_leaderboards(quiz_id):
+    # 📣 Fan-out: every group running this quiz. Repeated calls inside one
+    # window collapse into one edit per message; unchanged text is skipped.
+    for chat_id in GROUP_LB_CHATS.get(quiz_id, ()):
+        update_group_leaderboard(quiz_id, chat_id)
+
 async def post_quiz_to_group(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
@@ -2101,7 +2463,9 @@ async def post_quiz_to_group(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await query.message.reply_text(
         "👥 Add this bot to a group and make it admin.\n"
         "Then type this command in the group:\n\n"
-        f"/post_{quiz_id}"
+        f"/post_{quiz_id}\n\n"
+        "🎬 Or play it live, one question at a time for everyone:\n\n"
+        f"/live_{quiz_id}"
     )
 
 async def post_quiz_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -2124,10 +2488,10 @@ async def leaderboard_page_nav(update: Update, context: ContextTypes.DEFAULT_TYP
     query = update.callback_query
     await query.answer()
 
-    data = query.data
-    action, quiz_id = data.split("|", 1)
+    action, quiz_id = router.parse(query.data)
 
-    info = GROUP_LB_MESSAGES.get(quiz_id)
+    chat_id = query.message.chat.id
+    info = GROUP_LB_MESSAGES.get((quiz_id, chat_id))
     if not info:
         return
 
@@ -2142,9 +2506,10 @@ async def leaderboard_page_nav(update: Update, context: ContextTypes.DEFAULT_TYP
         page = 0
 
     info["page"] = page
-    GROUP_LB_MESSAGES[quiz_id] = info
+    lb_store.bind_message(quiz_id, chat_id, info["message_id"], page)
 
-    await update_group_leaderboard(quiz_id, context)
+    # 👆 A user is waiting on this one – skip ahead of score refreshes
+    update_group_leaderboard(quiz_id, chat_id, urgent=True)
 
 async def post_quiz_instructions(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -2158,64 +2523,218 @@ async def post_quiz_instructions(update: Update, context: ContextTypes.DEFAULT_T
     await query.message.reply_text(
         "👥 Add this bot to a group and make it admin.\n\n"
         "Then type this command in the group:\n\n"
-        f"/post_{quiz_id}"
+        f"/post_{quiz_id}\n\n"
+        "🎬 Or play it live, one question at a time for everyone:\n\n"
+        f"/live_{quiz_id}"
     )
 
+# =========================
+# 🎬 GROUP LIVE MODE
+# =========================
+# Each question is posted once in the group and closed by the timer:
+# outbound messages grow with questions, not with players × questions.
+def live_timer_key(chat_id):
+    return ("live", chat_id)
+
+async def live_quiz_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not update.message:
+        return
+
+    chat = update.effective_chat
+    if chat.type not in ("group", "supergroup"):
+        return
+
+    # /live_<quiz_id> or /live_<quiz_id>@BotName
+    quiz_id = update.message.text[len("/live_"):].split("@", 1)[0].strip()
+
+    if chat.id in LIVE_GAMES:
+        await update.message.reply_text("⏳ A live quiz is already running here. /endlive stops it.")
+        return
+
+    snapshot = await quiz_cache.get(quiz_id)
+    if not snapshot or not snapshot.questions:
+        await update.message.reply_text("❌ Quiz not found.")
+        return
+
+    mark_interactive()
+    game = LIVE_GAMES[chat.id] = LiveGame(snapshot, chat.id, update.effective_user.id)
+
+    text = f"🎬 *Live quiz: {snapshot.title}*\n"
+    if snapshot.description:
+        text += f"_{snapshot.description}_\n"
+    text += f"\n📊 {game.total} questions • ⏱ {game.timer}s each\nOnly your first tap counts!"
+    await context.bot.send_message(chat_id=chat.id, text=text, parse_mode="Markdown")
+
+    await send_live_question(context.bot, game)
+
+async def send_live_question(bot, game):
+    q, layout = game.current()
+
+    text = f"❓ {game.step + 1}/{game.total}\n\n{q.text}"
+    keyboard = InlineKeyboardMarkup([
+        [InlineKeyboardButton(option, callback_data=f"LIVE_ANSWER|{game.step}:{i}")]
+        for i, option in enumerate(layout.options)
+    ])
+
+    if q.image:
+        msg = await bot.send_photo(chat_id=game.chat_id, photo=q.image, caption=text, reply_markup=keyboard)
+    else:
+        msg = await bot.send_message(chat_id=game.chat_id, text=text, reply_markup=keyboard)
+    game.message_id = msg.message_id
+
+    # ⏱ The wheel closes the question for everyone
+    play_timers.schedule(live_timer_key(game.chat_id), game.timer, live_question_closed, game.chat_id, game, game.step)
+
+async def live_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Keyed per user, not per chat (see KeyedUpdateProcessor): taps don't
+    # wait on each other or on live_question_closed. The step check and
+    # game.answer() run with no await in between, so a tap still can't
+    # land on a question that has just been closed.
+    query = update.callback_query
+
+    step, _, chosen = router.arg(query.data).partition(":")  # LIVE_ANSWER|{step}:{index}
+    game = LIVE_GAMES.get(query.message.chat.id)
+    if game is None or int(step) != game.step:
+        await query.answer("⌛ This question is closed.")
+        return
+
+    if not game.answer(query.from_user.id, query.from_user.first_name, int(chosen)):
+        await query.answer("☝️ Only your first answer counts.")
+        return
+
+    await query.answer("✅ Answer locked in!")
+
+async def live_question_closed(chat_id, game, step):
+    # Fired by play_timers
+    mark_interactive()
+    async with chat_lock(chat_id):
+        if LIVE_GAMES.get(chat_id) is not game or game.step != step:
+            return
+
+        q, layout = game.current()
+        right, answered = game.advance()
+
+        # 🔓 REVEAL: the one question message shows the answer and the tally
+        text = (
+            f"❓ {step + 1}/{game.total}\n\n{q.text}\n\n"
+            f"✅ {layout.options[layout.correct]}\n"
+            f"👥 {right} of {answered} got it right"
+        )
+        keyboard = InlineKeyboardMarkup([
+            [InlineKeyboardButton(f"✅ {option}" if i == layout.correct else option, callback_data="LOCKED")]
+            for i, option in enumerate(layout.options)
+        ])
+        try:
+            if q.image:
+                await app.bot.edit_message_caption(
+                    chat_id=chat_id, message_id=game.message_id, caption=text, reply_markup=keyboard
+                )
+            else:
+                await app.bot.edit_message_text(
+                    text, chat_id=chat_id, message_id=game.message_id, reply_markup=keyboard
+                )
+        except BadRequest:
+            pass
+
+        if game.finished:
+            await finish_live(app.bot, game)
+            return
+
+        await send_live_question(app.bot, game)
+
+async def finish_live(bot, game):
+    LIVE_GAMES.pop(game.chat_id, None)
+    play_timers.cancel(live_timer_key(game.chat_id))
+
+    standings = game.standings()
+    if not standings:
+        await bot.send_message(chat_id=game.chat_id, text="🏁 Live quiz over – nobody answered.")
+        return
+
+    # 🏆 Same board (and attempt rules) as this group's deep-link players
+    changed = False
+    for user_id, name, score in standings:
+        _, updated = record_result(game.quiz_id, game.chat_id, user_id, name, score)
+        changed = changed or updated
+    if changed:
+        update_group_leaderboard(game.quiz_id, game.chat_id)
+
+    medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+    text = "🏁 Live quiz finished!\n\n"
+    for i, (_, name, score) in enumerate(standings[:10], start=1):
+        text += f"{medals.get(i, f'{i}.')} {name} — {score}/{game.total}\n"
+    if len(standings) > 10:
+        text += f"…and {len(standings) - 10} more"
+
+    await bot.send_message(chat_id=game.chat_id, text=text)
+
+async def end_live_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    chat = update.effective_chat
+    game = LIVE_GAMES.get(chat.id)
+    if game is None:
+        return
+
+    # Only whoever started it
+    if update.effective_user.id != game.started_by:
+        await update.message.reply_text("🚫 Only the player who started this live quiz can end it.")
+        return
+
+    await finish_live(context.bot, game)
+
 async def folder_prev(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    folder = query.data.split("|", 1)[1]
-    key = f"folder_page_{folder}"
-    context.user_data[key] = max(0, context.user_data.get(key, 0) - 1)
-
-    await show_quizzes_in_folder(query.message, context, folder)
+    folder = router.arg(query.data)
+    await show_quizzes_in_folder(query.message, context, folder, move=-1)
 
 async def folder_next(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
-    folder = query.data.split("|", 1)[1]
-    key = f"folder_page_{folder}"
-    context.user_data[key] = context.user_data.get(key, 0) + 1
-
-    await show_quizzes_in_folder(query.message, context, folder)
+    folder = router.arg(query.data)
+    await show_quizzes_in_folder(query.message, context, folder, move=1)
 
 async def copy_question_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # 📋 Copy the open question
+    source_qid = context.user_data.get("active_question_id")
+    context.user_data["copy_question_ids"] = [source_qid] if source_qid else []
+    context.user_data["copy_mode"] = "copy"
+    context.user_data["copy_in_place"] = False
+    context.user_data.pop("copy_q_cursor", None)
+    await show_copy_targets(update, context)
+
+async def show_copy_targets(update: Update, context: ContextTypes.DEFAULT_TYPE, move=0):
     query = update.callback_query
     await query.answer()
 
-    source_qid = context.user_data.get("active_question_id")
     source_quiz_id = context.user_data.get("active_quiz_id")
+    # What COPY_TO copies (set by whoever opened this picker)
+    copy_ids = context.user_data.get("copy_question_ids")
 
-    if not source_qid or not source_quiz_id:
+    if not copy_ids or not source_quiz_id:
         await query.message.reply_text("❌ No question selected.")
         return
 
     context.user_data["state"] = "COPY_QUESTION"
-    page = context.user_data.get("copy_q_page", 0)
-
-    cur.execute(
-        "SELECT quiz_id, title FROM quizzes WHERE owner_id=? ORDER BY title",
-        (OWNER_USER_ID,)
-    )
-    quizzes = cur.fetchall()
-
-    source_quiz_id = context.user_data.get("active_quiz_id")
-
-    # ❌ Prevent copying into the same quiz
-    quizzes = [q for q in quizzes if q[0] != source_quiz_id]
 
     per_page = 5
-    pages = (len(quizzes) - 1) // per_page + 1
-    page = max(0, min(page, pages - 1))
-
-    start = page * per_page
-    end = start + per_page
+    # ❌ Prevent copying into the same quiz
+    total = await db.fetchval(
+        "SELECT COUNT(*) FROM quizzes WHERE owner_id=? AND quiz_id != ?",
+        (OWNER_USER_ID, source_quiz_id)
+    )
+    quizzes, page, pages = await list_page(
+        db, context.user_data, "copy_q_cursor",
+        "SELECT quiz_id, title, rowid FROM quizzes WHERE owner_id=? AND quiz_id != ?",
+        (OWNER_USER_ID, source_quiz_id),
+        "title", "rowid", lambda row: (row[1], row[2]),
+        total, per_page, move
+    )
 
     keyboard = []
 
-    for quiz_id, title in quizzes[start:end]:
+    for quiz_id, title, _ in quizzes:
         keyboard.append([
             InlineKeyboardButton(
                 f"📘 {title}",
@@ -2233,12 +2752,18 @@ async def copy_question_start(update: Update, context: ContextTypes.DEFAULT_TYPE
             nav.append(InlineKeyboardButton("Next ▶", callback_data="COPY_Q_NEXT"))
         keyboard.append(nav)
 
+    # Opened from the list's selection → the picker replaces the list
+    in_place = context.user_data.get("copy_in_place", False)
+
     keyboard.append([
-        InlineKeyboardButton("⬅️ Cancel", callback_data="EDIT_QUESTIONS")
+        InlineKeyboardButton("⬅️ Cancel", callback_data="QSEL_CANCEL" if in_place else "EDIT_QUESTIONS")
     ])
 
-    await query.message.reply_text(
-        "📋 *Copy Question*\n\nSelect target quiz:",
+    verb = "Move" if context.user_data.get("copy_mode") == "move" else "Copy"
+    title = f"{verb} Question" if len(copy_ids) == 1 else f"{verb} {len(copy_ids)} Questions"
+    send = query.message.edit_text if in_place else query.message.reply_text
+    await send(
+        f"📋 *{title}*\n\nSelect target quiz:",
         reply_markup=InlineKeyboardMarkup(keyboard),
         parse_mode="Markdown"
     )
@@ -2247,69 +2772,207 @@ async def copy_question_apply(update: Update, context: ContextTypes.DEFAULT_TYPE
     query = update.callback_query
     await query.answer()
 
-    target_quiz_id = query.data.split("|", 1)[1]
-    source_qid = context.user_data.get("active_question_id")
+    target_quiz_id = router.arg(query.data)
+    source_quiz_id = context.user_data.get("active_quiz_id")
+    copy_ids = context.user_data.get("copy_question_ids")
+    move = context.user_data.pop("copy_mode", "copy") == "move"
+    in_place = context.user_data.pop("copy_in_place", False)
 
-    if not source_qid:
+    if not copy_ids:
         await query.message.reply_text("❌ Source question not found.")
         return
 
-    # Load source question
-    cur.execute("""
-        SELECT question, image_file_id, options, correct, explanation
-        FROM questions
-        WHERE id=?
-    """, (source_qid,))
-    row = cur.fetchone()
+    # One statement for all of them; the ids travel as one JSON array
+    if move:
+        # 📁 MOVE: re-point the rows
+        changed = await db.execute("""
+            UPDATE questions SET quiz_id=?
+            WHERE quiz_id=? AND id IN (SELECT value FROM json_each(?))
+        """, (target_quiz_id, source_quiz_id, json.dumps(copy_ids)))
+        invalidate_quiz(source_quiz_id)
+    else:
+        # 📋 COPY: INSERT … SELECT
+        changed = await db.execute("""
+            INSERT INTO questions (
+                quiz_id,
+                question,
+                image_file_id,
+                options,
+                correct,
+                explanation
+            )
+            SELECT ?, question, image_file_id, options, correct, explanation
+            FROM questions
+            WHERE quiz_id=? AND id IN (SELECT value FROM json_each(?))
+            ORDER BY id
+        """, (target_quiz_id, source_quiz_id, json.dumps(copy_ids)))
+    invalidate_quiz(target_quiz_id)
 
-    if not row:
+    context.user_data.pop("state", None)
+    context.user_data.pop("copy_question_ids", None)
+
+    # ☑️ Bulk action from the list → back to the list, in the same message
+    if in_place:
+        context.user_data["selected_questions"] = set()
+        notice = f"📁 {changed} question(s) moved." if move else f"📋 {changed} question(s) copied."
+        await refresh_question_list(query, context, notice)
+        return
+
+    if not changed:
         await query.message.reply_text("❌ Question not found.")
         return
 
-    question, image, options, correct, explanation = row
+    await query.message.reply_text(
+        "✅ Question copied successfully." if changed == 1 else f"✅ {changed} questions copied successfully."
+    )
 
-    # Insert duplicated question
-    cur.execute("""
-        INSERT INTO questions (
-            quiz_id,
-            question,
-            image_file_id,
-            options,
-            correct,
-            explanation
-        )
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        target_quiz_id,
-        question,
-        image,
-        options,
-        correct,
-        explanation
-    ))
+    # Return to questions list
+    await show_questions_from_message(query.message, context)
 
-    conn.commit()
+# =========================
+# ☑️ MULTI-SELECT ON THE QUESTION LIST
+# =========================
+def selected_question_ids(context):
+    return sorted(context.user_data.setdefault("selected_questions", set()))
+
+async def toggle_question_selection(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    qid = int(router.arg(query.data))
+    selected = context.user_data.setdefault("selected_questions", set())
+    if qid in selected:
+        selected.discard(qid)
+    else:
+        selected.add(qid)
+
+    await refresh_question_list(query, context)
+
+async def select_question_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    page_rows, _, _, _ = await question_page_rows(context)
+    ids = {qid for qid, _ in page_rows}
+    selected = context.user_data.setdefault("selected_questions", set())
+
+    # Whole page already ticked → untick it
+    if ids <= selected:
+        selected -= ids
+    else:
+        selected |= ids
+
+    await refresh_question_list(query, context)
+
+async def clear_question_selection(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    context.user_data["selected_questions"] = set()
+    await refresh_question_list(query, context)
+
+async def back_to_question_list(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
 
     context.user_data.pop("state", None)
+    await refresh_question_list(query, context)
 
-    await query.message.reply_text(
-        "✅ Question copied successfully."
-    )
+async def bulk_delete_questions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
 
-    # Return to questions list
-    await show_questions(update, context)
+    count = len(selected_question_ids(context))
+    if not count:
+        await refresh_question_list(query, context)
+        return
 
-async def copy_q_prev(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await query.message.edit_text(
+        f"❗ Delete {count} selected question(s)?",
+        reply_markup=InlineKeyboardMarkup([[
+            InlineKeyboardButton("✅ Yes, delete", callback_data="QSEL_DELETE_YES"),
+            InlineKeyboardButton("❌ Cancel", callback_data="QSEL_CANCEL"),
+        ]])
+    )
+
+async def bulk_delete_apply(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    context.user_data["copy_q_page"] = max(0, context.user_data.get("copy_q_page", 0) - 1)
-    await copy_question_start(update, context)
+
+    quiz_id = context.user_data["active_quiz_id"]
+    ids = selected_question_ids(context)
+
+    # 🗑 One statement for the whole selection
+    deleted = await db.execute(
+        "DELETE FROM questions WHERE quiz_id=? AND id IN (SELECT value FROM json_each(?))",
+        (quiz_id, json.dumps(ids))
+    )
+    invalidate_quiz(quiz_id)
+    context.user_data["selected_questions"] = set()
+
+    await refresh_question_list(query, context, f"🗑 {deleted} question(s) deleted.")
+
+async def bulk_copy_questions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # 📋 / 📁 The selection goes through the COPY_TO target picker,
+    # shown in place of the list
+    action, _ = router.parse(update.callback_query.data)
+
+    context.user_data["copy_question_ids"] = selected_question_ids(context)
+    context.user_data["copy_mode"] = "move" if action == "QSEL_MOVE" else "copy"
+    context.user_data["copy_in_place"] = True
+    context.user_data.pop("copy_q_cursor", None)
+    await show_copy_targets(update, context)
+
+async def copy_q_prev(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_copy_targets(update, context, move=-1)
 
 async def copy_q_next(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await show_copy_targets(update, context, move=1)
+
+# =========================
+# 🧬 CLONE QUIZ
+# =========================
+async def clone_quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    context.user_data["copy_q_page"] = context.user_data.get("copy_q_page", 0) + 1
-    await copy_question_start(update, context)
+
+    source_quiz_id = context.user_data.get("active_quiz_id")
+    if not source_quiz_id:
+        await query.message.reply_text("❌ No quiz selected.")
+        return
+
+    new_quiz_id = str(uuid.uuid4())
+
+    def clone(conn):
+        # Quiz row + every question, set-based, in one write transaction
+        cursor = conn.execute("""
+            INSERT INTO quizzes (quiz_id, owner_id, title, description, folder, shuffle_q, shuffle_a, timer, play_mode)
+            SELECT ?, owner_id, title || ' (copy)', description, folder, shuffle_q, shuffle_a, timer, play_mode
+            FROM quizzes
+            WHERE quiz_id=?
+        """, (new_quiz_id, source_quiz_id))
+        if cursor.rowcount == 0:
+            return None
+
+        cursor = conn.execute("""
+            INSERT INTO questions (quiz_id, question, image_file_id, options, correct, explanation)
+            SELECT ?, question, image_file_id, options, correct, explanation
+            FROM questions
+            WHERE quiz_id=?
+            ORDER BY id
+        """, (new_quiz_id, source_quiz_id))
+        return cursor.rowcount
+
+    copied = await db.run(clone)
+    if copied is None:
+        await query.message.reply_text("❌ Quiz not found.")
+        return
+
+    await query.message.reply_text(f"🧬 Quiz cloned with {copied} questions.")
+
+    # Continue in the copy
+    context.user_data["active_quiz_id"] = new_quiz_id
+    await show_quiz_action_menu(query.message, context)
 
 async def confirm_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -2323,28 +2986,32 @@ async def confirm_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
     dtype, value = data
 
     if dtype == "QUESTION":
-        cur.execute("DELETE FROM questions WHERE id=?", (value,))
-        conn.commit()
+        await db.execute("DELETE FROM questions WHERE id=?", (value,))
+        invalidate_quiz(context.user_data.get("active_quiz_id"))
+        context.user_data.get("selected_questions", set()).discard(value)
         await query.message.reply_text("🗑 Question deleted.")
         await show_questions(update, context)
 
     elif dtype == "QUIZ":
-        cur.execute("DELETE FROM questions WHERE quiz_id=?", (value,))
-        cur.execute("DELETE FROM quizzes WHERE quiz_id=?", (value,))
-        conn.commit()
+        await db.transaction([
+            ("DELETE FROM questions WHERE quiz_id=?", (value,)),
+            ("DELETE FROM quizzes WHERE quiz_id=?", (value,)),
+        ])
+        invalidate_quiz(value)
         await query.message.reply_text("🗑 Quiz deleted.")
         await my_quizzes(query.message, context)
 
     elif dtype == "FOLDER":
-        cur.execute(
-            "UPDATE quizzes SET folder='Default' WHERE folder=?",
-            (value,)
-        )
-        cur.execute(
-            "DELETE FROM folders WHERE name=?",
-            (value,)
-        )
-        conn.commit()
+        await db.transaction([
+            (
+                "UPDATE quizzes SET folder='Default' WHERE folder=?",
+                (value,)
+            ),
+            (
+                "DELETE FROM folders WHERE name=?",
+                (value,)
+            ),
+        ])
         await query.message.reply_text("🗑 Folder deleted.")
         await show_quiz_folders(query.message, context)
 
@@ -2356,78 +3023,197 @@ async def cancel_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await query.message.reply_text("❌ Deletion cancelled.")
 
+async def answer_only(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Locked answers / page counters – just stop the spinner
+    await update.callback_query.answer()
+
 # =========================
-# HANDLERS
+# STATS (OWNER)
 # =========================
-# load_owner_from_db()
-ensure_default_folder()
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.effective_user.id != OWNER_USER_ID:
+        return
 
-app = ApplicationBuilder().token(BOT_TOKEN).build()
+    cache = quiz_cache.stats()
+    limits = rate_limiter.stats()
+
+    text = (
+        "📈 *Bot stats*\n\n"
+        f"🗂 Quiz cache: {cache['entries']} quizzes, {cache['bytes'] // 1024} KB\n"
+        f"   hits {cache['hits']} • misses {cache['misses']} • coalesced {cache['coalesced']} • "
+        f"evictions {cache['evictions']} • hit rate {cache['hit_rate']:.0%}\n"
+        f"💾 DB commits: {db.batches} ({db.batched_writes} writes)\n"
+        f"🧷 User state rows: {persistence.rows_written} written, "
+        f"{persistence.rows_skipped} unchanged\n"
+        f"🏆 Leaderboards: {len(GROUP_LEADERBOARDS)} boards in {len(GROUP_LB_MESSAGES)} group messages, "
+        f"{lb_store.flushes} flushes ({lb_store.rows_flushed} rows), {lb_store.pending} pending\n"
+        f"✏️ Leaderboard edits: {lb_edits.sent} sent of {lb_edits.requested} requested • "
+        f"coalesced {lb_edits.coalesced} • unchanged {lb_edits.skipped} • "
+        f"429 retries {lb_edits.retried} • failed {lb_edits.failed}\n"
+        f"🔘 Buttons: {router.dispatched} routed, {router.unrouted} stale\n"
+        f"⚙️ Updates: {update_processor.processed} processed • "
+        f"{update_processor.active_keys} users/chats busy • {update_processor.contended} waited in line\n"
+        f"⏱ Question timers: {len(play_timers)} running • {play_timers.fired} expired • "
+        f"{play_timers.cancelled} answered in time • {len(PLAY_POLLS)} quiz polls open\n"
+        f"🎬 Live group quizzes: {len(LIVE_GAMES)} running\n"
+        f"🚦 Outbound: {limits['sent']} sent • queued {limits['queued_interactive']} interactive / "
+        f"{limits['queued_background']} background (peak {limits['max_queued']}) • "
+        f"429 retries {limits['retries']}"
+    )
+
+    await update.message.reply_text(text, parse_mode="Markdown")
+
+def health_stats():
+    # Extra fields for the webhook /healthz endpoint
+    return {
+        "db_commits": db.batches,
+        "quiz_cache_entries": quiz_cache.stats()["entries"],
+        "leaderboard_rows_pending": lb_store.pending,
+        "leaderboard_edits_pending": lb_edits.pending,
+        "question_timers": len(play_timers),
+        "quiz_polls_open": len(PLAY_POLLS),
+        "live_games": len(LIVE_GAMES),
+        **{f"outbound_{k}": v for k, v in rate_limiter.stats().items()},
+    }
+
+# =========================
+# HANDLERS
+# =========================
+async def on_startup(application):
+    # await load_owner_from_db()
+    await ensure_default_folder()
+    await load_group_leaderboards()
+    lb_store.start()
+    lb_edits.bot = application.bot
+    play_timers.start()
+
+async def on_shutdown(application):
+    await play_timers.stop()
+    await lb_edits.stop()
+    await lb_store.stop()
+    db.close()
+
+app = (
+    ApplicationBuilder()
+    .token(BOT_TOKEN)
+    .persistence(persistence)
+    .concurrent_updates(update_processor)
+    .rate_limiter(rate_limiter)
+    .post_init(on_startup)
+    .post_shutdown(on_shutdown)
+    .build()
+)
 
 app.add_handler(CommandHandler("start", start))
+app.add_handler(CommandHandler("stats", stats_command))
 app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
 app.add_handler(MessageHandler(filters.PHOTO, handle_photo))
+app.add_handler(MessageHandler(filters.Document.ALL, handle_document))
 app.add_handler(MessageHandler(filters.Regex(r"^/post_"), post_quiz_command))
-app.add_handler(CallbackQueryHandler(confirm_delete, pattern="^CONFIRM_DELETE$"))
-app.add_handler(CallbackQueryHandler(cancel_delete, pattern="^CANCEL_DELETE$"))
-app.add_handler(CallbackQueryHandler(copy_question_apply, pattern="^COPY_TO\\|"))
-app.add_handler(CallbackQueryHandler(copy_question_start, pattern="^COPY_Q$"))
-app.add_handler(CallbackQueryHandler(folder_prev, pattern="^FOLDER_PREV\\|"))
-app.add_handler(CallbackQueryHandler(folder_next, pattern="^FOLDER_NEXT\\|"))
-app.add_handler(CallbackQueryHandler(post_quiz_instructions, pattern="^POST_QUIZ$"))
-app.add_handler(CallbackQueryHandler(play_start, pattern="^START_THIS$"))
-app.add_handler(CallbackQueryHandler(leaderboard_page_nav, pattern="^LB_PREV\\|"))
-app.add_handler(CallbackQueryHandler(leaderboard_page_nav, pattern="^LB_NEXT\\|"))
-app.add_handler(CallbackQueryHandler(post_quiz_to_group, pattern="^POST_TO_GROUP$"))
-app.add_handler(CallbackQueryHandler(lambda u, c: u.callback_query.answer(), pattern="^LOCKED$"))
-app.add_handler(CallbackQueryHandler(play_start, pattern="^PLAY_START$"))
-app.add_handler(CallbackQueryHandler(play_answer, pattern="^PLAY_ANSWER_"))
-app.add_handler(CallbackQueryHandler(edit_question_explanation_start, pattern="^EDIT_Q_EXPLANATION$"))
-app.add_handler(CallbackQueryHandler(edit_question_explanation_remove, pattern="^EDIT_Q_EXPL_REMOVE$"))
-app.add_handler(CallbackQueryHandler(edit_question_correct_start, pattern="^EDIT_Q_CORRECT$"))
-app.add_handler(CallbackQueryHandler(edit_question_correct_apply, pattern="^EDIT_CORRECT_"))
-app.add_handler(CallbackQueryHandler(edit_question_options_start, pattern="^EDIT_Q_OPTIONS$"))
-app.add_handler(CallbackQueryHandler(edit_question_image_send, pattern="^EDIT_Q_IMAGE_SEND$"))
-app.add_handler(CallbackQueryHandler(edit_question_image_start, pattern="^EDIT_Q_IMAGE$"))
-app.add_handler(CallbackQueryHandler(remove_question_image, pattern="^EDIT_Q_IMAGE_REMOVE$"))
-app.add_handler(CallbackQueryHandler(edit_question_back, pattern="^EDIT_Q_BACK$"))
-app.add_handler(CallbackQueryHandler(edit_question_text_start, pattern="^EDIT_Q_TEXT$"))
-app.add_handler(CallbackQueryHandler(edit_question_menu, pattern="^EDIT_Q$"))
-app.add_handler(CallbackQueryHandler(back_to_question_options, pattern="^BACK_TO_Q_OPTIONS$"))
-app.add_handler(CallbackQueryHandler(preview_question, pattern="^PREVIEW_Q$"))
-app.add_handler(CallbackQueryHandler(skip_question_explanation, pattern="^SKIP_Q_EXPLANATION$"))
-app.add_handler(CallbackQueryHandler(choose_correct_answer, pattern="^CORRECT_"))
-app.add_handler(CallbackQueryHandler(skip_question_image, pattern="^SKIP_Q_IMAGE$"))
-app.add_handler(CallbackQueryHandler(back_to_edit_menu, pattern="^BACK_TO_EDIT_MENU$"))
-app.add_handler(CallbackQueryHandler(back_to_quizzes, pattern="^BACK_TO_QUIZZES$"))
-app.add_handler(CallbackQueryHandler(delete_folder, pattern="^DELETE_FOLDER\\|"))
-app.add_handler(CallbackQueryHandler(delete_quiz, pattern="^DELETE_QUIZ$"))
-app.add_handler(CallbackQueryHandler(go_home, pattern="^GO_HOME$"))
-app.add_handler(CallbackQueryHandler(home_create_quiz, pattern="^HOME_CREATE$"))
-app.add_handler(CallbackQueryHandler(home_my_quizzes, pattern="^HOME_MY_QUIZZES$"))
-app.add_handler(CallbackQueryHandler(move_create_folder_start, pattern="^MOVE_CREATE_FOLDER$"))
-app.add_handler(CallbackQueryHandler(move_quiz_menu, pattern="^MOVE_QUIZ$"))
-app.add_handler(CallbackQueryHandler(move_quiz_to_folder, pattern="^MOVE_QUIZ_TO\\|"))
-app.add_handler(CallbackQueryHandler(add_folder_start, pattern="^ADD_FOLDER$"))
-app.add_handler(CallbackQueryHandler(rename_folder_start, pattern="^RENAME_FOLDER\\|"))
-app.add_handler(CallbackQueryHandler(open_folder, pattern="^OPEN_FOLDER\\|"))
-app.add_handler(CallbackQueryHandler(back_to_folders, pattern="^BACK_TO_FOLDERS$"))
-app.add_handler(CallbackQueryHandler(questions_prev, pattern="^QPAGE_PREV$"))
-app.add_handler(CallbackQueryHandler(questions_next, pattern="^QPAGE_NEXT$"))
-app.add_handler(CallbackQueryHandler(preview_question, pattern="^Q_"))
-app.add_handler(CallbackQueryHandler(quiz_action_menu, pattern="^QUIZ_"))
-app.add_handler(CallbackQueryHandler(edit_menu, pattern="^EDIT_THIS$"))
-app.add_handler(CallbackQueryHandler(edit_title, pattern="^EDIT_TITLE$"))
-app.add_handler(CallbackQueryHandler(edit_desc, pattern="^EDIT_DESC$"))
-app.add_handler(CallbackQueryHandler(edit_timer_menu, pattern="^EDIT_TIMER$"))
-app.add_handler(CallbackQueryHandler(set_timer, pattern="^SET_TIMER_"))
-app.add_handler(CallbackQueryHandler(edit_shuffle_menu, pattern="^EDIT_SHUFFLE$"))
-app.add_handler(CallbackQueryHandler(toggle_shuffle, pattern="^TOGGLE_"))
-app.add_handler(CallbackQueryHandler(show_questions, pattern="^EDIT_QUESTIONS$"))
-app.add_handler(CallbackQueryHandler(add_new_question, pattern="^ADD_QUESTION$"))
-app.add_handler(CallbackQueryHandler(back_to_action, pattern="^BACK_TO_ACTION$"))
-app.add_handler(CallbackQueryHandler(edit_correct_answer, pattern="^EDIT_CORRECT$"))
-app.add_handler(CallbackQueryHandler(delete_question, pattern="^DELETE_QUESTION$"))
+app.add_handler(MessageHandler(filters.Regex(r"^/live_"), live_quiz_command))
+app.add_handler(CommandHandler("endlive", end_live_command))
+app.add_handler(PollAnswerHandler(play_poll_answer))
+# 🔘 Inline buttons: callback_data is "ACTION" or "ACTION|arg"
+router = CallbackRouter()
+router.add("CONFIRM_DELETE", confirm_delete)
+router.add("CANCEL_DELETE", cancel_delete)
+router.add("COPY_TO", copy_question_apply)
+router.add("COPY_Q", copy_question_start)
+router.add("COPY_Q_PREV", copy_q_prev)
+router.add("COPY_Q_NEXT", copy_q_next)
+router.add("CLONE_QUIZ", clone_quiz)
+router.add("FOLDER_PREV", folder_prev)
+router.add("FOLDER_NEXT", folder_next)
+router.add("POST_QUIZ", post_quiz_instructions)
+router.add("START_THIS", play_start)
+router.add("LB_PREV", leaderboard_page_nav)
+router.add("LB_NEXT", leaderboard_page_nav)
+router.add("POST_TO_GROUP", post_quiz_to_group)
+router.add("LOCKED", answer_only)
+router.add("FOLDER_NOP", answer_only)
+router.add("QPAGE_NOP", answer_only)
+router.add("LB_NOP", answer_only)
+router.add("COPY_Q_NOP", answer_only)
+router.add("PLAY_START", play_start)
+router.add("PLAY_ANSWER", play_answer)
+router.add("LIVE_ANSWER", live_answer)
+router.add("EDIT_Q_EXPLANATION", edit_question_explanation_start)
+router.add("EDIT_Q_EXPL_REMOVE", edit_question_explanation_remove)
+router.add("EDIT_Q_CORRECT", edit_question_correct_start)
+router.add("SET_CORRECT", edit_question_correct_apply)
+router.add("EDIT_Q_OPTIONS", edit_question_options_start)
+router.add("EDIT_Q_IMAGE_SEND", edit_question_image_send)
+router.add("EDIT_Q_IMAGE", edit_question_image_start)
+router.add("EDIT_Q_IMAGE_REMOVE", remove_question_image)
+router.add("EDIT_Q_BACK", edit_question_back)
+router.add("EDIT_Q_TEXT", edit_question_text_start)
+router.add("EDIT_Q", edit_question_menu)
+router.add("BACK_TO_Q_OPTIONS", back_to_question_options)
+router.add("SKIP_Q_EXPLANATION", skip_question_explanation)
+router.add("CORRECT", choose_correct_answer)
+router.add("OPTIONS_DONE", options_done)
+router.add("EDIT_OPTIONS_DONE", edit_options_done)
+router.add("SKIP_Q_IMAGE", skip_question_image)
+router.add("BACK_TO_EDIT_MENU", back_to_edit_menu)
+router.add("BACK_TO_QUIZZES", back_to_quizzes)
+router.add("DELETE_FOLDER", delete_folder)
+router.add("DELETE_QUIZ", delete_quiz)
+router.add("GO_HOME", go_home)
+router.add("HOME_CREATE", home_create_quiz)
+router.add("HOME_MY_QUIZZES", home_my_quizzes)
+router.add("MOVE_CREATE_FOLDER", move_create_folder_start)
+router.add("MOVE_QUIZ", move_quiz_menu)
+router.add("MOVE_QUIZ_TO", move_quiz_to_folder)
+router.add("ADD_FOLDER", add_folder_start)
+router.add("RENAME_FOLDER", rename_folder_start)
+router.add("OPEN_FOLDER", open_folder)
+router.add("BACK_TO_FOLDERS", back_to_folders)
+router.add("QPAGE_PREV", questions_prev)
+router.add("QPAGE_NEXT", questions_next)
+router.add("QSEL", toggle_question_selection)
+router.add("QSEL_PAGE", select_question_page)
+router.add("QSEL_CLEAR", clear_question_selection)
+router.add("QSEL_CANCEL", back_to_question_list)
+router.add("QSEL_DELETE", bulk_delete_questions)
+router.add("QSEL_DELETE_YES", bulk_delete_apply)
+router.add("QSEL_MOVE", bulk_copy_questions)
+router.add("QSEL_COPY", bulk_copy_questions)
+router.add("Q", preview_question)
+router.add("QUIZ", quiz_action_menu)
+router.add("EDIT_THIS", edit_menu)
+router.add("EDIT_TITLE", edit_title)
+router.add("EDIT_DESC", edit_desc)
+router.add("EDIT_TIMER", edit_timer_menu)
+router.add("SET_TIMER", set_timer)
+router.add("EDIT_SHUFFLE", edit_shuffle_menu)
+router.add("TOGGLE", toggle_shuffle)
+router.add("PLAY_MODE", toggle_play_mode)
+router.add("EDIT_QUESTIONS", show_questions)
+router.add("ADD_QUESTION", add_new_question)
+router.add("IMPORT_QUESTIONS", import_questions_start)
+router.add("EXPORT_QUIZ", export_quiz_menu)
+router.add("EXPORT_AS", export_quiz_send)
+router.add("BACK_TO_ACTION", back_to_action)
+router.add("EDIT_CORRECT", edit_correct_answer)
+router.add("DELETE_QUESTION", delete_question)
+
+# Buttons sent before "ACTION|arg" (still in chat history)
+router.add_legacy("PLAY_ANSWER_", "PLAY_ANSWER")
+router.add_legacy("EDIT_CORRECT_", "SET_CORRECT")
+router.add_legacy("CORRECT_", "CORRECT")
+router.add_legacy("QUIZ_", "QUIZ")
+router.add_legacy("Q_", "Q")
+router.add_legacy("SET_TIMER_", "SET_TIMER")
+router.add_legacy("TOGGLE_", "TOGGLE")
+
+router.check()
+app.add_handler(CallbackQueryHandler(router.dispatch))
 
 print("✅ QuizBot Clone is running...")
-app.run_polling()
+
+if os.environ.get("WEBHOOK_URL"):
+    # 🌐 Webhook mode (needs python-telegram-bot[webhooks])
+    from webhook import run_webhook
+    run_webhook(app, health=health_stats)
+else:
+    app.run_polling()
@@ -0,0 +1,252 @@
+# quizcache.py
+# Compiled, immutable quiz snapshots with an in-process LRU.
+# Editing handlers invalidate the entry; the next reader recompiles it.
+
+import asyncio
+import math
+import random
+import sys
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from quizdb import unpack_options
+
+CACHE_MAX_ENTRIES = 512
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rough fixed cost of the tuples around each question
+_QUESTION_OVERHEAD = 200
+
+# Option orders per question when shuffle_a is on. Players draw one of
+# these, so each order's keyboards are rendered once and shared.
+SHUFFLE_VARIANTS = 12
+
+# classic: a new message per question
+# inplace: one message, edited into the next question after each answer
+# poll:    Telegram quiz polls; Telegram shows the feedback and runs the timer
+PLAY_MODES = ("classic", "inplace", "poll")
+
+
+# =========================
+# SNAPSHOT
+# =========================
+class Layout(NamedTuple):
+    options: tuple      # display order
+    correct: int        # display index of the correct option
+
+
+class Question(NamedTuple):
+    id: int
+    text: str
+    image: Optional[str]
+    options: tuple
+    correct: int
+    explanation: Optional[str]
+    layouts: tuple      # Layout per option order (one when not shuffled)
+
+
+class QuizSnapshot(NamedTuple):
+    quiz_id: str
+    title: str
+    description: Optional[str]
+    timer: int
+    shuffle_q: bool
+    shuffle_a: bool
+    play_mode: str
+    questions: tuple
+    size: int
+    keyboards: Optional[object] = None  # [question, layout] -> keyboards, rendered on first use (see QuizCache.render)
+
+
+def _text_size(text):
+    return sys.getsizeof(text) if text else 0
+
+
+def _layouts(qid, options, correct, shuffle):
+    identity = tuple(range(len(options)))
+    perms = [identity]
+    if shuffle and len(options) > 1:
+        # Seeded by question id: recompiling gives the same layouts, so a
+        # session restored after a restart still points at the same orders
+        rng = random.Random(qid)
+        wanted = min(SHUFFLE_VARIANTS, math.factorial(len(options)))
+        perms = []
+        while len(perms) < wanted:
+            perm = tuple(rng.sample(identity, len(identity)))
+            if perm not in perms:
+                perms.append(perm)
+    return tuple(Layout(tuple(options[i] for i in perm), perm.index(correct)) for perm in perms)
+
+
+def compile_snapshot(quiz_row, question_rows):
+    quiz_id, title, description, timer, shuffle_q, shuffle_a, play_mode = quiz_row
+
+    size = _text_size(title) + _text_size(description)
+    questions = []
+    for qid, text, image, options, correct, explanation in question_rows:
+        opts = unpack_options(options)
+        layouts = _layouts(qid, opts, correct, shuffle_a)
+        questions.append(Question(qid, text, image, opts, correct, explanation, layouts))
+        size += _QUESTION_OVERHEAD + _text_size(text) + _text_size(image) + _text_size(explanation)
+        size += sum(_text_size(o) for o in opts)
+        size += sum(sys.getsizeof(layout) + sys.getsizeof(layout.options) for layout in layouts)
+
+    return QuizSnapshot(
+        quiz_id=quiz_id,
+        title=title,
+        description=description,
+        timer=timer,
+        shuffle_q=bool(shuffle_q),
+        shuffle_a=bool(shuffle_a),
+        play_mode=play_mode if play_mode in PLAY_MODES else "classic",
+        questions=tuple(questions),
+        size=size,
+    )
+
+
+def _load_snapshot(conn, quiz_id):
+    # Both reads in one transaction, so settings and questions match
+    conn.execute("BEGIN")
+    try:
+        quiz_row = conn.execute(
+            "SELECT quiz_id, title, description, timer, shuffle_q, shuffle_a, play_mode "
+            "FROM quizzes WHERE quiz_id=?",
+            (quiz_id,)
+        ).fetchone()
+        if not quiz_row:
+            return None
+        question_rows = conn.execute(
+            "SELECT id, question, image_file_id, options, correct, explanation "
+            "FROM questions WHERE quiz_id=? ORDER BY id",
+            (quiz_id,)
+        ).fetchall()
+    finally:
+        conn.execute("COMMIT")
+    return compile_snapshot(quiz_row, question_rows)
+
+
+# =========================
+# CACHE
+# =========================
+class QuizCache:
+
+    def __init__(self, db, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, render=None):
+        self.db = db
+        # render(snapshot) -> lazy keyboards for snapshot.keyboards. They
+        # report what they render through .size / .on_grow, which counts
+        # against max_bytes like the snapshot itself.
+        self.render = render
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()   # quiz_id -> QuizSnapshot (LRU order)
+        self._bytes = 0
+        self._loading = {}              # quiz_id -> Future, one load per quiz
+        self._versions = {}             # quiz_id -> invalidation counter
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get(self, quiz_id):
+        snapshot = self._entries.get(quiz_id)
+        if snapshot is not None:
+            self._entries.move_to_end(quiz_id)
+            self.hits += 1
+            return snapshot
+
+        # 🔁 Hundreds of players starting at once share a single load
+        pending = self._loading.get(quiz_id)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._loading[quiz_id] = future
+        version = self._versions.get(quiz_id, 0)
+        try:
+            snapshot = await self.db.read(lambda conn: _load_snapshot(conn, quiz_id))
+            if snapshot is not None and self.render is not None:
+                snapshot = snapshot._replace(keyboards=self.render(snapshot))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't warn about an unread exception
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(quiz_id, None)
+
+        # Edited while we were loading → hand it out, but don't keep it
+        if snapshot is not None and self._versions.get(quiz_id, 0) == version:
+            self._store(snapshot)
+
+        future.set_result(snapshot)
+        return snapshot
+
+    def peek(self, quiz_id):
+        return self._entries.get(quiz_id)
+
+    def invalidate(self, quiz_id):
+        self._versions[quiz_id] = self._versions.get(quiz_id, 0) + 1
+        snapshot = self._entries.pop(quiz_id, None)
+        if snapshot is not None:
+            self._release(snapshot)
+
+    def clear(self):
+        for quiz_id in list(self._entries):
+            self.invalidate(quiz_id)
+
+    @staticmethod
+    def _entry_bytes(snapshot):
+        keyboards = snapshot.keyboards
+        return snapshot.size + (keyboards.size if keyboards is not None else 0)
+
+    def _release(self, snapshot):
+        self._bytes -= self._entry_bytes(snapshot)
+        # Players still holding it keep rendering; no longer ours to count
+        if snapshot.keyboards is not None:
+            snapshot.keyboards.on_grow = None
+
+    def _store(self, snapshot):
+        old = self._entries.pop(snapshot.quiz_id, None)
+        if old is not None:
+            self._release(old)
+
+        self._entries[snapshot.quiz_id] = snapshot
+        self._bytes += self._entry_bytes(snapshot)
+        if snapshot.keyboards is not None:
+            snapshot.keyboards.on_grow = self._grow
+        self._evict()
+
+    def _grow(self, nbytes):
+        # Keyboards of a cached snapshot were rendered
+        self._bytes += nbytes
+        self._evict()
+
+    def _evict(self):
+        # Least recently used first, but always keep the newest entry
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._release(evicted)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,426 @@
+# quizdb.py
+# Database layer – every SQLite call runs on a worker thread,
+# so the PTB event loop keeps dispatching while disk I/O is in flight.
+# WAL mode: one group-committing writer, a pool of read-only readers.
+
+import asyncio
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# =========================
+# OPTION STORAGE
+# =========================
+# questions.options holds a JSON array of strings. Any text is allowed
+# inside an option, and the C json decoder hands back a ready-to-use
+# tuple in one call.
+MIN_OPTIONS = 2
+MAX_OPTIONS = 10
+
+
+def pack_options(options):
+    options = [str(o) for o in options]
+    if not MIN_OPTIONS <= len(options) <= MAX_OPTIONS:
+        raise ValueError(f"a question needs {MIN_OPTIONS}–{MAX_OPTIONS} options, got {len(options)}")
+    return json.dumps(options, ensure_ascii=False)
+
+
+def unpack_options(packed):
+    return tuple(json.loads(packed)) if packed else ()
+
+
+def _legacy_options_to_json(text):
+    return json.dumps(text.split("||"), ensure_ascii=False)
+
+
+# =========================
+# SCHEMA MIGRATIONS
+# =========================
+# PRAGMA user_version records the last migration applied to the file.
+# Append new steps to MIGRATIONS; never edit a step that has shipped.
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _migrate_base_schema(conn):
+    # v1 – the tables the bot has always created at import time
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard (
+            quiz_id TEXT,
+            chat_id INTEGER,
+            user_id INTEGER,
+            username TEXT,
+            score INTEGER,
+            PRIMARY KEY (quiz_id, chat_id, user_id)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS quizzes (
+            quiz_id TEXT PRIMARY KEY,
+            owner_id INTEGER,
+            title TEXT,
+            description TEXT,
+            folder TEXT DEFAULT 'Default',
+            shuffle_q INTEGER,
+            shuffle_a INTEGER,
+            timer INTEGER
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS folders (
+            owner_id INTEGER,
+            name TEXT,
+            UNIQUE(owner_id, name)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quiz_id TEXT,
+            question TEXT,
+            image_file_id TEXT,
+            options TEXT,
+            correct INTEGER,
+            explanation TEXT
+        )
+    """)
+
+    # Very old files were created before quizzes had a folder
+    if "folder" not in _table_columns(conn, "quizzes"):
+        conn.execute("ALTER TABLE quizzes ADD COLUMN folder TEXT DEFAULT 'Default'")
+
+
+def _migrate_hot_query_indexes(conn):
+    # v2 – indexes for the play, question-list and folder-list queries.
+    # (quiz_id, question COLLATE NOCASE) serves both "WHERE quiz_id=?"
+    # lookups and the "ORDER BY question COLLATE NOCASE" listing.
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_questions_quiz_question
+        ON questions (quiz_id, question COLLATE NOCASE)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quizzes_owner_folder
+        ON quizzes (owner_id, folder)
+    """)
+
+
+def _migrate_pack_options(conn):
+    # v3 – "a||b||c||d" strings become JSON arrays (see pack_options)
+    conn.create_function("legacy_options_to_json", 1, _legacy_options_to_json, deterministic=True)
+    conn.execute("""
+        UPDATE questions
+        SET options = legacy_options_to_json(options)
+        WHERE options IS NOT NULL
+    """)
+
+
+def _migrate_user_state(conn):
+    # v4 – PTB user_data persistence (one pickled row per user)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_state (
+            user_id INTEGER PRIMARY KEY,
+            data BLOB NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+    """)
+
+
+def _migrate_group_leaderboards(conn):
+    # v5 – attempts per player and the group message each leaderboard edits
+    if "attempts" not in _table_columns(conn, "leaderboard"):
+        conn.execute("ALTER TABLE leaderboard ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS group_lb_messages (
+            quiz_id TEXT,
+            chat_id INTEGER,
+            message_id INTEGER NOT NULL,
+            page INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (quiz_id, chat_id)
+        )
+    """)
+
+
+def _migrate_leaderboard_ties(conn):
+    # v6 – when a player reached their score; earlier wins ties
+    if "reached_at" not in _table_columns(conn, "leaderboard"):
+        conn.execute("ALTER TABLE leaderboard ADD COLUMN reached_at INTEGER NOT NULL DEFAULT 0")
+
+
+def _migrate_play_mode(conn):
+    # v7 – how questions are presented while playing (see PLAY_MODES in quizcache)
+    if "play_mode" not in _table_columns(conn, "quizzes"):
+        conn.execute("ALTER TABLE quizzes ADD COLUMN play_mode TEXT NOT NULL DEFAULT 'classic'")
+
+
+def _migrate_listing_indexes(conn):
+    # v8 – keyset pagination: quiz lists are read in title order, one page
+    # at a time, from these (rowid breaks title ties). The question list
+    # already has idx_questions_quiz_question; (owner_id, folder, title)
+    # covers everything idx_quizzes_owner_folder did.
+    conn.execute("DROP INDEX IF EXISTS idx_quizzes_owner_folder")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quizzes_owner_folder_title
+        ON quizzes (owner_id, folder, title)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_quizzes_owner_title
+        ON quizzes (owner_id, title)
+    """)
+
+
+MIGRATIONS = [
+    (1, _migrate_base_schema),
+    (2, _migrate_hot_query_indexes),
+    (3, _migrate_pack_options),
+    (4, _migrate_user_state),
+    (5, _migrate_group_leaderboards),
+    (6, _migrate_leaderboard_ties),
+    (7, _migrate_play_mode),
+    (8, _migrate_listing_indexes),
+]
+
+
+def migrate(conn):
+    # Each step runs in its own write transaction together with the
+    # user_version bump, so a crash mid-upgrade leaves the file at the
+    # previous version. Under WAL, readers keep working while it runs.
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    applied = []
+    for version, step in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        applied.append(version)
+    return applied
+
+
+# =========================
+# DATABASE
+# =========================
+READER_COUNT = int(os.environ.get("DB_READERS", "4"))
+COMMIT_WINDOW_MS = float(os.environ.get("DB_COMMIT_WINDOW_MS", "3"))
+MAX_BATCH = 256
+
+_STOP = object()
+
+
+class _WriteJob:
+    __slots__ = ("fn", "future")
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.future = Future()
+
+
+class Database:
+    # WAL storage mode:
+    #   - a single writer thread owns the read-write connection and
+    #     groups every write that arrives within COMMIT_WINDOW_MS into
+    #     one transaction (one fsync for the whole batch)
+    #   - a small pool of read-only connections serves the play and
+    #     listing paths; under WAL they never wait behind the writer
+    # Every call gets its own cursor, so handlers never share cursor state.
+
+    def __init__(self, path, readers=READER_COUNT, commit_window_ms=COMMIT_WINDOW_MS):
+        self.path = path
+        self.commit_window = commit_window_ms / 1000
+        self.batches = 0
+        self.batched_writes = 0
+
+        self._writes = queue.Queue()
+        self._writer_conn = self._connect()
+        self._writer_conn.execute("PRAGMA journal_mode=WAL")
+        self._writer_conn.execute("PRAGMA synchronous=NORMAL")
+        migrate(self._writer_conn)
+        self._writer = threading.Thread(target=self._writer_loop, name="quizdb-writer", daemon=True)
+        self._writer.start()
+
+        self._local = threading.local()
+        self._reader_conns = []
+        self._reader_lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="quizdb-reader")
+
+    def _connect(self, readonly=False):
+        # Autocommit mode: transactions are opened explicitly
+        if readonly:
+            conn = sqlite3.connect(
+                pathlib.Path(self.path).absolute().as_uri() + "?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA query_only=1")
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    # ---------- reader side ----------
+    def _reader_conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(readonly=True)
+            self._local.conn = conn
+            with self._reader_lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    def _read(self, fn):
+        return fn(self._reader_conn())
+
+    def _submit_read(self, fn):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._readers, self._read, fn)
+
+    # ---------- writer side ----------
+    def _writer_loop(self):
+        conn = self._writer_conn
+        while True:
+            job = self._writes.get()
+            if job is _STOP:
+                return
+
+            # 📦 Group commit: collect everything arriving inside the window
+            batch = [job]
+            deadline = time.monotonic() + self.commit_window
+            stop = False
+            while len(batch) < MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                try:
+                    job = self._writes.get(timeout=remaining) if remaining > 0 else self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stop = True
+                    break
+                batch.append(job)
+
+            self._commit_batch(conn, batch)
+            if stop:
+                return
+
+    def _commit_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job in batch:
+                # Each job gets a savepoint, so one failing write
+                # does not take the rest of the batch down with it
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = job.fn(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    results.append((job, None, e))
+                    continue
+                conn.execute("RELEASE job")
+                results.append((job, result, None))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.batched_writes += len(batch)
+        for job, result, error in results:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+
+    def _submit_write(self, fn):
+        job = _WriteJob(fn)
+        self._writes.put(job)
+        return asyncio.wrap_future(job.future)
+
+    # ---------- async API: reads ----------
+    async def fetchone(self, sql, params=()):
+        def fn(conn):
+            cursor = conn.execute(sql, params)
+            try:
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+        return await self._submit_read(fn)
+
+    async def fetchall(self, sql, params=()):
+        def fn(conn):
+            cursor = conn.execute(sql, params)
+            try:
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        return await self._submit_read(fn)
+
+    async def fetchval(self, sql, params=(), default=None):
+        row = await self.fetchone(sql, params)
+        return row[0] if row else default
+
+    async def read(self, fn):
+        # fn(conn) runs on a read-only connection
+        return await self._submit_read(fn)
+
+    # ---------- async API: writes ----------
+    async def execute(self, sql, params=()):
+        # Returns the number of rows changed
+        def fn(conn):
+            cursor = conn.execute(sql, params)
+            try:
+                return cursor.rowcount
+            finally:
+                cursor.close()
+        return await self._submit_write(fn)
+
+    async def executemany(self, sql, seq_of_params):
+        def fn(conn):
+            cursor = conn.executemany(sql, seq_of_params)
+            try:
+                return cursor.rowcount
+            finally:
+                cursor.close()
+        return await self._submit_write(fn)
+
+    async def transaction(self, statements):
+        # statements: list of (sql, params) applied atomically
+        statements = list(statements)
+
+        def fn(conn):
+            for sql, params in statements:
+                conn.execute(sql, params)
+        await self._submit_write(fn)
+
+    async def run(self, fn):
+        # fn(conn) runs on the writer, atomically with respect to other writes
+        return await self._submit_write(fn)
+
+    def close(self):
+        self._writes.put(_STOP)
+        self._writer.join()
+        self._writer_conn.close()
+
+        self._readers.shutdown(wait=True)
+        with self._reader_lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns.clear()
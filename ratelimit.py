@@ -0,0 +1,187 @@
+# ratelimit.py
+# Outbound Bot API flow control: token buckets for Telegram's global and
+# per-chat limits, with interactive traffic (answer feedback, the next
+# question) sent before background traffic (leaderboard edits, menus).
+# Plugged into PTB with ApplicationBuilder().rate_limiter(...).
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import deque
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+GLOBAL_RATE = float(os.environ.get("TG_GLOBAL_RATE", "30"))        # messages / s, whole bot
+PRIVATE_RATE = float(os.environ.get("TG_PRIVATE_RATE", "1"))       # messages / s, one private chat
+GROUP_RATE = float(os.environ.get("TG_GROUP_RATE", str(20 / 60)))  # messages / s, one group
+CHAT_BURST = 3
+MAX_RETRIES = 3
+MAX_IDLE_GATES = 10_000
+
+# Priority of whatever the current task sends. Each update and each
+# background task runs in its own task, so setting it there is scoped.
+_priority = contextvars.ContextVar("outbound_priority", default=BACKGROUND)
+
+
+def mark_interactive():
+    _priority.set(INTERACTIVE)
+
+
+def mark_background():
+    _priority.set(BACKGROUND)
+
+
+def retry_seconds(error):
+    retry_after = error.retry_after
+    # int on PTB 21, timedelta on newer releases
+    return retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self):
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    def block(self, seconds):
+        # After a 429: nothing goes out for `seconds`
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+    @property
+    def full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+class _PriorityGate:
+    # A token bucket whose waiters are served interactive-first, FIFO
+    # within a priority.
+
+    def __init__(self, rate, capacity):
+        self.bucket = TokenBucket(rate, capacity)
+        self.waiters = (deque(), deque())
+        self._task = None
+
+    @property
+    def idle(self):
+        return not self.waiters[INTERACTIVE] and not self.waiters[BACKGROUND] and self.bucket.full
+
+    async def take(self, priority):
+        if not self.waiters[INTERACTIVE] and not self.waiters[BACKGROUND] and self.bucket.wait_time() == 0:
+            self.bucket.take()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[priority].append(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+        await future
+
+    async def _drain(self):
+        while self.waiters[INTERACTIVE] or self.waiters[BACKGROUND]:
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            queue = self.waiters[INTERACTIVE] or self.waiters[BACKGROUND]
+            future = queue.popleft()
+            if future.done():           # caller gave up
+                continue
+            self.bucket.take()
+            future.set_result(None)
+
+
+class PriorityRateLimiter(BaseRateLimiter):
+
+    def __init__(self, global_rate=GLOBAL_RATE, private_rate=PRIVATE_RATE,
+                 group_rate=GROUP_RATE, max_retries=MAX_RETRIES):
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+
+        self._global = _PriorityGate(global_rate, global_rate)
+        self._chats = {}        # chat_id -> _PriorityGate
+
+        self.queued = [0, 0]    # requests waiting, by priority
+        self.max_queued = 0
+        self.sent = 0
+        self.retries = 0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _gate(self, chat_id):
+        gate = self._chats.get(chat_id)
+        if gate is None:
+            if len(self._chats) >= MAX_IDLE_GATES:
+                for key in [k for k, g in self._chats.items() if g.idle]:
+                    del self._chats[key]
+            # Negative ids are groups/channels (20 msg/min), positive are users
+            rate = self.group_rate if isinstance(chat_id, int) and chat_id < 0 else self.private_rate
+            gate = self._chats[chat_id] = _PriorityGate(rate, CHAT_BURST)
+        return gate
+
+    async def _acquire(self, chat_id, priority):
+        self.queued[priority] += 1
+        self.max_queued = max(self.max_queued, sum(self.queued))
+        try:
+            await self._gate(chat_id).take(priority)
+            await self._global.take(priority)
+        finally:
+            self.queued[priority] -= 1
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get("chat_id")
+        # Only chat-bound methods count (answerCallbackQuery, getUpdates… don't)
+        if chat_id is None:
+            return await callback(*args, **kwargs)
+
+        priority = (rate_limit_args or {}).get("priority", _priority.get())
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(chat_id, priority)
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                # ⏳ Flood control is per chat: hold only this chat back
+                self.retries += 1
+                self._gate(chat_id).bucket.block(retry_seconds(e))
+                continue
+            self.sent += 1
+            return result
+
+    def stats(self):
+        return {
+            "queued_interactive": self.queued[INTERACTIVE],
+            "queued_background": self.queued[BACKGROUND],
+            "max_queued": self.max_queued,
+            "sent": self.sent,
+            "retries": self.retries,
+        }
@@ -0,0 +1,77 @@
+# router.py
+# One CallbackQueryHandler for every inline button.
+# callback_data is "ACTION" or "ACTION|arg"; the action is looked up in a
+# dict, so dispatch cost doesn't grow with the number of buttons.
+
+import re
+
+SEP = "|"
+_ACTION_RE = re.compile(r"^[A-Z][A-Z0-9_]*$")
+
+
+class CallbackRouter:
+
+    def __init__(self):
+        self._routes = {}       # action -> async callback(update, context)
+        self._legacy = []       # (old prefix, action) for buttons sent before "ACTION|arg"
+
+        self.dispatched = 0
+        self.unrouted = 0
+
+    # ---------- registration ----------
+    def add(self, action, callback):
+        if not _ACTION_RE.match(action):
+            raise ValueError(f"Invalid callback action {action!r}")
+        if action in self._routes:
+            raise ValueError(f"Callback action {action!r} registered twice")
+        self._routes[action] = callback
+
+    def add_legacy(self, prefix, action):
+        # Old "PREFIX<arg>" buttons still sitting in chats → ACTION, arg
+        self._legacy.append((prefix, action))
+
+    def check(self):
+        # Run once at startup; refuses any table where a button could
+        # reach more than one handler depending on lookup order.
+        for prefix, action in self._legacy:
+            if action not in self._routes:
+                raise ValueError(f"Legacy prefix {prefix!r} points at unknown action {action!r}")
+            for other, _ in self._legacy:
+                if other != prefix and other.startswith(prefix):
+                    raise ValueError(f"Legacy prefix {prefix!r} shadows {other!r}")
+            for name in self._routes:
+                if name.startswith(prefix):
+                    raise ValueError(f"Legacy prefix {prefix!r} also matches action {name!r}")
+
+    # ---------- parsing ----------
+    def parse(self, data):
+        # -> (action, arg); arg is "" when the button carries none
+        action, sep, arg = data.partition(SEP)
+        if sep or action in self._routes:
+            return action, arg
+
+        for prefix, legacy_action in self._legacy:
+            if data.startswith(prefix):
+                return legacy_action, data[len(prefix):]
+
+        return action, ""
+
+    def arg(self, data):
+        return self.parse(data)[1]
+
+    # ---------- dispatch ----------
+    def resolve(self, data):
+        return self._routes.get(self.parse(data)[0])
+
+    async def dispatch(self, update, context):
+        query = update.callback_query
+        callback = self.resolve(query.data or "")
+
+        if callback is None:
+            # Stale or unknown button – stop the client spinner, nothing else
+            self.unrouted += 1
+            await query.answer()
+            return
+
+        self.dispatched += 1
+        await callback(update, context)
@@ -0,0 +1,112 @@
+# test_importer.py
+
+import gzip
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import importer  # noqa: E402
+from exporter import export_quiz  # noqa: E402
+from importer import check_file, insert_questions, iter_records, to_row  # noqa: E402
+from quizdb import migrate, pack_options  # noqa: E402
+
+
+def question(i, **extra):
+    return {"question": f"Question {i}?", "options": ["a", "b", "c"], "correct": 2, **extra}
+
+
+def records(path, fmt):
+    with importer._open_text(path, False) as f:
+        return list(iter_records(f, fmt))
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_json_element_split_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "_CHUNK", 16)
+    items = [question(i, explanation="x" * 40) for i in range(5)]
+    path = write(tmp_path, "q.json", json.dumps(items))
+
+    assert [record for _, record in records(path, "json")] == items
+    assert check_file(path, "json", False) == (5, [], 0)
+
+
+def test_json_truncated_array(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "_CHUNK", 16)
+    path = write(tmp_path, "q.json", json.dumps([question(1), question(2)])[:-20])
+
+    valid, errors, count = check_file(path, "json", False)
+    assert valid == 1
+    assert count == 1 and errors[0].startswith("item 2:")
+
+
+def test_jsonl_skips_legacy_quiz_header(tmp_path):
+    lines = [{"quiz": {"title": "T", "timer": 30}}, question(1), question(2)]
+    path = write(tmp_path, "q.jsonl", "\n".join(json.dumps(line) for line in lines) + "\n")
+
+    assert [record for _, record in records(path, "jsonl")] == lines[1:]
+
+
+def test_csv_blank_option_between_filled_ones(tmp_path):
+    path = write(tmp_path, "q.csv", (
+        "question,option1,option2,option3,correct\n"
+        "Q,A,,C,2\n"
+        "Q2,A,B,,2\n"
+    ))
+
+    valid, errors, count = check_file(path, "csv", False)
+    assert (valid, count) == (1, 1)
+    assert errors == ["line 2: option2 is empty but a later option is not"]
+
+
+@pytest.mark.parametrize("correct", [0, 4, "x"])
+def test_correct_out_of_range(correct):
+    with pytest.raises(ValueError):
+        to_row({"question": "Q", "options": ["a", "b", "c"], "correct": correct})
+
+
+def test_correct_is_one_based():
+    assert to_row({"question": "Q", "options": ["a", "b"], "correct": 2})[3] == 1
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+def test_round_trip_through_exporter(tmp_path, fmt):
+    conn = sqlite3.connect(str(tmp_path / "quiz.db"), isolation_level=None)
+    migrate(conn)
+    conn.execute(
+        "INSERT INTO quizzes (quiz_id, owner_id, title, folder, shuffle_q, shuffle_a, timer) "
+        "VALUES ('src', 1, 'Source', 'Default', 0, 0, 15)"
+    )
+    original = [
+        ("First, with a comma", None, pack_options(["a", "b"]), 1, "because"),
+        ("Second\nwith a newline", "file-id", pack_options(["x", "y", "z \"q\""]), 0, None),
+    ]
+    conn.executemany(
+        "INSERT INTO questions (quiz_id, question, image_file_id, options, correct, explanation) "
+        "VALUES ('src', ?, ?, ?, ?, ?)",
+        original
+    )
+
+    path = str(tmp_path / f"out.{fmt}.gz")
+    assert export_quiz(conn, "src", path, fmt) == ("Source", 2)
+    if fmt == "jsonl":
+        # Questions only: no settings line the import would drop
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert all("question" in json.loads(line) for line in f)
+
+    assert check_file(path, fmt, True) == (2, [], 0)
+    assert insert_questions(conn, "dst", path, fmt, True) == 2
+    copied = conn.execute(
+        "SELECT question, image_file_id, options, correct, explanation "
+        "FROM questions WHERE quiz_id='dst' ORDER BY id"
+    ).fetchall()
+    assert copied == original
@@ -0,0 +1,78 @@
+# test_leaderboard.py
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import LeaderboardStore, RankedLeaderboard  # noqa: E402
+from quizdb import Database  # noqa: E402
+
+
+def names(entries):
+    return [entry["name"] for entry in entries]
+
+
+def make_board():
+    board = RankedLeaderboard()
+    board.record(1, "ann", 5, 1, reached_at=100)
+    board.record(2, "bob", 7, 1, reached_at=200)
+    board.record(3, "cid", 5, 1, reached_at=50)
+    board.record(4, "dan", 5, 1, reached_at=50)
+    return board
+
+
+def test_rank_orders_by_score_then_time_then_user_id():
+    board = make_board()
+    assert [board.rank(u) for u in (2, 3, 4, 1)] == [1, 2, 3, 4]
+    assert board.rank(99) is None
+    assert len(board) == 4 and 3 in board
+
+
+def test_page_slices_in_rank_order():
+    board = make_board()
+    assert names(board.page(0, 2)) == ["bob", "cid"]
+    assert names(board.page(2, 10)) == ["dan", "ann"]
+    assert board.page(10, 20) == []
+
+
+def test_rescore_moves_the_player():
+    board = make_board()
+    board.record(1, "ann", 8, 2, reached_at=300)
+    assert board.rank(1) == 1
+    assert names(board.page(0, 4)) == ["ann", "bob", "cid", "dan"]
+
+    # Dropping back to a tied score ranks by the new time: last among the 5s
+    board.record(1, "ann", 5, 2, reached_at=400)
+    assert names(board.page(0, 4)) == ["bob", "cid", "dan", "ann"]
+
+
+def test_same_score_keeps_tie_break_position():
+    board = make_board()
+    board.record(3, "cid2", 5, 2, reached_at=999)
+    entry = board.get(3)
+    assert (entry["name"], entry["attempts"], entry["reached_at"]) == ("cid2", 2, 50)
+    assert board.rank(3) == 2
+
+
+def test_store_reloads_every_chat(tmp_path):
+    async def scenario(db):
+        store = LeaderboardStore(db)
+        board = RankedLeaderboard()
+        # Posted group, live game in a never-posted group, no group
+        for chat_id in (-100, -200, 0):
+            store.save_entry("q1", chat_id, 7, board.record(7, "ann", 3, 1, reached_at=10))
+        store.bind_message("q1", -100, 55)
+        await store.flush()
+
+        boards, bindings = await LeaderboardStore(db).load()
+        assert sorted(boards) == [("q1", -200), ("q1", -100), ("q1", 0)]
+        assert boards[("q1", -200)].get(7)["attempts"] == 1
+        assert list(bindings) == [("q1", -100)]
+
+    db = Database(str(tmp_path / "quiz.db"), readers=1)
+    try:
+        asyncio.run(scenario(db))
+    finally:
+        db.close()
@@ -0,0 +1,55 @@
+# test_outbound.py
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outbound import EditCoalescer  # noqa: E402
+
+
+class FakeBot:
+
+    def __init__(self):
+        self.edits = []
+
+    async def edit_message_text(self, chat_id, message_id, text, reply_markup, parse_mode):
+        self.edits.append((chat_id, message_id, text))
+
+
+def renderer(text):
+    async def render():
+        return text, None
+    return render
+
+
+def test_slot_is_dropped_once_sent():
+    async def scenario():
+        edits = EditCoalescer(FakeBot(), window=0.01)
+        for n in range(3):
+            edits.schedule(-1, n, renderer("board"))
+        await asyncio.sleep(0.05)
+
+        assert len(edits.bot.edits) == 3
+        assert edits._slots == {}
+
+        # What's on screen is still remembered: nothing to send
+        edits.schedule(-1, 0, renderer("board"), urgent=True)
+        await asyncio.sleep(0.01)
+        assert len(edits.bot.edits) == 3 and edits.skipped == 1
+        assert edits._slots == {}
+
+    asyncio.run(scenario())
+
+
+def test_stop_cancels_pending_edits():
+    async def scenario():
+        edits = EditCoalescer(FakeBot(), window=60)
+        edits.schedule(-1, 1, renderer("board"))
+        await asyncio.sleep(0)
+        await edits.stop()
+
+        assert edits.bot.edits == [] and edits._slots == {}
+
+    asyncio.run(scenario())
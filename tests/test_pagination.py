@@ -0,0 +1,99 @@
+# test_pagination.py
+# list_page against a real Database, on a list full of NOCASE-equal
+# questions, so every page boundary falls inside a run of ties.
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pagination import list_page  # noqa: E402
+from quizdb import Database  # noqa: E402
+
+PER_PAGE = 3
+TEXTS = ["apple", "Apple", "APPLE", "banana", "apple", "Banana", "cherry", "BANANA", "aPPle", "cherry"]
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / "quiz.db"), readers=1)
+    asyncio.run(database.executemany(
+        "INSERT INTO questions (quiz_id, question, options, correct) VALUES ('q1', ?, '[]', 0)",
+        [(text,) for text in TEXTS]
+    ))
+    yield database
+    database.close()
+
+
+def expected(db):
+    return asyncio.run(db.fetchall(
+        "SELECT id, question FROM questions WHERE quiz_id='q1' ORDER BY question COLLATE NOCASE, id"
+    ))
+
+
+def page(db, state, move=0):
+    total = len(expected(db))
+    return asyncio.run(list_page(
+        db, state, "q_cursor",
+        "SELECT id, question FROM questions WHERE quiz_id=?", ("q1",),
+        "question COLLATE NOCASE", "id", lambda row: (row[1], row[0]),
+        total, PER_PAGE, move
+    ))
+
+
+def test_next_and_prev_walk_every_page(db):
+    rows = expected(db)
+    state = {}
+
+    assert page(db, state) == (rows[0:3], 0, 4)
+    for n in (1, 2, 3):
+        assert page(db, state, 1) == (rows[n * 3:n * 3 + 3], n, 4)
+    # Next past the end stays on the last page
+    assert page(db, state, 1) == (rows[9:], 3, 4)
+
+    for n in (2, 1, 0):
+        assert page(db, state, -1) == (rows[n * 3:n * 3 + 3], n, 4)
+    assert page(db, state, -1) == (rows[0:3], 0, 4)
+
+
+def test_same_page_is_stable(db):
+    rows = expected(db)
+    state = {}
+    page(db, state)
+    page(db, state, 1)
+    assert page(db, state) == (rows[3:6], 1, 4)
+
+    # A row added before the anchor doesn't shift the page on screen
+    asyncio.run(db.execute("INSERT INTO questions (quiz_id, question, options, correct) VALUES ('q1', 'Aardvark', '[]', 0)"))
+    assert page(db, state)[0] == rows[3:6]
+
+
+def test_deleted_page_falls_back_to_previous(db):
+    rows = expected(db)
+    state = {}
+    page(db, state)
+    page(db, state, 1)
+    page(db, state, 1)
+    assert page(db, state)[1] == 2
+
+    # Everything from the anchor on goes: nothing left to show at page 3
+    ids = [qid for qid, _ in rows[6:]]
+    asyncio.run(db.execute(
+        "DELETE FROM questions WHERE id IN (SELECT value FROM json_each(?))", (str(ids),)
+    ))
+    rows = expected(db)
+    assert page(db, state) == (rows[3:6], 1, 2)
+
+
+def test_deleted_first_row_keeps_the_page(db):
+    rows = expected(db)
+    state = {}
+    page(db, state)
+    page(db, state, 1)
+
+    asyncio.run(db.execute("DELETE FROM questions WHERE id=?", (rows[3][0],)))
+    rows = expected(db)
+    assert page(db, state) == (rows[3:6], 1, 3)
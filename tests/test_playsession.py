@@ -0,0 +1,37 @@
+# test_playsession.py
+
+import os
+import pickle
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from livegame import LiveGame  # noqa: E402
+from playsession import PlaySession  # noqa: E402
+from quizcache import compile_snapshot  # noqa: E402
+from quizdb import pack_options  # noqa: E402
+
+
+def make_snapshot(count, shuffle=1):
+    rows = [(i, f"Q{i}", None, pack_options(["a", "b"]), 0, None) for i in range(count)]
+    return compile_snapshot(("q1", "Quiz", None, 15, shuffle, shuffle, "classic"), rows)
+
+
+def test_small_quiz_order_stays_compact():
+    play = PlaySession.start(make_snapshot(10), random.Random(1))
+    assert play.order.typecode == "H"
+    assert sorted(play.order) == list(range(10))
+
+
+def test_quiz_beyond_65536_questions():
+    snapshot = make_snapshot(70_000, shuffle=0)
+    play = PlaySession.start(snapshot)
+    assert play.order[-1] == 69_999
+    assert LiveGame(snapshot, -1, 1).order[-1] == 69_999
+
+    play.index = 69_999
+    restored = pickle.loads(pickle.dumps(play))
+    assert restored.order == play.order
+    assert restored.attach(snapshot)
+    assert restored.current()[0].id == 69_999
@@ -0,0 +1,105 @@
+# test_timerwheel.py
+# The wheel is driven tick by tick through _advance(), so no test sleeps.
+
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timerwheel import TimerWheel  # noqa: E402
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def settle():
+    # Let the callbacks _advance() started run
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def recorder():
+    fired = []
+
+    async def callback(*args):
+        fired.append(args)
+
+    return fired, callback
+
+
+def test_fires_on_its_tick():
+    async def scenario():
+        wheel = TimerWheel(tick=0.25, slots=512)
+        fired, callback = recorder()
+        wheel.schedule("a", 1.0, callback, "a", 1)
+        assert "a" in wheel and len(wheel) == 1
+
+        for _ in range(3):
+            wheel._advance()
+        await settle()
+        assert fired == []
+
+        wheel._advance()
+        await settle()
+        assert fired == [("a", 1)]
+        assert "a" not in wheel and wheel.fired == 1
+
+    run(scenario())
+
+
+def test_cancel_and_reschedule():
+    async def scenario():
+        wheel = TimerWheel(tick=0.25, slots=512)
+        fired, callback = recorder()
+        wheel.schedule("a", 0.5, callback, "first")
+        wheel.schedule("a", 1.0, callback, "second")    # replaces the first
+        wheel.schedule("b", 0.5, callback, "b")
+        assert wheel.cancel("b") and not wheel.cancel("b")
+
+        for _ in range(4):
+            wheel._advance()
+        await settle()
+        assert fired == [("second",)]
+        assert (wheel.scheduled, wheel.cancelled, wheel.fired) == (3, 1, 1)
+
+    run(scenario())
+
+
+def test_deadline_more_than_one_lap_away():
+    async def scenario():
+        wheel = TimerWheel(tick=0.25, slots=512)
+        fired, callback = recorder()
+        wheel.schedule("long", 300, callback, "long")   # 1200 ticks: 2+ laps
+        wheel.schedule("short", 0.25, callback, "short")
+
+        for _ in range(1199):
+            wheel._advance()
+        await settle()
+        # The slot came round twice before the deadline without firing it
+        assert fired == [("short",)]
+        assert "long" in wheel
+
+        wheel._advance()
+        await settle()
+        assert fired == [("short",), ("long",)]
+
+    run(scenario())
+
+
+def test_failed_callback_is_logged(caplog):
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        wheel = TimerWheel(tick=0.25, slots=8)
+        wheel.schedule("x", 0.25, boom)
+        wheel._advance()
+        await settle()
+
+    with caplog.at_level(logging.ERROR, logger="timerwheel"):
+        run(scenario())
+    assert "Timer callback failed" in caplog.text
+    assert "boom" in caplog.text
@@ -0,0 +1,83 @@
+# test_webhook.py
+# make_webhook_app against a stand-in for the PTB Application:
+# run from the repo root with  python -m pytest tests
+
+import asyncio
+import json
+import os
+import sys
+
+from tornado.testing import AsyncHTTPTestCase
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webhook import SECRET_HEADER, make_webhook_app  # noqa: E402
+
+SECRET = "test-secret"
+UPDATE = {"update_id": 1, "message": {
+    "message_id": 1, "date": 0, "chat": {"id": 1, "type": "private"}, "text": "/start",
+}}
+
+
+class FakeProcessor:
+    pending = 0
+
+
+class FakeApplication:
+
+    def __init__(self):
+        self.update_queue = asyncio.Queue()
+        self.update_processor = FakeProcessor()
+        self.bot = None
+        self.running = True
+
+
+class WebhookAppTest(AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.ptb_app = FakeApplication()
+        return make_webhook_app(self.ptb_app, secret=SECRET, path="telegram",
+                                max_pending=2, health=lambda: {"active_plays": 3})
+
+    def post_update(self, body=UPDATE, secret=SECRET):
+        return self.fetch("/telegram", method="POST", body=json.dumps(body),
+                          headers={SECRET_HEADER: secret})
+
+    def test_update_is_queued(self):
+        response = self.post_update()
+        self.assertEqual(response.code, 200)
+        self.assertEqual(self.ptb_app.update_queue.qsize(), 1)
+        self.assertEqual(self.ptb_app.update_queue.get_nowait().update_id, 1)
+
+    def test_wrong_secret_is_rejected(self):
+        self.assertEqual(self.post_update(secret="nope").code, 403)
+        self.assertEqual(self.ptb_app.update_queue.qsize(), 0)
+
+    def test_malformed_body(self):
+        response = self.fetch("/telegram", method="POST", body="{not json",
+                              headers={SECRET_HEADER: SECRET})
+        self.assertEqual(response.code, 400)
+
+    def test_full_queue_pushes_back(self):
+        for _ in range(2):
+            self.assertEqual(self.post_update().code, 200)
+        self.assertEqual(self.post_update().code, 503)
+        self.assertEqual(self.ptb_app.update_queue.qsize(), 2)
+
+    def test_busy_processor_pushes_back(self):
+        # PTB drains update_queue at once; the backlog sits in the processor
+        self.ptb_app.update_processor.pending = 2
+        self.assertEqual(self.post_update().code, 503)
+        self.assertEqual(json.loads(self.fetch("/healthz").body)["pending_updates"], 2)
+
+    def test_healthz(self):
+        self.post_update(secret="nope")
+        response = self.fetch("/healthz")
+        self.assertEqual(response.code, 200)
+        body = json.loads(response.body)
+        self.assertTrue(body["ok"])
+        self.assertEqual(body["rejected"], 1)
+        self.assertEqual(body["active_plays"], 3)
+
+        self.ptb_app.running = False
+        self.assertEqual(self.fetch("/healthz").code, 503)
@@ -0,0 +1,102 @@
+# timerwheel.py
+# Hashed timer wheel for per-question timers.
+# One asyncio task advances the wheel every tick; scheduling and
+# cancelling are O(1) dict operations, so 10k+ running timers cost
+# nothing until they fire (no task or JobQueue job per player).
+
+import asyncio
+import logging
+import math
+
+WHEEL_TICK = 0.25       # seconds per slot (timer resolution)
+WHEEL_SLOTS = 512       # one lap = 128 s; longer timers wait extra laps
+
+logger = logging.getLogger(__name__)
+
+
+class TimerWheel:
+
+    def __init__(self, tick=WHEEL_TICK, slots=WHEEL_SLOTS):
+        self.tick = tick
+        self.slots = slots
+
+        self._wheel = [{} for _ in range(slots)]    # slot -> {key: (due_tick, callback, args)}
+        self._slot_of = {}                          # key -> slot, for O(1) cancel
+        self._now = 0                               # last tick processed
+        self._task = None
+        self._running = set()                       # fired callbacks still in flight
+
+        self.scheduled = 0
+        self.cancelled = 0
+        self.fired = 0
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, key):
+        return key in self._slot_of
+
+    # ---------- scheduling ----------
+    def schedule(self, key, delay, callback, *args):
+        # One timer per key: re-scheduling replaces the old one
+        self.cancel(key, count=False)
+
+        due = self._now + max(1, math.ceil(delay / self.tick))
+        slot = due % self.slots
+        self._wheel[slot][key] = (due, callback, args)
+        self._slot_of[key] = slot
+        self.scheduled += 1
+
+    def cancel(self, key, count=True):
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        del self._wheel[slot][key]
+        if count:
+            self.cancelled += 1
+        return True
+
+    # ---------- driving ----------
+    def _advance(self):
+        self._now += 1
+        bucket = self._wheel[self._now % self.slots]
+        if not bucket:
+            return
+
+        due = [key for key, (due_tick, _, _) in bucket.items() if due_tick <= self._now]
+        for key in due:
+            _, callback, args = bucket.pop(key)
+            del self._slot_of[key]
+            self.fired += 1
+            task = asyncio.create_task(callback(*args))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Timer callback failed", exc_info=task.exception())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time() - self._now * self.tick
+        while True:
+            # Sleep to the next tick boundary; if the loop fell behind,
+            # catch up without sleeping so timers don't drift late
+            await asyncio.sleep(max(0.0, started + (self._now + 1) * self.tick - loop.time()))
+            self._advance()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
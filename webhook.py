@@ -0,0 +1,154 @@
+# webhook.py
+# Optional webhook serving mode (set WEBHOOK_URL to enable).
+# A small tornado server (shipped with python-telegram-bot[webhooks])
+# feeds Telegram's POSTs into the Application's update queue, checks the
+# secret token, pushes back when the queue is full and serves /healthz.
+
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import signal
+
+import tornado.web
+from tornado.httpserver import HTTPServer
+
+from telegram import Update
+
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL")              # public base URL, e.g. https://bot.example.com
+WEBHOOK_LISTEN = os.environ.get("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", os.environ.get("PORT", "8443")))
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "telegram")
+# Telegram allows 1-256 chars of A-Z a-z 0-9 _ -
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET") or secrets.token_urlsafe(32)
+# Concurrent connections Telegram may open to us (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.environ.get("WEBHOOK_MAX_CONNECTIONS", "40"))
+# Updates waiting for a handler before we answer 503 and let Telegram retry
+WEBHOOK_MAX_PENDING = int(os.environ.get("WEBHOOK_MAX_PENDING", "1000"))
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def pending_updates(application):
+    # Still queued + taken by the update processor and not finished
+    # (with concurrent updates PTB empties update_queue right away)
+    return application.update_queue.qsize() + getattr(application.update_processor, "pending", 0)
+
+
+class _UpdateHandler(tornado.web.RequestHandler):
+
+    # Not "application": RequestHandler.__init__ takes the tornado app by that name
+    def initialize(self, ptb_app, secret, max_pending, counters):
+        self.ptb_app = ptb_app
+        self.secret = secret
+        self.max_pending = max_pending
+        self.counters = counters
+
+    async def post(self):
+        token = self.request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token, self.secret):
+            self.counters["rejected"] += 1
+            self.set_status(403)
+            return
+
+        queue = self.ptb_app.update_queue
+        if pending_updates(self.ptb_app) >= self.max_pending:
+            # 🚦 Backpressure: Telegram redelivers later
+            self.counters["throttled"] += 1
+            self.set_status(503)
+            return
+
+        try:
+            update = Update.de_json(json.loads(self.request.body), self.ptb_app.bot)
+        except (ValueError, TypeError, KeyError):
+            self.counters["malformed"] += 1
+            self.set_status(400)
+            return
+
+        await queue.put(update)
+        self.counters["received"] += 1
+        self.set_status(200)
+
+
+class _HealthHandler(tornado.web.RequestHandler):
+
+    def initialize(self, ptb_app, counters, health):
+        self.ptb_app = ptb_app
+        self.counters = counters
+        self.health = health
+
+    def get(self):
+        body = {
+            "ok": self.ptb_app.running,
+            "pending_updates": pending_updates(self.ptb_app),
+            **self.counters,
+        }
+        if self.health is not None:
+            body.update(self.health())
+
+        self.set_status(200 if body["ok"] else 503)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(body))
+
+
+def make_webhook_app(application, secret=WEBHOOK_SECRET, path=WEBHOOK_PATH,
+                     max_pending=WEBHOOK_MAX_PENDING, health=None):
+    counters = {"received": 0, "rejected": 0, "malformed": 0, "throttled": 0}
+    return tornado.web.Application([
+        (rf"/{path}/?", _UpdateHandler, {
+            "ptb_app": application,
+            "secret": secret,
+            "max_pending": max_pending,
+            "counters": counters,
+        }),
+        (r"/healthz", _HealthHandler, {
+            "ptb_app": application,
+            "counters": counters,
+            "health": health,
+        }),
+    ])
+
+
+async def _serve(application, health):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    # Same lifecycle order as run_polling: post_shutdown runs after
+    # shutdown() so persistence can still write on the way out.
+    server = None
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+
+        server = HTTPServer(make_webhook_app(application, health=health), xheaders=True)
+        server.listen(WEBHOOK_PORT, WEBHOOK_LISTEN)
+
+        await application.bot.set_webhook(
+            url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        print(f"🌐 Webhook listening on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}")
+
+        await stop.wait()
+    finally:
+        if server is not None:
+            server.stop()
+        if application.running:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def run_webhook(application, health=None):
+    # health: optional () -> dict merged into the /healthz response
+    asyncio.run(_serve(application, health))